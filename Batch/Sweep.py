@@ -0,0 +1,291 @@
+# Generator functions available to sweeps, by name
+GENERATORS = {
+    'Hex1': ('Hexagonal.Hex1', 'Hex1'),
+    'Hex2': ('Hexagonal.Hex2', 'Hex2'),
+    'Hex3': ('Hexagonal.Hex3', 'Hex3'),
+    'Hex4': ('Hexagonal.Hex4', 'Hex4'),
+    'Square1': ('Square.Square1', 'Square1'),
+    'Square2': ('Square.Square2', 'Square2'),
+    'Square3': ('Square.Square3', 'Square3'),
+    'Square4': ('Square.Square4', 'Square4'),
+    'Random1': ('Random.Random1', 'Random1'),
+}
+
+
+def Sweep(spec, outdir, workers=None, formats=('csv', 'ruc'), progress=True):
+    """
+    Run a parameter sweep of the generators across a process pool.
+
+    Each run writes its RUC files and a small JSON record to outdir. Runs with a
+    successful record are skipped, so an interrupted sweep resumes where it stopped.
+    The summary table is always written in run order. Files are streamed a block of
+    rows at a time, and runs with the 'tiles' fill keep their mask in a temporary file
+    in outdir unless they give a path, so large RUCs never need to fit in memory.
+
+    Arguments:
+        spec        str/list    path of a .json or .csv sweep specification, or a list of runs
+        outdir      str         output directory
+        workers     int         number of worker processes, None for one per CPU
+        formats     tuple       output formats, any of 'csv' and 'ruc'
+        progress    bool        print progress to stderr
+
+    Outputs:
+        summary     list        one dict per run with its inputs and achieved VF, R, NB, NG
+    """
+    # Import Modules
+    import os
+    import sys
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    runs = spec if isinstance(spec, list) else ReadSweep(spec)
+    os.makedirs(os.path.join(outdir, 'records'), exist_ok=True)
+
+    # Skip runs finished by an earlier, possibly interrupted, sweep (failed runs are retried)
+    todo = [(i, run) for i, run in enumerate(runs) if not _Finished(outdir, i, run)]
+    done = len(runs) - len(todo)
+    if progress and done > 0:
+        print(f"Resuming: {done} of {len(runs)} runs already done.", file=sys.stderr)
+
+    # Run the remaining generators
+    if todo:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            jobs = [pool.submit(_Run, i, run, outdir, tuple(formats)) for i, run in todo]
+            for job in as_completed(jobs):
+                record = job.result()
+                done += 1
+                if progress:
+                    status = 'failed: ' + record['error'] if record['error'] else 'done'
+                    print(f"[{done:>{len(str(len(runs)))}}/{len(runs)}] run {record['run']:05d} "
+                          f"{_Label(runs[record['run']])} {status}", file=sys.stderr)
+
+    # Write the summary in run order
+    summary = [_ReadRecord(outdir, i) for i in range(len(runs))]
+    _WriteSummary(os.path.join(outdir, 'summary.csv'), summary)
+
+    return summary
+
+
+def ReadSweep(path):
+    """
+    Read a sweep specification.
+
+    A .json file holds {"generator": name, "params": {...}} (or a list of these);
+    each parameter is a single value, a list of values, {"sweep": [...]} (the same
+    as a list), a range {"start", "stop", "num"} or {"start", "stop", "step"}, or
+    {"value": x} for a single value that is itself a list, such as a coating
+    [[thickness, ID], ...]. Every combination is run. A .csv file holds one run per
+    row with a 'generator' column and one column per parameter.
+
+    Arguments:
+        path    str     path of the .json or .csv specification
+
+    Outputs:
+        runs    list    one {'generator': name, 'params': dict} per run, in sweep order
+    """
+    # Import Modules
+    import csv
+    import itertools
+    import json
+
+    runs = []
+
+    # One run per row
+    if path.endswith('.csv'):
+        with open(path, newline='') as fid:
+            for row in csv.DictReader(fid):
+                name = row.pop('generator').strip()
+                params = {k.strip(): _Number(v) for k, v in row.items() if v is not None and v.strip() != ''}
+                runs.append({'generator': name, 'params': params})
+        return runs
+
+    # Every combination of the parameter values
+    with open(path) as fid:
+        spec = json.load(fid)
+    for block in (spec if isinstance(spec, list) else [spec]):
+        names = list(block['params'])
+        values = [_Values(block['params'][k]) for k in names]
+        for combo in itertools.product(*values):
+            runs.append({'generator': block['generator'], 'params': dict(zip(names, combo))})
+
+    return runs
+
+
+def main(argv=None):
+    """
+    Command line entry point: python -m Batch.Sweep spec.json -o out -j 8
+    """
+    # Import Modules
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run a parameter sweep of the RUC generators.")
+    parser.add_argument('spec', help="sweep specification (.json ranges or .csv rows)")
+    parser.add_argument('-o', '--outdir', default='sweep', help="output directory (default: sweep)")
+    parser.add_argument('-j', '--workers', type=int, default=None, help="worker processes (default: one per CPU)")
+    parser.add_argument('-f', '--formats', default='csv,ruc', help="comma separated output formats (default: csv,ruc)")
+    parser.add_argument('-q', '--quiet', action='store_true', help="do not print progress")
+    args = parser.parse_args(argv)
+
+    formats = tuple(f.strip() for f in args.formats.split(',') if f.strip())
+    summary = Sweep(args.spec, args.outdir, args.workers, formats, not args.quiet)
+    failed = sum(1 for record in summary if record['error'])
+
+    return 1 if failed else 0
+
+
+def _Run(i, run, outdir, formats):
+    """
+    Generate and write one run of a sweep, then store its record.
+    """
+    # Import Modules
+    import importlib
+    import json
+    import os
+    import time
+
+    from Write.WriteCSV import WriteCSVFile
+    from Write.WriteRUC import WriteRUCFile
+
+    record = {'run': i, 'generator': run['generator'], 'params': run['params'],
+              'VF': None, 'R': None, 'NB': None, 'NG': None, 'files': [], 'seconds': None, 'error': ''}
+    start = time.perf_counter()
+    try:
+        module, name = GENERATORS[run['generator']]
+        func = getattr(importlib.import_module(module), name)
+
+        # Keep tiled masks on the disk of the output directory rather than in a tmpfs /tmp
+        params = dict(run['params'])
+        if params.get('fill') == 'tiles' and params.get('path') is None:
+            params['path'] = outdir
+        mask, out = func(**params)
+
+        # Write each format through a temporary file so partial files never look finished
+        for fmt in formats:
+            path = os.path.join(outdir, f"ruc_{i:05d}." + {'csv': 'csv', 'ruc': 'txt'}[fmt])
+            if fmt == 'csv':
+                WriteCSVFile(mask, path + '.tmp')
+            else:
+                WriteRUCFile(mask, path + '.tmp', out.get('H'), out.get('L'))
+            os.replace(path + '.tmp', path)
+            record['files'].append(os.path.basename(path))
+
+        for key in ('VF', 'R', 'NB', 'NG'):
+            if out.get(key) is not None:
+                record[key] = out[key].item() if hasattr(out[key], 'item') else out[key]
+    except Exception as e:
+        record['error'] = f"{type(e).__name__}: {e}"
+    record['seconds'] = time.perf_counter() - start
+
+    # The record marks the run as done
+    path = _RecordPath(outdir, i)
+    with open(path + '.tmp', 'w') as fid:
+        json.dump(record, fid)
+    os.replace(path + '.tmp', path)
+
+    return record
+
+
+def _RecordPath(outdir, i):
+    """
+    Path of the JSON record of run i.
+    """
+    # Import Modules
+    import os
+
+    return os.path.join(outdir, 'records', f"{i:05d}.json")
+
+
+def _Finished(outdir, i, run):
+    """
+    Check whether run i has a record of the same run without an error.
+    """
+    # Import Modules
+    import os
+
+    if not os.path.exists(_RecordPath(outdir, i)):
+        return False
+    record = _ReadRecord(outdir, i)
+
+    return not record['error'] and record['generator'] == run['generator'] and record['params'] == run['params']
+
+
+def _ReadRecord(outdir, i):
+    """
+    Load the JSON record of run i.
+    """
+    # Import Modules
+    import json
+
+    with open(_RecordPath(outdir, i)) as fid:
+        return json.load(fid)
+
+
+def _WriteSummary(path, summary):
+    """
+    Write the summary table of a sweep as .csv, one row per run.
+    """
+    # Import Modules
+    import csv
+
+    names = []
+    for record in summary:
+        names += [k for k in record['params'] if k not in names]
+
+    with open(path, 'w', newline='') as fid:
+        writer = csv.writer(fid)
+        writer.writerow(['run', 'generator'] + names + ['out_VF', 'out_R', 'out_NB', 'out_NG', 'files', 'seconds', 'error'])
+        for r in summary:
+            writer.writerow([r['run'], r['generator']] + [r['params'].get(k, '') for k in names] +
+                            [r['VF'], r['R'], r['NB'], r['NG'], ';'.join(r['files']), f"{r['seconds']:.4f}", r['error']])
+
+
+def _Values(value):
+    """
+    Expand one parameter of a .json sweep into its list of values.
+    """
+    # Import Modules
+    import numpy as np
+
+    if isinstance(value, list):
+        return value
+    if isinstance(value, dict) and 'sweep' in value:
+        return list(value['sweep'])
+    if isinstance(value, dict) and 'value' in value:
+        return [value['value']]
+    if isinstance(value, dict):
+        if 'num' in value:
+            vals = np.linspace(value['start'], value['stop'], int(value['num']))
+        else:
+            vals = np.arange(value['start'], value['stop'] + value['step'] / 2, value['step'])
+        if all(isinstance(value[k], int) for k in value if k != 'num'):
+            return [int(round(v)) for v in vals]
+        return [float(f"{v:.12g}") for v in vals]
+    return [value]
+
+
+def _Number(text):
+    """
+    Convert a .csv cell into an int, float or bool, or keep it as text (a fill mode, ...).
+    """
+    text = text.strip()
+    try:
+        return int(text)
+    except ValueError:
+        pass
+    try:
+        return float(text)
+    except ValueError:
+        pass
+
+    return {'true': True, 'false': False}.get(text.lower(), text)
+
+
+def _Label(run):
+    """
+    Short description of a run for progress messages.
+    """
+    return run['generator'] + ' ' + ' '.join(f"{k}={v}" for k, v in run['params'].items())
+
+
+if __name__ == '__main__':
+    import sys
+    sys.exit(main())
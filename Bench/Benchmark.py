@@ -0,0 +1,328 @@
+# Benchmark cases: the generators, then the readers and writers of each file format
+CASES = [
+    'Hex1', 'Hex2', 'Hex3', 'Hex4',
+    'Square1', 'Square2', 'Square3', 'Square4',
+    'Random1',
+    'WriteCSV', 'WriteRUC', 'WriteRLE', 'WriteNPZ',
+    'ReadCSV', 'ReadRUC', 'ReadRLE', 'ReadNPZ',
+]
+
+# Subcells per side of the default benchmark sizes
+SIZES = [10, 100, 1000, 10000]
+
+
+def Benchmark(cases=None, sizes=None, repeat=3, progress=True):
+    """
+    Time the generators, readers and writers across RUC sizes.
+
+    Every case runs in a fresh process, one at a time, so its peak resident memory is
+    its own and runs never compete for the CPU. Inputs (such as the file contents a
+    reader parses) are prepared before the clock starts, after a small run has loaded
+    the modules of the case, and one untimed run warms up caches. The wall time is the best of repeat runs; one more run under
+    tracemalloc records the allocations, which numpy reports for its arrays too,
+    without slowing the timed runs. The peak resident memory of the runs is counted
+    above the peak left by preparing the inputs, which is reported on its own.
+
+    Arguments:
+        cases       list    case names from CASES, None for all
+        sizes       list    subcells per side (NB) of each run, None for SIZES
+        repeat      int     timed runs of each case, the best is kept
+        progress    bool    print progress to stderr
+
+    Outputs:
+        results     dict    'meta' describing the machine, and 'results' with one dict per
+                            case and size: 'case', 'NB', 'shape', 'seconds' (best), 'times',
+                            'peak_rss_mb' (peak resident memory growth of the runs), 'prep_rss_mb'
+                            (peak resident memory after preparing the inputs), 'alloc_peak_mb'
+                            (largest traced allocation total during a run), 'alloc_kept_mb' (still
+                            held by its result) and 'error'; the resident memory is None on
+                            platforms without the resource module
+    """
+    # Import Modules
+    import multiprocessing
+    import sys
+    from concurrent.futures import ProcessPoolExecutor
+
+    cases = CASES if cases is None else list(cases)
+    sizes = SIZES if sizes is None else list(sizes)
+    unknown = [name for name in cases if name not in CASES]
+    if unknown:
+        raise ValueError(f"Unknown benchmark cases {unknown}, expected any of {CASES}.")
+
+    # One fresh process per case
+    results = []
+    context = multiprocessing.get_context('spawn')
+    for NB in sizes:
+        for name in cases:
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                try:
+                    result = pool.submit(_Measure, name, NB, repeat).result()
+                except Exception as e:
+                    result = {'case': name, 'NB': NB, 'error': f"{type(e).__name__}: {e}"}
+            results.append(result)
+            if progress:
+                rss = '' if result.get('peak_rss_mb') is None else f", {result['peak_rss_mb']:.0f} MB peak"
+                status = result['error'] or f"{result['seconds']:.4f} s" + rss
+                print(f"{name:>8} NB={NB:<6} {status}", file=sys.stderr)
+
+    return {'meta': _Meta(repeat), 'results': results}
+
+
+def Compare(results, baseline, tolerance=0.25, floor=0.005, mb_floor=1.):
+    """
+    Compare benchmark results against a saved baseline.
+
+    A case regresses when its best time or its peak allocation grows by more than the
+    tolerance and by more than a floor, so noise on tiny runs is not flagged. A case
+    that ran in the baseline and fails now also regresses; one whose RUC shape changed
+    is only marked as resized.
+
+    Arguments:
+        results     dict    results of Benchmark
+        baseline    dict    results of an earlier Benchmark
+        tolerance   float   allowed relative growth, 0.25 for 25 %
+        floor       float   smallest growth in seconds that counts as slower
+        mb_floor    float   smallest growth in peak allocation, in MB, that counts as heavier
+
+    Outputs:
+        rows    list    one dict per case and size found in both: 'case', 'NB', 'base',
+                        'seconds', 'ratio', 'alloc_ratio' and 'status' ('regression',
+                        'faster', 'same' or 'resized')
+    """
+    base = {(r['case'], r['NB']): r for r in baseline['results']}
+
+    rows = []
+    for r in results['results']:
+        b = base.get((r['case'], r['NB']))
+        if b is None or b['error']:
+            continue
+        row = {'case': r['case'], 'NB': r['NB'], 'base': b['seconds'], 'seconds': r.get('seconds'),
+               'ratio': None, 'alloc_ratio': None, 'status': 'regression'}
+
+        # -- Failing now, where the baseline ran
+        if r['error']:
+            rows.append(row)
+            continue
+
+        # -- Not comparable once the case builds a different RUC
+        if r['shape'] != b['shape']:
+            row['status'] = 'resized'
+            rows.append(row)
+            continue
+
+        # -- Time and allocations relative to the baseline
+        row['ratio'] = r['seconds'] / b['seconds'] if b['seconds'] > 0 else 1.
+        if b['alloc_peak_mb'] > 0:
+            row['alloc_ratio'] = r['alloc_peak_mb'] / b['alloc_peak_mb']
+        slower = row['ratio'] > 1 + tolerance and r['seconds'] - b['seconds'] > floor
+        heavier = (row['alloc_ratio'] is not None and row['alloc_ratio'] > 1 + tolerance
+                   and r['alloc_peak_mb'] - b['alloc_peak_mb'] > mb_floor)
+        faster = row['ratio'] < 1 / (1 + tolerance) and b['seconds'] - r['seconds'] > floor
+        row['status'] = 'regression' if slower or heavier else 'faster' if faster else 'same'
+        rows.append(row)
+
+    return rows
+
+
+def main(argv=None):
+    """
+    Command line entry point: python -m Bench.Benchmark -o bench.json -b baseline.json
+    """
+    # Import Modules
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Benchmark the RUC generators, readers and writers.")
+    parser.add_argument('-o', '--output', default='benchmark.json', help="results file (default: benchmark.json)")
+    parser.add_argument('-c', '--cases', default=None, help="comma separated cases (default: all)")
+    parser.add_argument('-s', '--sizes', default=None, help="comma separated NB values (default: 10,100,1000,10000)")
+    parser.add_argument('-r', '--repeat', type=int, default=3, help="timed runs per case (default: 3)")
+    parser.add_argument('-b', '--baseline', default=None, help="baseline results to compare against")
+    parser.add_argument('-t', '--tolerance', type=float, default=0.25, help="allowed relative slowdown (default: 0.25)")
+    parser.add_argument('-q', '--quiet', action='store_true', help="do not print progress")
+    args = parser.parse_args(argv)
+
+    cases = None if args.cases is None else [c.strip() for c in args.cases.split(',') if c.strip()]
+    sizes = None if args.sizes is None else [int(s) for s in args.sizes.split(',') if s.strip()]
+    results = Benchmark(cases, sizes, args.repeat, not args.quiet)
+    with open(args.output, 'w') as fid:
+        json.dump(results, fid, indent=1)
+
+    # Flag regressions against the baseline
+    if args.baseline is None:
+        return 1 if any(r['error'] for r in results['results']) else 0
+    with open(args.baseline) as fid:
+        baseline = json.load(fid)
+    rows = Compare(results, baseline, args.tolerance)
+    for row in rows:
+        ratio = f"x{row['ratio']:.2f}" if row['ratio'] is not None else '-' if row['status'] == 'resized' else 'failed'
+        print(f"{row['case']:>8} NB={row['NB']:<6} {row['base']:.4f} s -> {ratio:>7}  {row['status']}")
+
+    return 1 if any(row['status'] == 'regression' for row in rows) else 0
+
+
+def _Measure(name, NB, repeat):
+    """
+    Prepare one case and measure it, in the worker process.
+    """
+    # Import Modules
+    import time
+    import traceback
+    import tracemalloc
+
+    result = {'case': name, 'NB': NB, 'shape': None, 'seconds': None, 'times': [],
+              'peak_rss_mb': None, 'prep_rss_mb': None, 'alloc_peak_mb': None, 'alloc_kept_mb': None,
+              'error': ''}
+    try:
+        # -- Load the modules of the case with a small run, so their memory is not counted
+        _Case(name, 10)[0]()
+        run, shape = _Case(name, NB)
+        result['prep_rss_mb'] = _PeakRSS()
+
+        # -- One untimed run to warm up imports and caches (and size the RUC of a generator)
+        kept = run()
+        result['shape'] = list(kept[0].shape if shape is None else shape)
+        del kept
+
+        # -- Best wall time of the timed runs
+        for _ in range(max(repeat, 1)):
+            start = time.perf_counter()
+            run()
+            result['times'].append(time.perf_counter() - start)
+        result['seconds'] = min(result['times'])
+
+        # -- Allocations of one traced run
+        tracemalloc.start()
+        kept = run()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del kept
+        result['alloc_peak_mb'] = peak / 1024**2
+        result['alloc_kept_mb'] = current / 1024**2
+    except Exception:
+        result['error'] = traceback.format_exc(limit=3).strip().splitlines()[-1]
+
+    # Peak resident memory of the runs, above the peak of preparing them
+    peak = _PeakRSS()
+    if peak is not None and result['prep_rss_mb'] is not None:
+        result['peak_rss_mb'] = peak - result['prep_rss_mb']
+
+    return result
+
+
+def _PeakRSS():
+    """
+    Peak resident memory of this process in MB, None without the resource module (Windows).
+    """
+    # Import Modules
+    import sys
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    # ru_maxrss is in bytes on macOS and in kB elsewhere
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024**2 if sys.platform == 'darwin' else peak / 1024
+
+
+def _Case(name, NB):
+    """
+    Build the call timed for one case at NB subcells per side, and the RUC shape.
+
+    Generator parameters are chosen so the RUC is about NB subcells wide; their shape
+    is None, taken from the warm-up run. Readers and writers work on a Hex1 RUC at
+    VF 0.5; readers parse a file written beforehand.
+    """
+    # Import Modules
+    import importlib
+    import math
+    import tempfile
+    from Batch.Sweep import GENERATORS
+
+    VF = 0.5
+
+    # Generators
+    if name in GENERATORS:
+        module, func = GENERATORS[name]
+        func = getattr(importlib.import_module(module), func)
+
+        # -- Graded subcells: fine at the fiber edge, about NB subcells of the unit width in the bulk
+        Wh = math.sqrt(2 * math.pi / (VF * math.sqrt(3)))
+        Ws = math.sqrt(math.pi / VF)
+        params = {
+            'Hex1': dict(VF=VF, NB=NB),
+            'Hex2': dict(VF=VF, R=NB * math.sqrt(VF * math.sqrt(3) / (2 * math.pi))),
+            'Hex3': dict(NB=NB, R=NB / 4),
+            'Hex4': dict(VF=VF, R=1., fine=Wh / (4 * NB), coarse=Wh / NB),
+            'Square1': dict(VF=VF, NB=NB),
+            'Square2': dict(VF=VF, R=NB * math.sqrt(VF / math.pi)),
+            'Square3': dict(NB=NB, R=NB / 4),
+            'Square4': dict(VF=VF, R=1., fine=Ws / (4 * NB), coarse=Ws / NB),
+            'Random1': dict(VF=VF, R=max(NB / 20, 1.), NB=NB, seed=0),
+            }[name]
+        return lambda: func(F=1, M=2, **params), None
+
+    # Readers and writers of one Hex1 RUC
+    from Hexagonal.Hex1 import Hex1
+    mask, out = Hex1(VF, NB, 1, 2)
+    if name == 'WriteCSV':
+        from Write.WriteCSV import WriteCSV
+        return lambda: WriteCSV(mask), mask.shape
+    if name == 'WriteRUC':
+        from Write.WriteRUC import WriteRUC
+        return lambda: WriteRUC(mask), mask.shape
+    if name == 'WriteRLE':
+        from Write.WriteRLE import WriteRLE
+        return lambda: WriteRLE(mask), mask.shape
+    if name == 'WriteNPZ':
+        from Write.WriteNPZ import WriteNPZ
+        return lambda: WriteNPZ(mask, out), mask.shape
+    if name == 'ReadCSV':
+        from Write.WriteCSV import WriteCSV
+        from Read.ReadCSV import ReadCSV
+        content = WriteCSV(mask)
+        return lambda: ReadCSV(content), mask.shape
+    if name == 'ReadRUC':
+        from Write.WriteRUC import WriteRUC
+        from Read.ReadRUC import ReadRUC
+        content = WriteRUC(mask)
+        return lambda: ReadRUC(content), mask.shape
+    if name == 'ReadRLE':
+        from Write.WriteRLE import WriteRLE
+        from Read.ReadRLE import ReadRLE
+        content = WriteRLE(mask)
+        return lambda: ReadRLE(content), mask.shape
+
+    # Memory-mapped from a file, the way large archives are read
+    from Write.WriteNPZ import WriteNPZFile
+    from Read.ReadNPZ import ReadNPZFile
+    fid = tempfile.NamedTemporaryFile(suffix='.npz')
+    WriteNPZFile(mask, fid.name, out)
+    return lambda: ReadNPZFile(fid.name), mask.shape
+
+
+def _Meta(repeat):
+    """
+    Describe the machine and software the benchmark ran on.
+    """
+    # Import Modules
+    import os
+    import platform
+    import time
+    import numpy as np
+
+    return {
+            'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'processor': platform.processor(),
+            'cpus': os.cpu_count(),
+            'repeat': repeat,
+            }
+
+
+if __name__ == '__main__':
+    import sys
+    sys.exit(main())
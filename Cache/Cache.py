@@ -0,0 +1,244 @@
+# Import Modules
+import contextvars
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from Trace.Trace import Stage
+
+# Process-wide LRU shared by every Streamlit session
+_CACHE = OrderedDict()
+_LOCK = threading.RLock()
+_STATE = {'bytes': 0, 'limit': 1024**3}
+
+# Background writer jobs that have not finished yet
+_POOL = ThreadPoolExecutor(max_workers=2)
+_JOBS = {}
+
+
+def CachedGenerate(func, **params):
+    """
+    Run a generator, reusing the result of an earlier call with the same parameters.
+
+    Arguments:
+        func    function    generator function (Hex1, Square2, ...)
+        params  dict        keyword arguments of the generator
+
+    Outputs:
+        mask    2D array    read-only integer array defining the microstructure, or a RLE dict
+                            of read-only arrays
+        out     dict        dictionary of actual microstructure properties, a copy of the cached one
+    """
+    # Import Modules
+    import copy
+
+    key = ('generate', func.__module__, func.__qualname__, _Canonical(params))
+
+    hit = _Get(key)
+    if hit is None:
+        with Stage(func.__name__, **params):
+            mask, out = func(**params)
+
+        # The mask is shared by every caller, so its arrays are made read-only
+        if isinstance(mask, dict):
+            for name in ('values', 'lengths', 'rows'):
+                mask[name].flags.writeable = False
+            nbytes = mask['values'].nbytes + mask['lengths'].nbytes + mask['rows'].nbytes
+        else:
+            mask.flags.writeable = False
+            nbytes = mask.nbytes
+        hit = (mask, out)
+        _Put(key, hit, nbytes)
+
+    # Callers get their own RLE dict and out dict (out['H'], out['L'], ... are small)
+    mask = dict(hit[0]) if isinstance(hit[0], dict) else hit[0]
+
+    return mask, copy.deepcopy(hit[1])
+
+
+def CachedWrite(writer, mask, digest=None, **params):
+    """
+    Serialize a mask, reusing the output of an earlier call on identical content.
+
+    Arguments:
+        writer  function    writer function (WriteCSV, WriteRUC, ...)
+        mask    2D array    integer array defining the microstructure
+        digest  str         content hash of the mask from MaskDigest, computed if None
+        params  dict        further keyword arguments of the writer (H, L, ...)
+
+    Outputs:
+        data    str         output of the writer
+    """
+    # Import Modules
+    import sys
+
+    if digest is None:
+        digest = MaskDigest(mask)
+    key = ('write', writer.__module__, writer.__qualname__, digest, _Canonical(params))
+
+    data = _Get(key)
+    if data is None:
+        with Stage(writer.__name__, shape=mask['shape'] if isinstance(mask, dict) else mask.shape):
+            data = writer(mask, **params)
+        _Put(key, data, sys.getsizeof(data))
+
+    return data
+
+
+def PrefetchWrite(writer, mask, digest=None, **params):
+    """
+    Serialize a mask in the background, storing the output in the cache.
+
+    Calls for content that is already cached or already being serialized return the
+    existing result instead of starting another job.
+
+    Arguments:
+        writer  function    writer function (WriteCSV, WriteRUC, ...)
+        mask    2D array    integer array defining the microstructure; must not be modified
+        digest  str         content hash of the mask from MaskDigest, computed if None
+        params  dict        further keyword arguments of the writer (H, L, ...)
+
+    Outputs:
+        job     Future      future holding the output of the writer
+    """
+    if digest is None:
+        digest = MaskDigest(mask)
+    key = ('write', writer.__module__, writer.__qualname__, digest, _Canonical(params))
+
+    # Serve finished output straight from the cache
+    data = _Get(key)
+    if data is not None:
+        job = Future()
+        job.set_result(data)
+        return job
+
+    # Reuse or start the background job
+    with _LOCK:
+        job = _JOBS.get(key)
+        if job is None:
+            # -- in a copy of the caller's context, so its stages reach the caller's trace
+            job = _POOL.submit(contextvars.copy_context().run, CachedWrite, writer, mask, digest, **params)
+            _JOBS[key] = job
+            job.add_done_callback(lambda f: _Finish(key))
+
+    return job
+
+
+def MaskDigest(mask):
+    """
+    Hash the content, shape and dtype of a mask.
+
+    A RLE dict is hashed on its runs, so it never matches the dense mask it encodes.
+
+    Arguments:
+        mask    2D array    integer array defining the microstructure, or a RLE dict
+
+    Outputs:
+        digest  str         hexadecimal content hash
+    """
+    # Import Modules
+    import hashlib
+    import numpy as np
+
+    h = hashlib.blake2b(digest_size=16)
+    if isinstance(mask, dict):
+        h.update(f"rle{tuple(mask['shape'])}".encode())
+        for name in ('values', 'lengths', 'rows'):
+            part = np.ascontiguousarray(mask[name])
+            h.update(f"{name}{part.dtype.str}{part.shape}".encode())
+            h.update(memoryview(part).cast('B'))
+        return h.hexdigest()
+
+    mask = np.ascontiguousarray(mask)
+    h.update(f"{mask.dtype.str}{mask.shape}".encode())
+    h.update(memoryview(mask).cast('B'))
+
+    return h.hexdigest()
+
+
+def CacheLimit(max_bytes):
+    """
+    Set the size of the cache in bytes, evicting least recently used entries to fit.
+
+    Arguments:
+        max_bytes   int     cache budget in bytes
+    """
+    with _LOCK:
+        _STATE['limit'] = max_bytes
+        _Evict()
+
+
+def ClearCache():
+    """
+    Remove every entry from the cache.
+    """
+    with _LOCK:
+        _CACHE.clear()
+        _STATE['bytes'] = 0
+
+
+def _Canonical(params):
+    """
+    Convert keyword arguments into a hashable key that ignores argument order and
+    NumPy scalar and array types. Nested lists and dicts are converted too.
+    """
+    items = []
+    for name in sorted(params):
+        value = _Plain(params[name])
+        items.append((name, type(value).__name__, value))
+
+    return tuple(items)
+
+
+def _Plain(value):
+    """
+    Hashable plain Python version of a parameter value.
+    """
+    if hasattr(value, 'tolist'):
+        value = value.tolist()
+    if isinstance(value, dict):
+        return _Canonical(value)
+    if isinstance(value, (list, tuple)):
+        return tuple(_Plain(v) for v in value)
+
+    return value
+
+
+def _Finish(key):
+    """
+    Forget a finished background job; its output now lives in the cache.
+    """
+    with _LOCK:
+        _JOBS.pop(key, None)
+
+
+def _Get(key):
+    """
+    Look up an entry and mark it as most recently used.
+    """
+    with _LOCK:
+        if key not in _CACHE:
+            return None
+        _CACHE.move_to_end(key)
+        return _CACHE[key][0]
+
+
+def _Put(key, value, nbytes):
+    """
+    Store an entry and evict least recently used entries beyond the budget.
+    """
+    with _LOCK:
+        if nbytes > _STATE['limit']:
+            return
+        if key in _CACHE:
+            _STATE['bytes'] -= _CACHE.pop(key)[1]
+        _CACHE[key] = (value, nbytes)
+        _STATE['bytes'] += nbytes
+        _Evict()
+
+
+def _Evict():
+    """
+    Drop least recently used entries until the cache fits its budget.
+    """
+    while _CACHE and _STATE['bytes'] > _STATE['limit']:
+        _STATE['bytes'] -= _CACHE.popitem(last=False)[1][1]
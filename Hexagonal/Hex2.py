@@ -1,12 +1,18 @@
-def Hex2(VF, R, F, M):
+def Hex2(VF, R, F, M, fill='grid', max_bytes=None, coating=None, path=None):
     """
     Generate a hexagonal pack microstructure by defining the volume fraction and radius in subcells.
 
     Arguments:
-        VF  float   desired volume fraction
-        R   float   radius of the fiber in subcells
-        F   int     material ID of the fiber
-        M   int     material ID of the matrix
+        VF         float   desired volume fraction
+        R          float   radius of the fiber in subcells
+        F          int     material ID of the fiber
+        M          int     material ID of the matrix
+        fill       str     fiber fill mode, 'grid' (distance test), 'scan' (row intervals), 'area' (fiber area), 'rle' (row intervals, run-length encoded mask) or 'tiles' (row bands into a disk-backed np.memmap)
+        max_bytes  int     optional memory budget for the mask in bytes
+        coating    list    optional (thickness, ID) of each coating layer around the fibers, innermost first,
+                           thickness in subcells; needs the 'grid' or 'scan' fill mode
+        path       str     optional .npy file that keeps the 'tiles' mask on disk after the run, or a
+                           directory to hold its temporary file; None for the system temporary directory
 
     Outputs:
         mask    2D array    integer array defining the microstructure
@@ -15,6 +21,8 @@ def Hex2(VF, R, F, M):
 
     # Import modules
     import numpy as np
+    from Raster.Rasterize import Rasterize, CoatingLayers
+    from Raster.Properties import Properties
 
     # Calculate the spacing vector length
     n = np.sqrt((2*np.pi*R**2)/(VF*np.sqrt(3)))
@@ -48,34 +56,11 @@ def Hex2(VF, R, F, M):
     # Create subcell centers
     xs = xmin + (np.arange(nx) + 0.5) * dx
     ys = ymin + (np.arange(ny) + 0.5) * dy
-    X, Y = np.meshgrid(xs, ys)
-
-    # Integer grid: start all zeros
-    mask = M * np.ones((ny, nx), dtype=int)
 
     # Fill fibers
-    for c in centers:
-        inside = (X - c[0])**2 + (Y - c[1])**2 <= R**2
-        mask[inside] = F
+    mask = Rasterize(xs, ys, centers, R**2, F, M, fill, max_bytes, layers=CoatingLayers(R, coating), path=path)
 
     # Calculate actual values
-    out = {
-            'VF':None,
-           'R':None,
-           'NB':None,
-           'NG':None,
-           'F':F,
-           'M':M
-           }
-    
-    # Calculate Volume Fraction
-    out['VF'] = np.sum(mask == F) / (nx * ny)
-
-    # Calculate Radius
-    out['R'] = np.sum(mask[:,int(nx/2)] == F)/2
-
-    # Calculate subcell dimensions
-    out['NB'] = nx
-    out['NG'] = ny
+    out = Properties(mask, F, M)
 
     return mask, out
\ No newline at end of file
@@ -1,19 +1,79 @@
-def Hex3(NB, R, F, M):
+def Hex3(NB, R, F, M, fill='grid', max_bytes=None, coating=None, path=None):
     """
     Generate a hexagonal pack microstructure by defining the subcell width and radius in subcells.
 
     Arguments:
-        NB  int     number of subcells in the beta direction
-        R   float   radius of the fiber in subcells
-        F   int     material ID of the fiber
-        M   int     material ID of the matrix
+        NB         int     number of subcells in the beta direction
+        R          float   radius of the fiber in subcells
+        F          int     material ID of the fiber
+        M          int     material ID of the matrix
+        fill       str     fiber fill mode, 'grid' (distance test), 'scan' (row intervals), 'area' (fiber area), 'rle' (row intervals, run-length encoded mask) or 'tiles' (row bands into a disk-backed np.memmap)
+        max_bytes  int     optional memory budget for the mask in bytes
+        coating    list    optional (thickness, ID) of each coating layer around the fibers, innermost first,
+                           thickness in subcells; needs the 'grid' or 'scan' fill mode
+        path       str     optional .npy file that keeps the 'tiles' mask on disk after the run, or a
+                           directory to hold its temporary file; None for the system temporary directory
 
     Outputs:
         mask    2D array    integer array defining the microstructure
         out     dict        dictionary of actual microstructure properties
     """
+    # Import Modules
+    from Raster.Rasterize import Rasterize, CoatingLayers
+    from Raster.Properties import Properties
 
-    # Import modules
+    # Define the grid, circle centers and fiber radius
+    xs, ys, centers, R = _Hex3Geometry(NB, R)
+
+    # Fill fibers
+    mask = Rasterize(xs, ys, centers, R**2, F, M, fill, max_bytes, layers=CoatingLayers(R, coating), path=path)
+
+    # Calculate actual values
+    out = Properties(mask, F, M)
+
+    return mask, out
+
+
+def Hex3Batch(NB, R, F, M, max_bytes=None):
+    """
+    Generate hexagonal pack microstructures for many fiber radii at one subcell width.
+
+    The squared distance to the nearest fiber center is computed once per grid and
+    each mask thresholds it, giving the same masks as calling Hex3 for each value.
+
+    Arguments:
+        NB         int     number of subcells in the beta direction
+        R          array   radii of the fiber in subcells
+        F          int     material ID of the fiber
+        M          int     material ID of the matrix
+        max_bytes  int     optional memory budget for each mask in bytes
+
+    Outputs:
+        mask    2D array    integer array defining the microstructure, one per R
+        out     dict        dictionary of actual microstructure properties, one per R
+    """
+    # Import Modules
+    import itertools
+    from Raster.Rasterize import RasterizeMany
+    from Raster.Properties import Properties
+
+    # Values on the same grid share one distance field
+    runs = [_Hex3Geometry(NB, value) for value in R]
+    for _, group in itertools.groupby(runs, key=lambda run: (len(run[0]), len(run[1]))):
+        group = list(group)
+        xs, ys, centers, _ = group[0]
+        R2s = [run[3]**2 for run in group]
+
+        # Threshold the field at every radius
+        for mask in RasterizeMany(xs, ys, centers, R2s, F, M, max_bytes):
+            yield mask, Properties(mask, F, M)
+
+
+def _Hex3Geometry(NB, R):
+    """
+    Subcell centers, circle centers and fiber radius of a Hex3 microstructure.
+    """
+    # Import Modules
     import numpy as np
 
     # Enforce minimum NB
@@ -53,34 +113,6 @@ def Hex3(NB, R, F, M):
     # Create subcell centers
     xs = xmin + (np.arange(nx) + 0.5) * dx
     ys = ymin + (np.arange(ny) + 0.5) * dy
-    X, Y = np.meshgrid(xs, ys)
-
-    # Integer grid: start all zeros
-    mask = M * np.ones((ny, nx), dtype=int)
-
-    # Fill fibers
-    for c in centers:
-        inside = (X - c[0])**2 + (Y - c[1])**2 <= R**2
-        mask[inside] = F
-
-    # Calculate actual values
-    out = {
-            'VF':None,
-           'R':None,
-           'NB':None,
-           'NG':None,
-           'F':F,
-           'M':M
-           }
-    
-    # Calculate Volume Fraction
-    out['VF'] = np.sum(mask == F) / (nx * ny)
-
-    # Calculate Radius
-    out['R'] = np.sum(mask[:,int(nx/2)] == F)/2
 
-    # Calculate subcell dimensions
-    out['NB'] = nx
-    out['NG'] = ny
 
-    return mask, out
\ No newline at end of file
+    return xs, ys, centers, R
@@ -0,0 +1,150 @@
+def PlotRUC(mask, colorscale, show_grid, max_cells=200, max_pixels=1024, mode='majority', H=None, L=None):
+    """
+    Create the Plotly figure of a RUC, reducing the level of detail for large masks.
+
+    Masks up to max_cells subcells per side are drawn as a per-subcell heatmap. Larger
+    masks are pooled on the server to at most max_pixels per side and sent as a single
+    PNG image. Grid lines are only drawn while every subcell is large enough to show them.
+    Given subcell dimensions, the heatmap draws every subcell at its true size; the
+    image of a large mask always shows equal subcells.
+
+    Arguments:
+        mask        2D array    integer array defining the microstructure
+        colorscale  list        Plotly colorscale spanning the smallest to the largest material ID
+        show_grid   bool        draw gaps between subcells
+        max_cells   int         largest side, in subcells, drawn as a heatmap
+        max_pixels  int         largest side, in pixels, of the image of a large mask
+        mode        str         pooling of large masks, 'majority' or 'mean' (phase fraction)
+        H           1D array    optional height of each row of subcells
+        L           1D array    optional length of each column of subcells
+
+    Outputs:
+        fig     Figure      Plotly figure of the microstructure
+        scale   int         subcells per side of each drawn cell or pixel
+    """
+    # Import Modules
+    import numpy as np
+    import plotly.graph_objects as go
+    from Raster.Pool import Pool
+
+    mask = np.asarray(mask)
+    ny, nx = mask.shape
+
+    # Small masks: one heatmap cell per subcell
+    if max(ny, nx) <= max_cells:
+        scale = 1
+
+        # Decide on grid spacing
+        if show_grid and max(ny, nx) <= max_cells // 2:
+            xgap = 0.5
+            ygap = 0.5
+        else:
+            xgap = None
+            ygap = None
+
+        # Place subcells at their true size when they differ
+        x = None
+        y = None
+        if H is not None and L is not None and (np.ptp(H) > 0 or np.ptp(L) > 0):
+            x = np.cumsum(L) - np.asarray(L) / 2
+            y = np.cumsum(H) - np.asarray(H) / 2
+
+        # Create Plotly figure
+        fig = go.Figure(data=go.Heatmap(
+            z=mask,
+            x=x,
+            y=y,
+            colorscale=colorscale,
+            showscale=False,
+            xgap=xgap,
+            ygap=ygap
+        ))
+
+    # Large masks: pooled PNG image
+    else:
+        scale = -(-max(ny, nx) // max_pixels)
+        z = Pool(mask, scale, mode)
+        rgb = _Colorize(z, mask.min(), mask.max(), colorscale)
+        fig = go.Figure(data=go.Image(
+            source=_PNG(rgb),
+            dx=scale,
+            dy=scale,
+            x0=(scale - 1) / 2,
+            y0=(scale - 1) / 2,
+            hoverinfo='skip'
+        ))
+
+    # Layout tweaks
+    fig.update_layout(
+        xaxis=dict(showticklabels=False, showgrid=False, zeroline=False, scaleanchor="y", constrain='domain'),
+        yaxis=dict(showticklabels=False, showgrid=False, zeroline=False, autorange='reversed', scaleanchor="x"),
+        margin=dict(l=0, r=0, t=0, b=0)
+    )
+
+    return fig, scale
+
+
+def PhaseColorscale(colors):
+    """
+    Build a stepped Plotly colorscale that draws every material ID in its own color.
+
+    The colorscale spans the smallest to the largest ID, as PlotRUC expects, and
+    changes color halfway between neighboring IDs.
+
+    Arguments:
+        colors  dict    color of each material ID in the mask
+
+    Outputs:
+        colorscale  list    Plotly colorscale
+    """
+    ids = sorted(colors)
+    lo = ids[0]
+    hi = ids[-1]
+    if lo == hi:
+        return [[0, colors[lo]], [1, colors[lo]]]
+
+    # Hold each color up to the midpoint with the next ID
+    colorscale = [[0, colors[lo]]]
+    for a, b in zip(ids[:-1], ids[1:]):
+        t = ((a + b) / 2 - lo) / (hi - lo)
+        colorscale.append([t, colors[a]])
+        colorscale.append([t, colors[b]])
+    colorscale.append([1, colors[hi]])
+
+    return colorscale
+
+
+def _Colorize(z, zmin, zmax, colorscale):
+    """
+    Map values onto RGB colors by linear interpolation of a Plotly colorscale.
+    """
+    # Import Modules
+    import numpy as np
+    from PIL import ImageColor
+
+    stops = np.array([float(s[0]) for s in colorscale])
+    colors = np.array([ImageColor.getrgb(s[1])[:3] for s in colorscale], dtype=float)
+
+    # Normalize the values the same way the heatmap does
+    t = np.zeros(z.shape) if zmax == zmin else (z - float(zmin)) / (float(zmax) - float(zmin))
+
+    rgb = np.empty(z.shape + (3,), dtype=np.uint8)
+    for c in range(3):
+        rgb[..., c] = np.round(np.interp(t, stops, colors[:, c]))
+
+    return rgb
+
+
+def _PNG(rgb):
+    """
+    Encode an RGB array as a PNG data URI.
+    """
+    # Import Modules
+    import base64
+    import io
+    from PIL import Image
+
+    buf = io.BytesIO()
+    Image.fromarray(rgb).save(buf, format='PNG', optimize=True)
+
+    return 'data:image/png;base64,' + base64.b64encode(buf.getvalue()).decode('ascii')
@@ -0,0 +1,183 @@
+def Random1(VF, R, NB, F, M, seed=None, gap=0., fill='grid', max_bytes=None, coating=None, path=None):
+    """
+    Generate a random fiber microstructure by defining the volume fraction, radius in subcells and subcell dimensions.
+
+    Fibers are placed by random sequential addition in a periodic square RUC. When the
+    addition stalls before every fiber fits, the rest are dropped in at random and the
+    overlapping fibers are pushed and shaken apart. Fibers crossing the RUC edges wrap
+    around to the opposite side.
+
+    Arguments:
+        VF         float   desired volume fraction
+        R          float   radius of the fiber in subcells
+        NB         int     number of subcells in the beta and gamma directions
+        F          int     material ID of the fiber
+        M          int     material ID of the matrix
+        seed       int     seed of the random number generator, None for a random layout
+        gap        float   smallest distance between fiber edges in subcells
+        fill       str     fiber fill mode, 'grid' (distance test), 'scan' (row intervals), 'area' (fiber area), 'rle' (row intervals, run-length encoded mask) or 'tiles' (row bands into a disk-backed np.memmap)
+        max_bytes  int     optional memory budget for the mask in bytes
+        coating    list    optional (thickness, ID) of each coating layer around the fibers, innermost first,
+                           thickness in subcells; needs the 'grid' or 'scan' fill mode
+        path       str     optional .npy file that keeps the 'tiles' mask on disk after the run, or a
+                           directory to hold its temporary file; None for the system temporary directory
+
+    Outputs:
+        mask    2D array    integer array defining the microstructure
+        out     dict        dictionary of actual microstructure properties
+    """
+    # Import Modules
+    import numpy as np
+    from Raster.Rasterize import Rasterize, CoatingLayers
+    from Raster.Properties import Properties
+    from Trace.Trace import Stage
+
+    # Number of fibers for the desired volume fraction
+    L = float(NB)
+    N = int(round(VF * L**2 / (np.pi * R**2)))
+    if N > 0 and N * (np.pi / 4) * (2*R + gap)**2 > np.pi / (2*np.sqrt(3)) * L**2:
+        raise ValueError(f"{N} fibers of radius {R} with a gap of {gap} do not fit in a {NB} x {NB} RUC.")
+
+    # Place the fibers
+    rng = np.random.default_rng(seed)
+    with Stage('packing', N=N):
+        centers = _Pack(N, L, 2*R + gap, rng)
+
+    # Add the periodic images of fibers crossing the RUC edges, coatings included
+    reach = R + sum(layer[0] for layer in coating or [])
+    images = [centers]
+    for sx in (-L, 0., L):
+        for sy in (-L, 0., L):
+            if sx == 0. and sy == 0.:
+                continue
+            shifted = centers + [sx, sy]
+            near = np.all((shifted > -reach) & (shifted < L + reach), axis=1)
+            images.append(shifted[near])
+    images = np.concatenate(images)
+
+    # Create subcell centers
+    xs = np.arange(NB) + 0.5
+    ys = np.arange(NB) + 0.5
+
+    # Fill fibers
+    mask = Rasterize(xs, ys, images, R**2, F, M, fill, max_bytes, layers=CoatingLayers(R, coating), path=path)
+
+    # Calculate actual values (the radius is the placed radius, not a measured one)
+    out = Properties(mask, F, M)
+    out['R'] = R
+    out['N'] = N
+    out['centers'] = centers
+
+    return mask, out
+
+
+def _Pack(N, L, d, rng, attempts=200, sweeps=10000):
+    """
+    Place N points in a periodic L x L square at least d apart.
+
+    Random sequential addition uses a uniform grid hash with cells at least d wide, so
+    every overlap check only looks at the 3 x 3 neighboring cells. Once a point cannot
+    be added in the given number of attempts, the remaining points are dropped at
+    random and every overlapping pair is pushed apart until none is left, with a small
+    random shake whenever the pushing stalls.
+    """
+    # Import Modules
+    import math
+    import numpy as np
+
+    # Uniform grid hash
+    m = max(1, int(L // d))
+    size = L / m
+    cells = {}
+    pts = rng.random((N, 2)) * L
+
+    # Random sequential addition
+    for n in range(N):
+        for _ in range(attempts):
+            x, y = pts[n]
+            i = int(x / size) % m
+            j = int(y / size) % m
+            keys = {((i + di) % m, (j + dj) % m) for di in (-1, 0, 1) for dj in (-1, 0, 1)}
+            clear = True
+            for key in keys:
+                for k in cells.get(key, ()):
+                    dx = x - pts[k, 0]
+                    dy = y - pts[k, 1]
+                    dx -= L * round(dx / L)
+                    dy -= L * round(dy / L)
+                    if dx*dx + dy*dy < d*d:
+                        clear = False
+                        break
+                if not clear:
+                    break
+            if clear:
+                cells.setdefault((i, j), []).append(n)
+                break
+            pts[n] = rng.random(2) * L
+        else:
+            break
+
+    # Push overlapping pairs apart
+    worst = math.inf
+    for sweep in range(sweeps):
+        i, j, dv, dist = _Overlaps(pts, L, d)
+        if len(i) == 0:
+            return pts
+
+        # Move both points of each pair half the overlap apart (slightly more to settle)
+        dist = np.maximum(dist, 1e-12 * d)
+        move = dv * ((1.001 * d - dist) / (2 * dist))[:, None]
+        shift = np.zeros_like(pts)
+        np.add.at(shift, i, move)
+        np.add.at(shift, j, -move)
+        pts = (pts + shift) % L
+
+        # Shake when the largest overlap stops shrinking
+        if sweep % 50 == 49:
+            overlap = d - dist.min()
+            if overlap > 0.9 * worst:
+                pts = (pts + rng.normal(0., 0.02 * d, pts.shape)) % L
+            worst = overlap
+
+    raise ValueError(f"Could not pack {N} fibers {d:g} apart in a {L:g} x {L:g} RUC; try a lower VF or a larger NB.")
+
+
+def _Overlaps(pts, L, d):
+    """
+    Find every pair of points closer than d in a periodic L x L square with a uniform
+    grid hash of cells at least d wide.
+    """
+    # Import Modules
+    import numpy as np
+
+    # Sort the points by hash cell
+    N = len(pts)
+    m = max(1, int(L // d))
+    cell = (pts // (L / m)).astype(np.int64) % m
+    key = cell[:, 0] * m + cell[:, 1]
+    order = np.argsort(key, kind='stable')
+    starts = np.searchsorted(key[order], np.arange(m * m))
+    ends = np.searchsorted(key[order], np.arange(m * m), side='right')
+
+    # Candidate pairs from the 3 x 3 neighboring cells
+    I = []
+    J = []
+    for di, dj in {(di % m, dj % m) for di in (-1, 0, 1) for dj in (-1, 0, 1)}:
+        other = ((cell[:, 0] + di) % m) * m + (cell[:, 1] + dj) % m
+        first = starts[other]
+        count = ends[other] - first
+        i = np.repeat(np.arange(N), count)
+        j = order[np.repeat(first - np.cumsum(count) + count, count) + np.arange(count.sum())]
+        keep = i < j
+        I.append(i[keep])
+        J.append(j[keep])
+    i = np.concatenate(I)
+    j = np.concatenate(J)
+
+    # Periodic distances
+    dv = pts[i] - pts[j]
+    dv -= L * np.round(dv / L)
+    dist = np.hypot(dv[:, 0], dv[:, 1])
+    close = dist < d
+
+    return i[close], j[close], dv[close], dist[close]
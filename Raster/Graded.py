@@ -0,0 +1,69 @@
+def Graded(length, centers, R, fine, coarse, ratio=2., mirror=False):
+    """
+    Split a length into subcells sized to the fiber edges that cross it.
+
+    On a grid of subcells, the fiber area mislabeled along an edge grows with the
+    subcell width across the edge, and the edges cross a position along the axis
+    more densely the closer it is to a fiber tangent, where the edge runs along the
+    grid lines. Subcells are sized so every subcell adds about the same error: width
+    is inversely proportional to the square root of that density. This gives the
+    fine width at the tangents, a slow growth away from them, and the coarse width
+    across the fiber middles and the matrix gaps, where the edges cross the grid
+    square on or not at all. Neighboring subcells differ in width by about ratio at
+    most.
+
+    Arguments:
+        length  float       length to split
+        centers list        fiber center positions along the length, repeated periodically
+        R       float       fiber radius
+        fine    float       subcell width at the fiber tangents
+        coarse  float       largest subcell width
+        ratio   float       largest growth in width from one subcell to the next
+        mirror  bool        make the subcells mirror symmetric about the middle
+
+    Outputs:
+        widths  1D array    subcell widths, summing to length
+    """
+    # Import Modules
+    import numpy as np
+
+    if fine <= 0 or coarse < fine or ratio <= 1 or R <= 0:
+        raise ValueError("Graded subcells need R > 0, 0 < fine <= coarse and ratio > 1.")
+
+    # Fibers and their periodic images along the axis
+    centers = np.asarray(centers, dtype=float).ravel()
+    centers = np.concatenate([centers - length, centers, centers + length])
+
+    # Sample the half or whole length well below the fine width
+    end = length / 2 if mirror else length
+    x = np.linspace(0., end, max(int(np.ceil(8 * end / fine)), 16) + 1)
+    step = x[1] - x[0]
+
+    # Density of edge crossings, |cot| of the edge angle summed over the edges at x
+    d = np.abs(x[:, None] - centers[None, :])
+    inside = d < R
+    density = np.where(inside, 2 * d / np.sqrt(np.where(inside, R*R - d*d, 1.)), 0.).sum(axis=1)
+
+    # Target width, fine at one fine width from a tangent, coarse where no edge is steep
+    a = R - min(fine, R / 2)
+    ref = 2 * a / np.sqrt(R*R - a*a)
+    with np.errstate(divide='ignore'):
+        target = np.clip(fine * np.sqrt(ref / density), fine, coarse)
+
+    # Grow by at most ratio per subcell, in both directions
+    slope = (ratio - 1) * step * np.arange(len(x))
+    target = np.minimum(target, np.minimum.accumulate(target - slope) + slope)
+    target = np.minimum(target, (np.minimum.accumulate((target + slope)[::-1]) - slope[::-1])[::-1])
+
+    # Place the subcell edges at equal steps of the integral of 1 / width
+    count = np.concatenate([[0.], np.cumsum((1 / target[1:] + 1 / target[:-1]) / 2 * step)])
+    n = max(int(np.ceil(count[-1] - 1e-9)), 1)
+    edges = np.interp(np.linspace(0., count[-1], n + 1), count, x)
+    edges[0] = 0.
+    edges[-1] = end
+    widths = np.diff(edges)
+
+    if mirror:
+        widths = np.concatenate([widths, widths[::-1]])
+
+    return widths
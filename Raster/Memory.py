@@ -0,0 +1,67 @@
+def MaskDtype(*ids):
+    """
+    Find the smallest integer dtype that holds every material ID.
+
+    Arguments:
+        ids     int     material IDs stored in the mask
+
+    Outputs:
+        dtype   dtype   compact integer dtype (uint8 for IDs up to 255, uint16 up to 65535, ...)
+    """
+    # Import Modules
+    import numpy as np
+
+    lo = min(int(i) for i in ids)
+    hi = max(int(i) for i in ids)
+
+    return np.result_type(np.min_scalar_type(lo), np.min_scalar_type(hi))
+
+
+def CheckBudget(shape, dtype, max_bytes, work=0):
+    """
+    Refuse a mask allocation that would exceed a memory budget.
+
+    Arguments:
+        shape       tuple   (rows, columns) of the mask
+        dtype       dtype   dtype of the mask
+        max_bytes   int     memory budget in bytes, None for no limit
+        work        int     bytes of working arrays held alongside the mask
+
+    Outputs:
+        nbytes      int     size of the mask in bytes
+    """
+    # Import Modules
+    import numpy as np
+
+    nbytes = np.dtype(dtype).itemsize
+    for n in shape:
+        nbytes = nbytes * int(n)
+
+    if max_bytes is not None and nbytes + work > max_bytes:
+        need = f"{nbytes / 1024**2:.1f} MB ({np.dtype(dtype).name})"
+        if work:
+            need = f"{(nbytes + work) / 1024**2:.1f} MB ({np.dtype(dtype).name} mask and working arrays)"
+        raise MemoryError(
+            f"A {shape[0]} x {shape[1]} RUC needs {need}, "
+            f"which exceeds the {max_bytes / 1024**2:.1f} MB budget."
+        )
+
+    return nbytes
+
+
+def RowBlocks(shape, cells=1 << 24):
+    """
+    Split the rows of a mask into blocks of about a given number of subcells, so a
+    large (or disk-backed) mask can be scanned without full-size temporaries.
+
+    Arguments:
+        shape   tuple   (rows, columns) of the mask
+        cells   int     largest number of subcells per block
+
+    Outputs:
+        block   slice   consecutive row slices covering the mask
+    """
+    ny, nx = shape
+    rows = max(1, cells // max(nx, 1))
+    for i in range(0, ny, rows):
+        yield slice(i, min(i + rows, ny))
@@ -0,0 +1,164 @@
+def Phases(mask, F=None, M=None):
+    """
+    Identify the fiber and matrix material IDs of a mask and the fraction of each phase.
+
+    Missing IDs are taken from the mask itself. With more than two phases (coating
+    layers, an interface phase) the fiber and matrix are the two ends of the chain of
+    phases that touch along the rows (see Touching): the pair the most hops apart,
+    the more abundant pair on ties, so coating IDs may be numbered either side of the
+    matrix. A given fiber or matrix pairs with the phase farthest from it; otherwise
+    the smaller ID of the pair is the fiber. A single phase is the matrix, with no
+    fiber (the fiber ID is then 1, or 2 when the matrix is 1). A run-length encoded
+    mask (see Raster.RLE) is counted on its runs.
+
+    Arguments:
+        mask    2D array    integer array defining the microstructure, or a RLE dict
+        F       int         material ID of the fiber, None to infer it
+        M       int         material ID of the matrix, None to infer it
+
+    Outputs:
+        F       int         material ID of the fiber
+        M       int         material ID of the matrix
+        frac    dict        fraction of the subcells held by each material ID
+    """
+    frac = Fractions(mask)
+    if not frac:
+        return F, M, frac
+
+    # Infer the missing phases
+    if F is None or M is None:
+        F, M = _Infer(mask, frac, F, M)
+
+    return F, M, frac
+
+
+def Fractions(mask):
+    """
+    Count the fraction of the subcells held by each material ID, in linear time.
+
+    Arguments:
+        mask    2D array    integer array defining the microstructure, or a RLE dict
+
+    Outputs:
+        frac    dict        fraction of the subcells held by each material ID
+    """
+    # Import Modules
+    import numpy as np
+    from Raster.Memory import RowBlocks
+
+    # Count each material ID in linear time (run lengths of a RLE mask)
+    if isinstance(mask, dict):
+        size = mask['shape'][0] * mask['shape'][1]
+        if size == 0:
+            return {}
+        ids, inv = np.unique(mask['values'], return_inverse=True)
+        counts = np.bincount(inv, weights=mask['lengths'], minlength=len(ids))
+        frac = {int(i): c / size for i, c in zip(ids, counts)}
+    else:
+        mask = np.asarray(mask)
+        if mask.size == 0:
+            return {}
+        lo = int(mask.min())
+        hi = int(mask.max())
+        if hi - lo <= 65535:
+            counts = np.zeros(hi - lo + 1, dtype=np.int64)
+            for rows in RowBlocks(mask.shape):
+                # -- A few IDs: one comparison each beats widening the block for bincount
+                if hi - lo < 8:
+                    counts += [np.count_nonzero(mask[rows] == i) for i in range(lo, hi + 1)]
+                else:
+                    counts += np.bincount(mask[rows].ravel().astype(np.intp) - lo, minlength=hi - lo + 1)
+            ids = np.flatnonzero(counts)
+            frac = {int(i) + lo: counts[i] / mask.size for i in ids}
+        else:
+            ids, counts = np.unique(mask, return_counts=True)
+            frac = {int(i): c / mask.size for i, c in zip(ids, counts)}
+
+    return frac
+
+
+def Touching(mask):
+    """
+    Find which materials touch each other along the rows of a periodic mask.
+
+    Arguments:
+        mask    2D array    integer array defining the microstructure, or a RLE dict
+
+    Outputs:
+        touching    dict    set of the material IDs next to each material ID
+    """
+    # Import Modules
+    import numpy as np
+    from Raster.Memory import RowBlocks
+
+    # Consecutive runs of each row, the last run wrapping around to the first
+    if isinstance(mask, dict):
+        values = mask['values']
+        rows = mask['rows']
+        nxt = np.arange(1, len(values) + 1)
+        ends = rows[1:][rows[1:] > rows[:-1]]
+        nxt[ends - 1] = rows[:-1][rows[1:] > rows[:-1]]
+        pairs = [np.stack([values, values[nxt]], axis=1)]
+
+    # Each subcell and the next one along its row, a block of rows at a time
+    else:
+        mask = np.asarray(mask)
+        pairs = []
+        for rows in RowBlocks(mask.shape):
+            a = np.asarray(mask[rows])
+            b = np.roll(a, -1, axis=1)
+            hit = a != b
+            pairs.append(np.unique(np.stack([a[hit], b[hit]], axis=1), axis=0))
+
+    touching = {}
+    for a, b in np.unique(np.concatenate(pairs), axis=0).tolist():
+        if a != b:
+            touching.setdefault(a, set()).add(b)
+            touching.setdefault(b, set()).add(a)
+
+    return touching
+
+
+def _Infer(mask, frac, F=None, M=None):
+    """
+    Infer the missing fiber or matrix ID from the phases of a mask (see Phases).
+    """
+    keys = sorted(frac)
+
+    # One phase: the matrix, and a fiber ID that is not in the mask
+    if len(keys) == 1:
+        if M is None:
+            M = keys[0] if F != keys[0] else (2 if F != 2 else 1)
+        if F is None:
+            F = 1 if M != 1 else 2
+        return F, M
+
+    # Two phases: the fiber is the smaller ID
+    known = all(i is None or i in frac for i in (F, M))
+    if len(keys) <= 2 or len(keys) > 256 or not known:
+        if F is None:
+            F = next((i for i in keys if i != M), keys[0])
+        if M is None:
+            M = next((i for i in reversed(keys) if i != F), F)
+        return F, M
+
+    # Hops between every two phases through the phases that touch
+    touching = Touching(mask)
+    hops = {}
+    for a in keys:
+        hops[a] = {a: 0}
+        edge = [a]
+        while edge:
+            edge = {c for b in edge for c in touching.get(b, ()) if c not in hops[a]}
+            hops[a].update(dict.fromkeys(edge, len(set(hops[a].values()))))
+    far = lambda a, b: (hops[a].get(b, -1), frac[a] + frac[b])
+
+    # The fiber and matrix end the chain of phases between them (coating layers, interfaces)
+    if F is not None:
+        M = max((i for i in keys if i != F), key=lambda i: far(F, i))
+    elif M is not None:
+        F = max((i for i in keys if i != M), key=lambda i: far(M, i))
+    else:
+        F, M = max(((a, b) for a in keys for b in keys if a < b), key=lambda p: far(*p))
+
+    return F, M
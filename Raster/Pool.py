@@ -0,0 +1,51 @@
+def Pool(mask, f, mode='majority'):
+    """
+    Coarsen a mask by pooling square blocks of subcells.
+
+    Trailing rows and columns that do not fill a whole block are padded by repeating
+    the last subcell.
+
+    Arguments:
+        mask    2D array    integer array defining the microstructure
+        f       int         block size in subcells
+        mode    str         'majority' for the most common material ID of each block
+                            (ties go to the smallest ID), 'mean' for the block average
+
+    Outputs:
+        pooled  2D array    coarsened array of shape ceil(ny/f) x ceil(nx/f)
+    """
+    # Import Modules
+    import numpy as np
+    from Raster.Phases import Fractions
+
+    mask = np.asarray(mask)
+    if f <= 1:
+        return mask.copy() if mode == 'majority' else mask.astype(float)
+
+    # Pad to whole blocks
+    ny, nx = mask.shape
+    by = -(-ny // f)
+    bx = -(-nx // f)
+    if by * f != ny or bx * f != nx:
+        mask = np.pad(mask, ((0, by * f - ny), (0, bx * f - nx)), mode='edge')
+    blocks = mask.reshape(by, f, bx, f)
+
+    # Block average
+    if mode == 'mean':
+        return blocks.mean(axis=(1, 3))
+    if mode != 'majority':
+        raise ValueError(f"Unknown pooling mode '{mode}', expected 'majority' or 'mean'.")
+
+    # Most common material ID of each block
+    ids = sorted(Fractions(mask))
+    if len(ids) == 1:
+        return np.full((by, bx), ids[0], dtype=mask.dtype)
+    best = np.zeros((by, bx), dtype=mask.dtype)
+    most = np.full((by, bx), -1, dtype=np.int64)
+    for i in ids:
+        count = np.count_nonzero(blocks == i, axis=(1, 3))
+        more = count > most
+        best[more] = i
+        most[more] = count[more]
+
+    return best
@@ -0,0 +1,136 @@
+def Properties(mask, F, M, H=None, L=None):
+    """
+    Calculate the actual properties of a generated microstructure.
+
+    With subcell dimensions, the volume fraction is weighted by subcell area and the
+    radius is measured in the units of H. A run-length encoded mask (see Raster.RLE) is
+    measured on its runs without expanding it.
+
+    Arguments:
+        mask    2D array    integer array defining the microstructure, or a RLE dict
+        F       int         material ID of the fiber
+        M       int         material ID of the matrix
+        H       1D array    optional height of each row of subcells
+        L       1D array    optional length of each column of subcells
+
+    Outputs:
+        out     dict        dictionary of actual microstructure properties
+    """
+    # Import Modules
+    import numpy as np
+    from Raster.RLE import ColumnRLE
+    from Trace.Trace import Stage
+
+    rle = isinstance(mask, dict)
+    ny, nx = mask['shape'] if rle else mask.shape
+
+    # Calculate actual values
+    out = {
+            'VF':None,
+           'R':None,
+           'NB':None,
+           'NG':None,
+           'F':F,
+           'M':M
+           }
+
+    # Calculate Volume Fraction of every phase, and of the fiber
+    with Stage('volume fraction', shape=(ny, nx)):
+        out['VF_phases'] = PhaseFractions(mask, H, L)
+        if H is None:
+            out['VF'] = out['VF_phases'].get(F, np.float64(0.))
+        else:
+            out['VF'] = VolumeFraction(mask, F, H, L)
+
+    # Calculate Radius
+    column = ColumnRLE(mask, int(nx/2)) if rle else mask[:,int(nx/2)]
+    if H is None:
+        out['R'] = np.int64(np.count_nonzero(column == F))/2
+    else:
+        out['R'] = np.sum(np.asarray(H, dtype=float)[column == F])/2
+
+    # Calculate subcell dimensions
+    out['NB'] = nx
+    out['NG'] = ny
+
+    # Keep the subcell dimensions
+    if H is not None:
+        out['H'] = np.asarray(H, dtype=float)
+        out['L'] = np.asarray(L, dtype=float)
+
+    return out
+
+
+def VolumeFraction(mask, ID, H=None, L=None):
+    """
+    Calculate the volume fraction of one material, weighted by subcell area when the
+    subcell dimensions are given.
+
+    Arguments:
+        mask    2D array    integer array defining the microstructure, or a RLE dict
+        ID      int         material ID
+        H       1D array    optional height of each row of subcells
+        L       1D array    optional length of each column of subcells
+
+    Outputs:
+        VF      float       volume fraction of the material
+    """
+    # Import Modules
+    import numpy as np
+    from Raster.Memory import RowBlocks
+    from Raster.RLE import RunColumns
+
+    # Run-length encoded: weight each run by its height and the length it spans
+    if isinstance(mask, dict):
+        ny, nx = mask['shape']
+        hit = mask['values'] == ID
+        lengths = mask['lengths'][hit]
+        if H is None or L is None:
+            return np.int64(lengths.sum()) / (nx * ny)
+        H = np.asarray(H, dtype=float)
+        L = np.asarray(L, dtype=float)
+        row, col = RunColumns(mask)
+        row = row[hit]
+        col = col[hit]
+        edges = np.concatenate([[0.], np.cumsum(L)])
+        return np.sum(H[row] * (edges[col + lengths] - edges[col])) / (H.sum() * L.sum())
+
+    ny, nx = mask.shape
+
+    # Equal subcells, counted a block of rows at a time
+    if H is None or L is None:
+        return np.int64(sum(np.count_nonzero(mask[rows] == ID) for rows in RowBlocks(mask.shape))) / (nx * ny)
+
+    # Area weighted
+    H = np.asarray(H, dtype=float)
+    L = np.asarray(L, dtype=float)
+
+    return sum(H[rows] @ (mask[rows] == ID) @ L for rows in RowBlocks(mask.shape)) / (H.sum() * L.sum())
+
+
+def PhaseFractions(mask, H=None, L=None, frac=None):
+    """
+    Calculate the volume fraction of every material in a mask, weighted by subcell
+    area when the subcell dimensions differ.
+
+    Arguments:
+        mask    2D array    integer array defining the microstructure, or a RLE dict
+        H       1D array    optional height of each row of subcells
+        L       1D array    optional length of each column of subcells
+        frac    dict        subcell fraction of each material ID from Phases, None to count them
+
+    Outputs:
+        VFs     dict        volume fraction of each material ID, in increasing order of ID
+    """
+    # Import Modules
+    import numpy as np
+    from Raster.Phases import Fractions
+
+    if frac is None:
+        frac = Fractions(mask)
+
+    # Equal subcells: the subcell counts are the fractions
+    if H is None or L is None or (np.ptp(H) == 0 and np.ptp(L) == 0):
+        return {ID: frac[ID] for ID in sorted(frac)}
+
+    return {ID: VolumeFraction(mask, ID, H, L) for ID in sorted(frac)}
@@ -0,0 +1,114 @@
+def Pyramid(mask, F, M, levels=4, H=None, L=None):
+    """
+    Build coarser copies of a microstructure for a mesh convergence study.
+
+    The mask is generated once at the finest level and each coarser level pools blocks
+    of 2, 4, 8, ... subcells per side of it by majority (see Coarsen), so every level
+    is taken straight from the finest one rather than from the level before. Each
+    level reports how far its volume fraction drifts from the finest one. The levels
+    are (mask, out) pairs, so WriteDeck exports a whole pyramid and the other writers
+    export it level by level.
+
+    Arguments:
+        mask    2D array    integer array defining the microstructure at the finest level
+        F       int         material ID of the fiber
+        M       int         material ID of the matrix
+        levels  int         number of levels, the finest included; stops early once a
+                            level would be a single subcell across
+        H       1D array    optional height of each row of subcells
+        L       1D array    optional length of each column of subcells
+
+    Outputs:
+        pyramid list        (mask, out) of each level, finest first; out also holds 'scale',
+                            the fine subcells per side of each subcell, and 'VF_drift', the
+                            volume fraction of the level minus that of the finest level
+    """
+    # Import Modules
+    import numpy as np
+    from Raster.Properties import Properties
+
+    mask = np.asarray(mask)
+    ny, nx = mask.shape
+
+    # Finest level as given
+    out = Properties(mask, F, M, H, L)
+    out['scale'] = 1
+    out['VF_drift'] = np.float64(0.)
+    pyramid = [(mask, out)]
+
+    # Pool each coarser level from the finest one
+    for k in range(1, levels):
+        f = 2**k
+        if min(ny, nx) <= f:
+            break
+        coarse, Hc, Lc = Coarsen(mask, f, H, L)
+        level = Properties(coarse, F, M, Hc, Lc)
+        level['scale'] = f
+        level['VF_drift'] = level['VF'] - out['VF']
+        pyramid.append((coarse, level))
+
+    return pyramid
+
+
+def Coarsen(mask, f, H=None, L=None):
+    """
+    Coarsen a mask by the majority material of blocks of f x f subcells.
+
+    Unlike Pool, blocks are not padded: a trailing block that is cut short stays a
+    smaller subcell, and the coarse subcell dimensions are the sums of the fine ones,
+    so the RUC keeps its size. With subcell dimensions, the majority is weighted by
+    subcell area. Ties go to the smallest ID. The mask is read a block of rows at a
+    time, so a np.memmap is never loaded whole.
+
+    Arguments:
+        mask    2D array    integer array defining the microstructure
+        f       int         block size in subcells
+        H       1D array    optional height of each row of subcells, 1 if None
+        L       1D array    optional length of each column of subcells, 1 if None
+
+    Outputs:
+        coarse  2D array    integer array of shape ceil(ny/f) x ceil(nx/f)
+        H       1D array    height of each coarse row of subcells
+        L       1D array    length of each coarse column of subcells
+    """
+    # Import Modules
+    import numpy as np
+    from Raster.Phases import Fractions
+
+    ny, nx = mask.shape
+    weighted = H is not None and L is not None
+    H = np.ones(ny) if H is None else np.asarray(H, dtype=float)
+    L = np.ones(nx) if L is None else np.asarray(L, dtype=float)
+
+    # First subcell of each coarse row and column
+    rs = np.arange(0, ny, f)
+    cs = np.arange(0, nx, f)
+
+    # Subcells (or area) of each material but the last in every block, rows then columns
+    ids = sorted(Fractions(mask))
+    counts = np.zeros((len(ids), len(rs), len(cs)))
+    step = f * max(1, (1 << 22) // max(f * nx, 1))
+    for i0 in range(0, ny, step):
+        # -- A band of whole coarse rows
+        rows = slice(i0, min(i0 + step, ny))
+        band = mask[rows]
+        first = i0 // f
+        starts = rs[first:-(-rows.stop // f)] - i0
+        for n, ID in enumerate(ids[:-1]):
+            hit = band == ID
+            if weighted:
+                part = np.add.reduceat(hit * H[rows, None], starts, axis=0) * L
+            else:
+                part = np.add.reduceat(hit, starts, axis=0, dtype=np.int64)
+            counts[n, first:first + len(starts)] = np.add.reduceat(part, cs, axis=1)
+
+    # The last material holds the rest of each block
+    H = np.add.reduceat(H, rs)
+    L = np.add.reduceat(L, cs)
+    counts[-1] = np.outer(H, L) - counts[:-1].sum(axis=0)
+
+    # Most common material of each block, the smallest ID on ties
+    lut = np.array(ids, dtype=mask.dtype)
+    coarse = lut[np.argmax(counts, axis=0)]
+
+    return coarse, H, L
@@ -0,0 +1,326 @@
+def EncodeRLE(mask):
+    """
+    Run-length encode a mask row by row.
+
+    A RLE mask is a dict holding the runs of every row in row order: the material ID
+    and length of each run, and the index of the first run of each row.
+
+    Arguments:
+        mask    2D array    integer array defining the microstructure
+
+    Outputs:
+        rle     dict        'shape' (rows, columns), 'values' and 'lengths' of the runs,
+                            and 'rows', where the runs of row i are rows[i]:rows[i+1]
+    """
+    # Import Modules
+    import numpy as np
+
+    mask = np.asarray(mask)
+    ny, nx = mask.shape
+
+    # A run starts at the first column and wherever the ID changes
+    start = np.empty((ny, nx), dtype=bool)
+    start[:, :1] = True
+    np.not_equal(mask[:, 1:], mask[:, :-1], out=start[:, 1:])
+    i, j = np.nonzero(start)
+    lengths = np.diff(np.append(i * nx + j, ny * nx))
+
+    return RunsRLE(i, mask[i, j], lengths, (ny, nx))
+
+
+def DecodeRLE(rle, start=0, stop=None):
+    """
+    Expand the rows of a RLE mask into a dense array.
+
+    Arguments:
+        rle     dict        run-length encoded mask from EncodeRLE
+        start   int         first row to expand
+        stop    int         row after the last row to expand, None for the last row
+
+    Outputs:
+        mask    2D array    integer array of rows start:stop
+    """
+    # Import Modules
+    import numpy as np
+
+    ny, nx = rle['shape']
+    stop = ny if stop is None else min(stop, ny)
+    a = rle['rows'][start]
+    b = rle['rows'][stop]
+
+    return np.repeat(rle['values'][a:b], rle['lengths'][a:b]).reshape(stop - start, nx)
+
+
+def IntervalsRLE(row, lo, hi, F, M, shape):
+    """
+    Build a RLE mask from the fiber column intervals of each row.
+
+    Intervals may overlap or touch; their union is the fiber and every other subcell
+    is matrix.
+
+    Arguments:
+        row     1D array    row of each interval
+        lo      1D array    first column of each interval
+        hi      1D array    column after the last column of each interval
+        F       int         material ID of the fiber
+        M       int         material ID of the matrix
+        shape   tuple       (rows, columns) of the mask
+
+    Outputs:
+        rle     dict        run-length encoded mask
+    """
+    # Import Modules
+    import numpy as np
+    from Raster.Memory import MaskDtype
+
+    ny, nx = shape
+    row = np.asarray(row, dtype=np.int64)
+    lo = np.asarray(lo, dtype=np.int64)
+    hi = np.asarray(hi, dtype=np.int64)
+
+    # Union of the intervals of each row: offset rows so one running maximum works
+    keep = hi > lo
+    order = np.lexsort((lo[keep], row[keep]))
+    row = row[keep][order]
+    lo = lo[keep][order] + row * (nx + 1)
+    hi = hi[keep][order] + row * (nx + 1)
+    reach = np.maximum.accumulate(hi) if len(hi) else hi
+    first = np.ones(len(lo), dtype=bool)
+    first[1:] = lo[1:] > reach[:-1]
+    ends = np.flatnonzero(np.append(first[1:], len(lo) > 0))
+    row = row[first]
+    lo = lo[first] - row * (nx + 1)
+    hi = reach[ends] - row * (nx + 1)
+
+    # Boundaries of each row: 0, lo, hi, ..., lo, hi, nx, alternating matrix and fiber
+    count = np.bincount(row, minlength=ny)
+    size = 2 * count + 2
+    offset = np.cumsum(size) - size
+    bounds = np.empty(size.sum(), dtype=np.int64)
+    bounds[offset] = 0
+    bounds[offset + size - 1] = nx
+    k = np.arange(len(row)) - (np.cumsum(count) - count)[row]
+    bounds[offset[row] + 1 + 2 * k] = lo
+    bounds[offset[row] + 2 + 2 * k] = hi
+
+    # Runs between consecutive boundaries of the same row
+    last = np.zeros(len(bounds), dtype=bool)
+    last[offset + size - 1] = True
+    lengths = np.diff(bounds)[~last[:-1]]
+    rows = np.repeat(np.arange(ny), size - 1)
+    phase = np.arange(len(bounds) - 1)[~last[:-1]] - np.repeat(offset, size - 1)
+    values = np.where(phase % 2 == 0, M, F).astype(MaskDtype(F, M))
+
+    return RunsRLE(rows, values, lengths, (ny, nx))
+
+
+def FlipRLE(rle, axis):
+    """
+    Flip a RLE mask upside down (axis 0) or left to right (axis 1).
+
+    Arguments:
+        rle     dict        run-length encoded mask
+        axis    int         0 to reverse the rows, 1 to reverse the columns
+
+    Outputs:
+        rle     dict        flipped run-length encoded mask
+    """
+    # Import Modules
+    import numpy as np
+
+    ny, nx = rle['shape']
+    if axis == 0:
+        return _SelectRows(rle, np.arange(ny)[::-1])
+
+    row = _RunRows(rle)
+    order = np.lexsort((-np.arange(len(row)), row))
+
+    return RunsRLE(row[order], rle['values'][order], rle['lengths'][order], (ny, nx))
+
+
+def TileRLE(rle, ty, tx):
+    """
+    Repeat a RLE mask ty times down and tx times across.
+
+    Arguments:
+        rle     dict        run-length encoded mask
+        ty      int         number of copies along the rows
+        tx      int         number of copies along the columns
+
+    Outputs:
+        rle     dict        tiled run-length encoded mask
+    """
+    # Import Modules
+    import numpy as np
+
+    ny, nx = rle['shape']
+
+    # Repeat the runs of each row across
+    n = len(rle['values'])
+    run = np.tile(np.arange(n), tx)
+    copy = np.repeat(np.arange(tx), n)
+    row = _RunRows(rle)[run]
+    order = np.lexsort((run, copy, row))
+    wide = RunsRLE(row[order], rle['values'][run[order]], rle['lengths'][run[order]], (ny, nx * tx))
+
+    # Repeat the rows down
+    return _SelectRows(wide, np.tile(np.arange(ny), ty))
+
+
+def MirrorRLE(rle, nx, ny):
+    """
+    Mirror a quarter cell RLE mask out to the full ny x nx RUC, the same way the
+    generators mirror dense masks. A center column or row shared by both halves
+    (odd nx or ny) is kept once.
+
+    Arguments:
+        rle     dict        run-length encoded quarter cell
+        nx      int         number of columns of the full RUC
+        ny      int         number of rows of the full RUC
+
+    Outputs:
+        rle     dict        run-length encoded RUC
+    """
+    # Import Modules
+    import numpy as np
+
+    hy, hx = rle['shape']
+
+    # Append the reversed columns, skipping a shared center column
+    if hx < nx:
+        right = FlipRLE(rle, 1)
+        if nx % 2:
+            right = _DropFirstColumn(right)
+        row = np.concatenate([_RunRows(rle), _RunRows(right)])
+        half = np.repeat([0, 1], [len(rle['values']), len(right['values'])])
+        order = np.lexsort((np.arange(len(row)), half, row))
+        values = np.concatenate([rle['values'], right['values']])[order]
+        lengths = np.concatenate([rle['lengths'], right['lengths']])[order]
+        rle = RunsRLE(row[order], values, lengths, (hy, nx))
+
+    # Append the reversed rows, skipping a shared center row
+    if hy < ny:
+        rle = _SelectRows(rle, np.concatenate([np.arange(hy), np.arange(hy - 1 - ny % 2, -1, -1)]))
+
+    return rle
+
+
+def ColumnRLE(rle, col):
+    """
+    Read one column of a RLE mask.
+
+    Arguments:
+        rle     dict        run-length encoded mask
+        col     int         column index
+
+    Outputs:
+        column  1D array    material ID of every row at that column
+    """
+    # Import Modules
+    import numpy as np
+
+    ny, nx = rle['shape']
+    ends = np.cumsum(rle['lengths'])
+
+    return rle['values'][np.searchsorted(ends, np.arange(ny) * nx + col, 'right')]
+
+
+def RunColumns(rle):
+    """
+    Locate every run of a RLE mask.
+
+    Arguments:
+        rle     dict        run-length encoded mask
+
+    Outputs:
+        row     1D array    row of each run
+        col     1D array    first column of each run
+    """
+    # Import Modules
+    import numpy as np
+
+    ny, nx = rle['shape']
+    row = _RunRows(rle)
+
+    return row, np.cumsum(rle['lengths']) - rle['lengths'] - row * nx
+
+
+def RunsRLE(row, values, lengths, shape):
+    """
+    Assemble a RLE mask from runs listed row by row, dropping empty runs and merging
+    neighbors of the same row and ID.
+
+    Arguments:
+        row     1D array    row of each run, in ascending order
+        values  1D array    material ID of each run
+        lengths 1D array    number of subcells in each run
+        shape   tuple       (rows, columns) of the mask
+
+    Outputs:
+        rle     dict        run-length encoded mask
+    """
+    # Import Modules
+    import numpy as np
+
+    ny, nx = shape
+    row = np.asarray(row, dtype=np.int64)
+    values = np.asarray(values)
+    lengths = np.asarray(lengths, dtype=np.int64)
+
+    keep = lengths > 0
+    row = row[keep]
+    values = values[keep]
+    lengths = lengths[keep]
+
+    if len(row):
+        first = np.ones(len(row), dtype=bool)
+        first[1:] = (row[1:] != row[:-1]) | (values[1:] != values[:-1])
+        idx = np.flatnonzero(first)
+        lengths = np.add.reduceat(lengths, idx)
+        row = row[idx]
+        values = values[idx]
+
+    return {
+            'shape': (ny, nx),
+            'values': values,
+            'lengths': lengths,
+            'rows': np.searchsorted(row, np.arange(ny + 1)),
+            }
+
+
+def _RunRows(rle):
+    """
+    Row of every run.
+    """
+    # Import Modules
+    import numpy as np
+
+    return np.repeat(np.arange(rle['shape'][0]), np.diff(rle['rows']))
+
+
+def _SelectRows(rle, idx):
+    """
+    Gather rows of a RLE mask in the given order (rows may repeat).
+    """
+    # Import Modules
+    import numpy as np
+
+    idx = np.asarray(idx, dtype=np.int64)
+    count = np.diff(rle['rows'])[idx]
+    run = np.repeat(rle['rows'][idx] - np.cumsum(count) + count, count) + np.arange(count.sum())
+    row = np.repeat(np.arange(len(idx)), count)
+
+    return RunsRLE(row, rle['values'][run], rle['lengths'][run], (len(idx), rle['shape'][1]))
+
+
+def _DropFirstColumn(rle):
+    """
+    Remove the first column of a RLE mask.
+    """
+    # Import Modules
+    import numpy as np
+
+    lengths = rle['lengths'].copy()
+    lengths[rle['rows'][:-1][np.diff(rle['rows']) > 0]] -= 1
+
+    return RunsRLE(_RunRows(rle), rle['values'], lengths, (rle['shape'][0], rle['shape'][1] - 1))
@@ -0,0 +1,732 @@
+def Rasterize(xs, ys, centers, R2, F, M, fill='grid', max_bytes=None, interface=None, H=None, L=None, layers=None, path=None):
+    """
+    Rasterize circular fibers onto a grid of subcells.
+
+    Only the quarter cell is computed for every axis along which the grid and fiber
+    centers are exactly mirror symmetric; the rest of the RUC is mirrored out. Each
+    fiber is only tested against the subcells inside its bounding box, either by a
+    distance test on every subcell ('grid') or by filling the closed column interval
+    the circle cuts out of each row ('scan'). Both modes give identical masks; 'scan'
+    never allocates more than one value per row. The 'area' mode instead labels each
+    subcell by the fiber area it holds (see AreaFraction): the subcells with the most
+    fiber become fiber until their count best matches the total fiber area, so the
+    volume fraction is kept; given an interface ID, every partly covered subcell is set
+    to it instead. The 'rle' mode fills rows like 'scan' but returns the mask run-length
+    encoded (see Raster.RLE) without ever building the dense array, so it is not held to
+    the memory budget. The 'tiles' mode fills one band of rows at a time (see
+    RasterizeTiles) into a np.memmap, so the RUC lives on disk rather than in memory
+    and is not held to the budget either. The memmap is a .npy file at the given path,
+    kept after the run, or else an anonymous temporary file; the default temporary
+    directory is often in memory (tmpfs), so pass a directory on disk for large RUCs. Coating
+    layers around the fibers are labeled from one distance field (see Layers) in the
+    'grid' and 'scan' modes, which give the same result. The mask uses the smallest
+    integer dtype that holds the material IDs.
+
+    Arguments:
+        xs          1D array    x coordinates of the subcell centers
+        ys          1D array    y coordinates of the subcell centers
+        centers     list        fiber center coordinates [x, y]
+        R2          float       squared fiber radius
+        F           int         material ID of the fiber
+        M           int         material ID of the matrix
+        fill        str         fiber fill mode, 'grid', 'scan', 'area', 'rle' or 'tiles'
+        max_bytes   int         memory budget for the mask in bytes, None for no limit
+        interface   int         material ID of partly covered subcells in 'area' mode, None for none
+        H           1D array    height of each row of subcells in 'area' mode, None for equal spacing
+        L           1D array    length of each column of subcells in 'area' mode, None for equal spacing
+        layers      list        optional (R2, ID) of each coating layer, innermost first (see CoatingLayers)
+        path        str         .npy file for the 'tiles' mask, kept after the run (reopen with
+                                np.load(path, mmap_mode='r')), or a directory for an anonymous
+                                temporary file; None for the system temporary directory
+
+    Outputs:
+        mask    2D array    integer array defining the microstructure, a RLE dict in 'rle' mode
+    """
+    # Import Modules
+    import numpy as np
+    from Raster.Memory import MaskDtype, CheckBudget
+    from Trace.Trace import Stage
+
+    if fill not in ('grid', 'scan', 'area', 'rle', 'tiles'):
+        raise ValueError(f"Unknown fill mode '{fill}', expected 'grid', 'scan', 'area', 'rle' or 'tiles'.")
+
+    xs = np.asarray(xs, dtype=float)
+    ys = np.asarray(ys, dtype=float)
+    centers = np.asarray(centers, dtype=float).reshape(-1, 2)
+    nx = len(xs)
+    ny = len(ys)
+
+    # Label the fibers and their coatings from one distance field
+    if layers:
+        if fill not in ('grid', 'scan'):
+            raise ValueError(f"Coating layers need the 'grid' or 'scan' fill mode, not '{fill}'.")
+        R2s = [R2] + [layer[0] for layer in layers]
+        IDs = [F] + [layer[1] for layer in layers]
+        CheckBudget((ny, nx), MaskDtype(M, *IDs), max_bytes)
+        hx, hy = _Quarter(xs, ys, centers)
+        CheckBudget((hy, hx), np.float64, max_bytes)
+        with Stage('fill', mode='layers', shape=(hy, hx)):
+            base = Layers(_Field(xs, ys, centers, hx, hy), R2s, IDs, M)
+        with Stage('mirror', shape=(ny, nx)):
+            return _Mirror(base, nx, ny)
+
+    # Run-length encode the row intervals of the quarter cell and mirror the runs
+    if fill == 'rle':
+        from Raster.RLE import IntervalsRLE, MirrorRLE
+        hx, hy = _Quarter(xs, ys, centers)
+        with Stage('fill', mode=fill, shape=(hy, hx)):
+            row, lo, hi = [], [], []
+            for i0, a, b in _ScanIntervals(xs[:hx], ys[:hy], centers, R2):
+                row.append(i0 + np.arange(len(a)))
+                lo.append(a)
+                hi.append(b)
+            row, lo, hi = [np.concatenate(v) if v else np.zeros(0, dtype=np.int64) for v in (row, lo, hi)]
+            base = IntervalsRLE(row, lo, hi, F, M, (hy, hx))
+        with Stage('mirror', shape=(ny, nx)):
+            return MirrorRLE(base, nx, ny)
+
+    # Fill a disk-backed mask one band of rows at a time
+    if fill == 'tiles':
+        import os
+        import tempfile
+        if path is None or os.path.isdir(path):
+            with tempfile.TemporaryFile(dir=path) as fid:
+                fid.truncate(max(ny * nx, 1) * np.dtype(MaskDtype(F, M)).itemsize)
+                mask = np.memmap(fid, dtype=MaskDtype(F, M), mode='r+', shape=(ny, nx))
+        else:
+            mask = np.lib.format.open_memmap(path, mode='w+', dtype=MaskDtype(F, M), shape=(ny, nx))
+        with Stage('fill', mode=fill, shape=(ny, nx)):
+            for i0, band in RasterizeTiles(xs, ys, centers, R2, F, M):
+                mask[i0:i0 + len(band)] = band
+        mask.flush()
+        return mask
+
+    # Check the memory budget before allocating anything
+    dtype = MaskDtype(F, M) if interface is None else MaskDtype(F, M, interface)
+    CheckBudget((ny, nx), dtype, max_bytes)
+
+    # Label by fiber area: majority, or an interface phase on partly covered subcells
+    if fill == 'area':
+        with Stage('area fraction', shape=(ny, nx)):
+            frac = AreaFraction(xs, ys, centers, R2, max_bytes=max_bytes, H=H, L=L)
+        with Stage('fill', mode=fill, shape=(ny, nx)):
+            area = None if H is None else np.outer(H, L)
+            mask = np.full((ny, nx), M, dtype=dtype)
+            mask[frac >= _AreaThreshold(frac, area)] = F
+            if interface is not None:
+                mask[(frac > 0) & (frac < 1)] = interface
+        return mask
+
+    # Reduce to the quarter cell along each mirror symmetric axis
+    hx, hy = _Quarter(xs, ys, centers)
+
+    # Integer grid: start all matrix
+    base = np.full((hy, hx), M, dtype=dtype)
+
+    # Fill fibers
+    with Stage('fill', mode=fill, shape=(hy, hx)):
+        if fill == 'scan':
+            _FillScan(base, xs[:hx], ys[:hy], centers, R2, F)
+        else:
+            _FillGrid(base, xs[:hx], ys[:hy], centers, R2, F)
+
+    # Mirror to create full RUC
+    with Stage('mirror', shape=(ny, nx)):
+        return _Mirror(base, nx, ny)
+
+
+def AreaFraction(xs, ys, centers, R2, samples=8, max_bytes=None, H=None, L=None):
+    """
+    Compute the fiber area fraction of every subcell.
+
+    A subcell whose center is more than half a diagonal from every fiber edge is wholly
+    fiber or wholly matrix. Only the subcells near an edge, found from the distance to
+    each fiber center, are supersampled on a samples x samples grid, so a subcell shared
+    by two fibers gets the area of their union. Subcells are taken as equally spaced
+    unless their dimensions are given.
+
+    Arguments:
+        xs          1D array    x coordinates of the subcell centers
+        ys          1D array    y coordinates of the subcell centers
+        centers     list        fiber center coordinates [x, y]
+        R2          float       squared fiber radius
+        samples     int         samples per side of each edge subcell
+        max_bytes   int         memory budget for the fractions in bytes, None for no limit
+        H           1D array    height of each row of subcells, None for equal spacing
+        L           1D array    length of each column of subcells, None for equal spacing
+
+    Outputs:
+        frac    2D array    float32 fiber area fraction of each subcell, in steps of 1/samples**2
+    """
+    # Import Modules
+    import numpy as np
+    from Raster.Memory import CheckBudget
+
+    xs = np.asarray(xs, dtype=float)
+    ys = np.asarray(ys, dtype=float)
+    centers = np.asarray(centers, dtype=float).reshape(-1, 2)
+    nx = len(xs)
+    ny = len(ys)
+    CheckBudget((ny, nx), np.float32, max_bytes)
+
+    # Subcell dimensions
+    if L is None:
+        L = np.full(nx, (xs[-1] - xs[0]) / (nx - 1) if nx > 1 else 1.)
+    if H is None:
+        H = np.full(ny, (ys[-1] - ys[0]) / (ny - 1) if ny > 1 else 1.)
+    L = np.asarray(L, dtype=float)
+    H = np.asarray(H, dtype=float)
+
+    # Reduce to the quarter cell along each mirror symmetric axis
+    hx, hy = _Quarter(xs, ys, centers)
+    if not np.array_equal(L, L[::-1]):
+        hx = nx
+    if not np.array_equal(H, H[::-1]):
+        hy = ny
+    qx = xs[:hx]
+    qy = ys[:hy]
+    frac = np.zeros((hy, hx), dtype=np.float32)
+
+    # Sample offsets within a unit subcell, and the largest half diagonal
+    o = (np.arange(samples) + 0.5) / samples - 0.5
+    ox = np.tile(o, samples)
+    oy = np.repeat(o, samples)
+    pad = 0.5 * np.hypot(L.max(initial=0.), H.max(initial=0.))
+
+    R = np.sqrt(R2)
+    keys = []
+    hits = []
+    for cx, cy in centers:
+        # -- Bounding box of the fiber, padded by half a diagonal
+        i0 = np.searchsorted(qy, cy - R - pad, 'left')
+        i1 = np.searchsorted(qy, cy + R + pad, 'right')
+        j0 = np.searchsorted(qx, cx - R - pad, 'left')
+        j1 = np.searchsorted(qx, cx + R + pad, 'right')
+        if i0 >= i1 or j0 >= j1:
+            continue
+
+        # -- Subcells wholly inside
+        d = np.sqrt((qx[None, j0:j1] - cx)**2 + (qy[i0:i1, None] - cy)**2)
+        h = 0.5 * np.hypot(L[None, j0:j1], H[i0:i1, None]) * (1 + 1e-9)
+        frac[i0:i1, j0:j1][d <= R - h] = 1
+
+        # -- Supersample the subcells on the edge
+        bi, bj = np.nonzero(np.abs(d - R) < h)
+        px = qx[j0 + bj][:, None] + ox * L[j0 + bj][:, None]
+        py = qy[i0 + bi][:, None] + oy * H[i0 + bi][:, None]
+        keys.append((i0 + bi) * hx + (j0 + bj))
+        hits.append((px - cx)**2 + (py - cy)**2 <= R2)
+
+    # Union of the samples of every fiber over each edge subcell
+    keys = np.concatenate(keys) if keys else np.zeros(0, dtype=np.intp)
+    if len(keys):
+        hits = np.concatenate(hits)
+        order = np.argsort(keys, kind='stable')
+        keys = keys[order]
+        first = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+        cover = np.logical_or.reduceat(hits[order], first, axis=0)
+        flat = frac.reshape(-1)
+        cells = keys[first]
+        flat[cells] = np.maximum(flat[cells], np.count_nonzero(cover, axis=1) / samples**2)
+
+    return _Mirror(frac, nx, ny)
+
+
+def DistanceField(xs, ys, centers, max_bytes=None):
+    """
+    Compute the squared distance from every subcell center to the nearest fiber center.
+
+    Thresholding the field against R**2 gives exactly the mask Rasterize builds for
+    radius R, so a sweep over radii on one grid only pays for the field once. Like
+    Rasterize, only the quarter cell is computed on mirror symmetric axes.
+
+    Arguments:
+        xs          1D array    x coordinates of the subcell centers
+        ys          1D array    y coordinates of the subcell centers
+        centers     list        fiber center coordinates [x, y]
+        max_bytes   int         memory budget for the field in bytes, None for no limit
+
+    Outputs:
+        d2      2D array    float array of squared distances
+    """
+    # Import Modules
+    import numpy as np
+    from Raster.Memory import CheckBudget
+
+    xs = np.asarray(xs, dtype=float)
+    ys = np.asarray(ys, dtype=float)
+    centers = np.asarray(centers, dtype=float).reshape(-1, 2)
+    nx = len(xs)
+    ny = len(ys)
+    CheckBudget((ny, nx), np.float64, max_bytes)
+
+    # Nearest center over the quarter cell
+    hx, hy = _Quarter(xs, ys, centers)
+    base = _Field(xs, ys, centers, hx, hy)
+
+    return _Mirror(base, nx, ny)
+
+
+def Threshold(d2, R2, F, M):
+    """
+    Build a mask from a distance field by marking every subcell within the squared
+    radius as fiber.
+
+    Arguments:
+        d2      2D array    squared distances from DistanceField
+        R2      float       squared fiber radius
+        F       int         material ID of the fiber
+        M       int         material ID of the matrix
+
+    Outputs:
+        mask    2D array    integer array defining the microstructure
+    """
+    # Import Modules
+    import numpy as np
+    from Raster.Memory import MaskDtype
+
+    mask = np.full(d2.shape, M, dtype=MaskDtype(F, M))
+    mask[d2 <= R2] = F
+
+    return mask
+
+
+def Layers(d2, R2s, IDs, M):
+    """
+    Build a mask of concentric layers from a distance field in a single pass.
+
+    Every subcell gets the ID of the first layer whose squared outer radius it does not
+    exceed, so the first layer alone gives the same mask as Threshold.
+
+    Arguments:
+        d2      2D array    squared distances from DistanceField
+        R2s     list        squared outer radius of each layer, increasing
+        IDs     list        material ID of each layer, the fiber first
+        M       int         material ID of the matrix
+
+    Outputs:
+        mask    2D array    integer array defining the microstructure
+    """
+    # Import Modules
+    import numpy as np
+    from Raster.Memory import MaskDtype
+
+    if len(R2s) != len(IDs):
+        raise ValueError(f"Got {len(R2s)} layer radii for {len(IDs)} material IDs.")
+    if np.any(np.diff(R2s) < 0):
+        raise ValueError("Layer radii must not decrease outward.")
+
+    # Look up the layer each distance falls in, the matrix beyond the last
+    lut = np.array(list(IDs) + [M], dtype=MaskDtype(M, *IDs))
+
+    return lut[np.digitize(d2, R2s, right=True)]
+
+
+def CoatingLayers(R, coating):
+    """
+    Squared outer radii of the coating layers around a fiber, for Rasterize.
+
+    Arguments:
+        R           float   radius of the fiber
+        coating     list    (thickness, ID) of each layer, innermost first, None for none
+
+    Outputs:
+        layers  list    (R2, ID) of each layer, None without a coating
+    """
+    if not coating:
+        return None
+
+    layers = []
+    outer = R
+    for thickness, ID in coating:
+        if thickness < 0:
+            raise ValueError(f"Coating thickness {thickness} is negative.")
+        outer = outer + thickness
+        layers.append((outer**2, ID))
+
+    return layers
+
+
+def RasterizeMany(xs, ys, centers, R2s, F, M, max_bytes=None):
+    """
+    Rasterize one fiber arrangement at many radii on the same grid.
+
+    The distance field is computed once over the quarter cell and each mask is a
+    threshold of it, mirrored out to the full RUC. Every mask equals the one
+    Rasterize builds for the same squared radius.
+
+    Arguments:
+        xs          1D array    x coordinates of the subcell centers
+        ys          1D array    y coordinates of the subcell centers
+        centers     list        fiber center coordinates [x, y]
+        R2s         list        squared fiber radii, one mask per value
+        F           int         material ID of the fiber
+        M           int         material ID of the matrix
+        max_bytes   int         memory budget for one mask in bytes, None for no limit
+
+    Outputs:
+        mask    2D array    integer array defining the microstructure, one per R2s
+    """
+    # Import Modules
+    import numpy as np
+    from Raster.Memory import CheckBudget, MaskDtype
+
+    xs = np.asarray(xs, dtype=float)
+    ys = np.asarray(ys, dtype=float)
+    centers = np.asarray(centers, dtype=float).reshape(-1, 2)
+    nx = len(xs)
+    ny = len(ys)
+    CheckBudget((ny, nx), MaskDtype(F, M), max_bytes)
+
+    # Nearest center over the quarter cell
+    hx, hy = _Quarter(xs, ys, centers)
+    CheckBudget((hy, hx), np.float64, max_bytes)
+    base = _Field(xs, ys, centers, hx, hy)
+
+    # Threshold the quarter, then mirror
+    for R2 in R2s:
+        yield _Mirror(Threshold(base, R2, F, M), nx, ny)
+
+
+def RasterizeTiles(xs, ys, centers, R2, F, M, rows=1024):
+    """
+    Rasterize circular fibers one band of rows at a time.
+
+    Each band only tests the fibers whose extent overlaps its rows and is filled like
+    the 'scan' mode, so memory stays at one band however large the RUC. The bands
+    stacked in order equal the mask Rasterize builds.
+
+    Arguments:
+        xs          1D array    x coordinates of the subcell centers
+        ys          1D array    y coordinates of the subcell centers
+        centers     list        fiber center coordinates [x, y]
+        R2          float       squared fiber radius
+        F           int         material ID of the fiber
+        M           int         material ID of the matrix
+        rows        int         number of rows per band
+
+    Outputs:
+        i0      int         index of the first row of the band
+        band    2D array    integer array of rows i0 to i0 + len(band)
+    """
+    # Import Modules
+    import numpy as np
+    from Raster.Memory import MaskDtype
+
+    xs = np.asarray(xs, dtype=float)
+    ys = np.asarray(ys, dtype=float)
+    centers = np.asarray(centers, dtype=float).reshape(-1, 2)
+    nx = len(xs)
+    ny = len(ys)
+    dtype = MaskDtype(F, M)
+
+    # Compute half the columns when they are mirror symmetric
+    hx = nx
+    if _IsMirror(xs, centers[:, 0], centers[:, 1]):
+        hx = (nx + 1) // 2
+
+    # Fibers sorted by height, so each band finds its own with two searches
+    centers = centers[np.argsort(centers[:, 1], kind='stable')]
+    reach = np.sqrt(R2) * (1 + 1e-9) + 1e-9
+    for i0 in range(0, ny, rows):
+        band_ys = ys[i0:i0 + rows]
+        a = np.searchsorted(centers[:, 1], band_ys.min() - reach, 'left')
+        b = np.searchsorted(centers[:, 1], band_ys.max() + reach, 'right')
+
+        # -- Fill the band and mirror its columns
+        band = np.full((len(band_ys), hx), M, dtype=dtype)
+        _FillScan(band, xs[:hx], band_ys, centers[a:b], R2, F)
+        yield i0, _Mirror(band, nx, len(band_ys))
+
+
+def SolveThreshold(xs, ys, centers, VF, F, M, max_bytes=None):
+    """
+    Find the fiber radius whose rasterized volume fraction is closest to a target.
+
+    The rasterized volume fraction is a step function of the radius that only changes
+    at the squared distances of the subcell centers. These are sorted once, with the
+    number of subcells at each, and the target is found by binary search of the
+    cumulative counts. Ties go to the smaller radius.
+
+    Arguments:
+        xs          1D array    x coordinates of the subcell centers
+        ys          1D array    y coordinates of the subcell centers
+        centers     list        fiber center coordinates [x, y]
+        VF          float       desired volume fraction
+        F           int         material ID of the fiber
+        M           int         material ID of the matrix
+        max_bytes   int         memory budget for the mask in bytes, None for no limit
+
+    Outputs:
+        mask    2D array    integer array defining the microstructure
+        R2      float       squared fiber radius of the mask, -inf when no subcell is fiber
+    """
+    # Import Modules
+    import numpy as np
+    from Raster.Memory import CheckBudget, MaskDtype
+
+    xs = np.asarray(xs, dtype=float)
+    ys = np.asarray(ys, dtype=float)
+    centers = np.asarray(centers, dtype=float).reshape(-1, 2)
+    nx = len(xs)
+    ny = len(ys)
+
+    # The mask, with the quarter cell distances, their sort order, the sorted copy and
+    # the distinct values (about 8 bytes per subcell of the mask)
+    hx, hy = _Quarter(xs, ys, centers)
+    CheckBudget((ny, nx), MaskDtype(F, M), max_bytes, work=4 * 8 * hx * hy)
+
+    # Nearest center over the quarter cell
+    base = _Field(xs, ys, centers, hx, hy)
+
+    # Number of subcells each quarter cell subcell stands for once mirrored
+    wx = np.ones(hx)
+    wx[:nx - hx] += 1
+    wy = np.ones(hy)
+    wy[:ny - hy] += 1
+
+    # Distinct squared distances, from one sort of the quarter cell
+    order = np.argsort(base, axis=None)
+    d2 = base.ravel()[order]
+    new = np.empty(len(d2), dtype=bool)
+    new[0] = True
+    np.not_equal(d2[1:], d2[:-1], out=new[1:])
+    first = np.flatnonzero(new)
+    del new
+    d2 = d2[first]
+    ends = np.append(first[1:], len(order)) - 1
+    del first
+
+    # Fiber subcells up to each distinct squared distance, a block of the sort at a time
+    counts = np.empty(len(d2))
+    total = 0.
+    for a in range(0, len(order), 1 << 18):
+        block = order[a:a + (1 << 18)]
+        cum = np.cumsum(wy[block // hx] * wx[block % hx])
+        cum += total
+        i, j = np.searchsorted(ends, [a, a + len(block)])
+        counts[i:j] = cum[ends[i:j] - a]
+        total = cum[-1]
+    del order
+
+    # Closest of the two steps around the target
+    target = VF * nx * ny
+    k = int(np.searchsorted(counts, target))
+    below = counts[k - 1] if k > 0 else 0
+    if k == len(d2) or target - below <= counts[k] - target:
+        k -= 1
+    R2 = d2[k] if k >= 0 else -np.inf
+
+    return _Mirror(Threshold(base, R2, F, M), nx, ny), R2
+
+
+def RadiusSquared(R):
+    """
+    Squared radius threshold equivalent to testing sqrt(d2) <= R.
+
+    Arguments:
+        R   float   radius of the fiber in subcells
+
+    Outputs:
+        R2  float   largest squared distance whose square root does not exceed R
+    """
+    # Import Modules
+    import numpy as np
+
+    R = np.float64(R)
+    R2 = R * R
+    while np.sqrt(np.nextafter(R2, np.inf)) <= R:
+        R2 = np.nextafter(R2, np.inf)
+    while R2 > 0 and np.sqrt(R2) > R:
+        R2 = np.nextafter(R2, -np.inf)
+
+    return R2
+
+
+def _AreaThreshold(frac, area=None):
+    """
+    Smallest area fraction labeled fiber so that the area of the fiber subcells is
+    closest to the total fiber area. Prefers the threshold nearest one half when
+    several match equally well, and is never zero.
+    """
+    # Import Modules
+    import numpy as np
+
+    # Area of the fiber subcells for each distinct fraction as threshold, largest first
+    area = np.ones(frac.shape) if area is None else np.asarray(area, dtype=float)
+    part = frac > 0
+    values, inverse = np.unique(frac[part], return_inverse=True)
+    if len(values) == 0:
+        return np.inf
+    values = values[::-1]
+    counts = np.cumsum(np.bincount(inverse.ravel(), weights=area[part])[::-1])
+
+    # Closest to the fiber area, preferring the majority threshold on ties
+    miss = np.abs(counts - np.sum(frac * area))
+    best = np.flatnonzero(miss == miss.min())
+    k = best[np.argmin(np.abs(values[best] - 0.5))]
+
+    return values[k]
+
+
+def _Quarter(xs, ys, centers):
+    """
+    Number of columns and rows to compute, halving every mirror symmetric axis.
+    """
+    hx = len(xs)
+    if _IsMirror(xs, centers[:, 0], centers[:, 1]):
+        hx = (hx + 1) // 2
+    hy = len(ys)
+    if _IsMirror(ys, centers[:, 1], centers[:, 0]):
+        hy = (hy + 1) // 2
+
+    return hx, hy
+
+
+def _Field(xs, ys, centers, hx, hy):
+    """
+    Squared distance to the nearest center over the first hy rows and hx columns.
+    """
+    # Import Modules
+    import numpy as np
+
+    base = np.full((hy, hx), np.inf)
+    for cx, cy in centers:
+        np.minimum(base, (xs[None, :hx] - cx)**2 + (ys[:hy, None] - cy)**2, out=base)
+
+    return base
+
+
+def _Mirror(base, nx, ny):
+    """
+    Mirror a quarter cell out to the full ny x nx RUC.
+    """
+    # Import Modules
+    import numpy as np
+
+    hy, hx = base.shape
+    if hx == nx and hy == ny:
+        return base
+    full = np.empty((ny, nx), dtype=base.dtype)
+    full[:hy, :hx] = base
+    if hx < nx:
+        full[:hy, hx:] = base[:, ::-1][:, nx % 2:]
+    if hy < ny:
+        full[hy:, :] = full[:hy, :][::-1, :][ny % 2:, :]
+
+    return full
+
+
+def _IsMirror(s, c, c_other):
+    """
+    Check that squared offsets along one axis are bit-for-bit mirror symmetric.
+
+    Every fiber must have a partner at the same position on the other axis whose
+    squared offsets read the same when the axis is reversed, so the far half of the
+    grid evaluates to exactly the mirror image of the near half. Only one row of
+    offsets is held at a time and the check stops at the first fiber without a
+    partner, so random layouts with many fibers cost about one row.
+    """
+    # Import Modules
+    import numpy as np
+
+    # Candidate partners: the fibers at the same position on the other axis
+    groups = {}
+    for j, key in enumerate(c_other.tolist()):
+        groups.setdefault(key, []).append(j)
+
+    for i, key in enumerate(c_other.tolist()):
+        flipped = ((s - c[i])**2)[::-1]
+        if not any(np.array_equal(flipped, (s - c[j])**2) for j in groups[key]):
+            return False
+
+    return True
+
+
+def _FillGrid(mask, xs, ys, centers, R2, F):
+    """
+    Set every subcell within the squared radius of a fiber center to the fiber ID.
+    """
+    # Import Modules
+    import numpy as np
+
+    R = np.sqrt(R2)
+    for cx, cy in centers:
+        # -- Bounding box of the fiber, padded by one subcell
+        i0 = max(np.searchsorted(ys, cy - R, 'left') - 1, 0)
+        i1 = min(np.searchsorted(ys, cy + R, 'right') + 1, len(ys))
+        j0 = max(np.searchsorted(xs, cx - R, 'left') - 1, 0)
+        j1 = min(np.searchsorted(xs, cx + R, 'right') + 1, len(xs))
+        if i0 >= i1 or j0 >= j1:
+            continue
+
+        # -- Distance test within the box
+        inside = (xs[None, j0:j1] - cx)**2 + (ys[i0:i1, None] - cy)**2 <= R2
+        mask[i0:i1, j0:j1][inside] = F
+
+
+def _FillScan(mask, xs, ys, centers, R2, F):
+    """
+    Fill each row of every fiber as a single slice of columns.
+    """
+    # Import Modules
+    import numpy as np
+
+    for i0, lo, hi in _ScanIntervals(xs, ys, centers, R2):
+        for i in np.nonzero(hi > lo)[0]:
+            mask[i0 + i, lo[i]:hi[i]] = F
+
+
+def _ScanIntervals(xs, ys, centers, R2):
+    """
+    Column interval [lo, hi) that each fiber covers in each row from row i0 on.
+
+    The column bounds come from the chord half-width sqrt(R2 - dy^2) and are then
+    nudged by the same squared distance test used in grid mode, so rounding in the
+    square root can never move a boundary subcell.
+    """
+    # Import Modules
+    import numpy as np
+
+    nx = len(xs)
+    R = np.sqrt(R2)
+    for cx, cy in centers:
+        # -- Rows crossed by the fiber, padded by one subcell
+        i0 = max(np.searchsorted(ys, cy - R, 'left') - 1, 0)
+        i1 = min(np.searchsorted(ys, cy + R, 'right') + 1, len(ys))
+        if i0 >= i1 or nx == 0:
+            continue
+
+        # -- Analytic column interval of each row
+        dy2 = (ys[i0:i1] - cy)**2
+        w = np.sqrt(np.maximum(R2 - dy2, 0.))
+        lo = np.searchsorted(xs, cx - w, 'left')
+        hi = np.searchsorted(xs, cx + w, 'right')
+
+        # -- Snap the interval ends onto the exact distance test
+        def inside(j):
+            jj = np.clip(j, 0, nx - 1)
+            return (j >= 0) & (j < nx) & ((xs[jj] - cx)**2 + dy2 <= R2)
+
+        while True:
+            step = inside(lo - 1)
+            if not step.any():
+                break
+            lo[step] -= 1
+        while True:
+            step = (lo < hi) & ~inside(lo)
+            if not step.any():
+                break
+            lo[step] += 1
+        while True:
+            step = inside(hi)
+            if not step.any():
+                break
+            hi[step] += 1
+        while True:
+            step = (hi > lo) & ~inside(hi - 1)
+            if not step.any():
+                break
+            hi[step] -= 1
+
+        yield i0, lo, hi
@@ -1,39 +1,150 @@
-def ReadCSV(content):
+def ReadCSV(content, max_bytes=None, F=None, M=None):
     """
     Read either a .csv file containing a RUC definition.
 
     Arguments:
-        content str         content of the .csv file
+        content     str     content of the .csv file
+        max_bytes   int     optional memory budget for the mask in bytes
+        F           int     material ID of the fiber, None to infer it from the mask
+        M           int     material ID of the matrix, None to infer it from the mask
     
     Outputs:
         mask    2D array    integer array defining the microstructure
         out     dict        dictionary of actual microstructure properties
     """
+    return _ParseCSV(content.strip().splitlines(), max_bytes, F, M)
 
+
+def ReadCSVFile(src, max_bytes=None, F=None, M=None):
+    """
+    Read a .csv file containing a RUC definition from a path or stream.
+
+    Arguments:
+        src         str/file    path, or binary or text file-like object, of the .csv file
+        max_bytes   int         optional memory budget for the mask in bytes
+        F           int         material ID of the fiber, None to infer it from the mask
+        M           int         material ID of the matrix, None to infer it from the mask
+
+    Outputs:
+        mask    2D array    integer array defining the microstructure
+        out     dict        dictionary of actual microstructure properties
+    """
     # Import Modules
+    from Read.ReadLines import ReadLines
+
+    return _ParseCSV(ReadLines(src), max_bytes, F, M)
+
+
+def _ParseCSV(lines, max_bytes=None, F=None, M=None, cells=1 << 20):
+    """
+    Parse a RUC definition from an iterable of .csv lines, a block of rows at a time.
+
+    Blocks hold about a given number of subcells, whatever the row width, and each one
+    is narrowed to the compact dtype as soon as it is parsed, so the wide integers of
+    the parser only ever exist for one block. The memory budget is checked before each
+    block is parsed.
+
+    Arguments:
+        lines       iterable    lines of the .csv file
+        max_bytes   int         optional memory budget for the mask in bytes
+        F           int         material ID of the fiber, None to infer it from the mask
+        M           int         material ID of the matrix, None to infer it from the mask
+        cells       int         largest number of subcells parsed per block
+
+    Outputs:
+        mask    2D array    integer array defining the microstructure
+        out     dict        dictionary of actual microstructure properties
+    """
+
+    # Import Modules
+    import itertools
     import numpy as np
-    
-    # Get mask
-    mask = np.array([list(map(int, line.split(','))) for line in content.strip().splitlines()])
+    from Raster.Memory import MaskDtype, CheckBudget
+    from Raster.Phases import Phases
+    from Raster.Properties import PhaseFractions
+
+    # Size the blocks from the width of the first row
+    lines = (line for line in lines if line.strip() != "")
+    first = next(lines, None)
+    if first is None:
+        raise ValueError("The .csv file does not define any subcells.")
+    nx = first.count(',') + 1
+    rows = max(1, cells // nx)
+    lines = itertools.chain([first], lines)
+
+    # Get mask, keeping only compact blocks of rows in memory
+    blocks = []
+    dtype = np.uint8
+    ny = 0
+    while True:
+        block = list(itertools.islice(lines, rows))
+        if not block:
+            break
+
+        # -- Check the memory budget before parsing the rows
+        CheckBudget((ny + len(block), nx), dtype, max_bytes)
+        block = _ParseBlock(block)
+        if block.shape[1] != nx:
+            raise ValueError("Every row of the .csv file must have the same number of subcells.")
+        block = block.astype(MaskDtype(block.min(), block.max()))
+        dtype = np.result_type(dtype, block.dtype)
+        blocks.append(block)
+        ny += len(block)
+
+        # -- and again once a block needs a wider dtype
+        CheckBudget((ny, nx), dtype, max_bytes)
+
+    mask = np.concatenate(blocks, dtype=dtype) if len(blocks) > 1 else blocks[0]
+    del blocks
+
+    # Identify the phases
+    F, M, frac = Phases(mask, F, M)
 
     # Calculate actual values
     out = {
             'VF':None,
            'NB':None,
            'NG':None,
-           'F':1,
-           'M':2
+           'F':F,
+           'M':M
            }
     
-    # Set Dimensions
-    nx = len(mask[0,:])
-    ny = len(mask[:,0])
-
-    # Calculate Volume Fraction
-    out['VF'] = np.sum(mask == 1) / (nx * ny)
+    # Calculate Volume Fraction, of the fiber and of every phase
+    out['VF'] = frac.get(F, 0.)
+    out['VF_phases'] = PhaseFractions(mask, frac=frac)
 
     # Calculate subcell dimensions
     out['NB'] = nx
     out['NG'] = ny
 
-    return mask, out
\ No newline at end of file
+    return mask, out
+
+
+def _ParseBlock(block):
+    """
+    Parse a block of .csv lines into a 2D integer array with the C parser of NumPy.
+
+    Falls back to Python parsing, and its error messages, for anything NumPy cannot
+    read to the end.
+    """
+    # Import Modules
+    import warnings
+    import numpy as np
+
+    # Every row must hold the same number of subcells
+    ncol = {line.count(',') for line in block}
+    if len(ncol) != 1:
+        raise ValueError("Every row of the .csv file must have the same number of subcells.")
+    ncol = ncol.pop() + 1
+
+    # Bulk parse the whole block
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', DeprecationWarning)
+            vals = np.fromstring(','.join(block), dtype=np.int64, sep=',')
+        if len(vals) == len(block) * ncol:
+            return vals.reshape(len(block), ncol)
+    except ValueError:
+        pass
+
+    return np.array([list(map(int, line.split(','))) for line in block], dtype=np.int64)
@@ -0,0 +1,77 @@
+def IndexDeck(src):
+    """
+    Find the byte offset of every *RUC block of a multi-RUC deck.
+
+    Only the lines are scanned, nothing is parsed, so any one block can then be read
+    on its own with ReadDeck.
+
+    Arguments:
+        src     str/file    path, or binary or text file-like object, of the deck
+
+    Outputs:
+        offsets list        byte offset of the line starting each *RUC block
+    """
+    # Import Modules
+    import io
+    import mmap
+    import os
+
+    offsets = []
+
+    # Search memory-mapped paths directly
+    if isinstance(src, (str, os.PathLike)):
+        with open(src, 'rb') as fid:
+            if os.fstat(fid.fileno()).st_size == 0:
+                return offsets
+            with mmap.mmap(fid.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                pos = mm.find(b'*RUC')
+                while pos >= 0:
+                    start = mm.rfind(b'\n', 0, pos) + 1
+                    offsets.append(start)
+                    end = mm.find(b'\n', pos)
+                    if end < 0:
+                        break
+                    pos = mm.find(b'*RUC', end)
+        return offsets
+
+    # Count bytes line by line through streams
+    if hasattr(src, 'seek'):
+        src.seek(0)
+    text = isinstance(src, io.TextIOBase)
+    pos = 0
+    for line in src:
+        if text:
+            line = line.encode('utf-8')
+        if b'*RUC' in line:
+            offsets.append(pos)
+        pos += len(line)
+
+    return offsets
+
+
+def ReadDeck(src, i, offsets=None, max_bytes=None, F=None, M=None):
+    """
+    Read one *RUC block of a multi-RUC deck without parsing the others.
+
+    Arguments:
+        src         str/file    path, or binary or text file-like object, of the deck
+        i           int         index of the block, counting from 0
+        offsets     list        block offsets from IndexDeck, None to index the deck now
+        max_bytes   int         optional memory budget for the mask in bytes
+        F           int         material ID of the fiber, None to infer it from the mask
+        M           int         material ID of the matrix, None to infer it from the mask
+
+    Outputs:
+        mask    2D array    integer array defining the microstructure
+        out     dict        dictionary of actual microstructure properties
+        msg     str         error message, empty if the block was read
+    """
+    # Import Modules
+    from Read.ReadRUC import ReadRUCFile
+
+    if offsets is None:
+        offsets = IndexDeck(src)
+    if not -len(offsets) <= i < len(offsets):
+        return None, None, f"The deck has {len(offsets)} *RUC blocks, block {i} does not exist."
+
+    return ReadRUCFile(src, max_bytes, F, M, offset=offsets[i])
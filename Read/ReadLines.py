@@ -0,0 +1,40 @@
+def ReadLines(src, encoding="utf-8", offset=0):
+    """
+    Iterate over the lines of a file without decoding all of it at once.
+
+    Paths are memory-mapped and binary streams (such as Streamlit uploads) are read
+    line by line, so only one line is ever held as a decoded string.
+
+    Arguments:
+        src         str/file    path, or binary or text file-like object, to read
+        encoding    str         text encoding of the file
+        offset      int         byte offset of the first line to read
+
+    Outputs:
+        line        str         consecutive lines of the file, without line endings
+    """
+    # Import Modules
+    import io
+    import mmap
+    import os
+
+    # Memory-map paths
+    if isinstance(src, (str, os.PathLike)):
+        with open(src, 'rb') as fid:
+            if os.fstat(fid.fileno()).st_size == 0:
+                return
+            with mmap.mmap(fid.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                mm.seek(offset)
+                for line in iter(mm.readline, b''):
+                    yield line.decode(encoding).rstrip('\r\n')
+        return
+
+    # Read streams from the offset, one line at a time
+    if hasattr(src, 'seek'):
+        src.seek(offset)
+    if isinstance(src, io.TextIOBase):
+        for line in src:
+            yield line.rstrip('\r\n')
+    else:
+        for line in src:
+            yield line.decode(encoding).rstrip('\r\n')
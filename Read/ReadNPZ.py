@@ -0,0 +1,158 @@
+def ReadNPZ(content, max_bytes=None, F=None, M=None):
+    """
+    Read a NumPy .npz archive containing a RUC definition.
+
+    Arguments:
+        content     bytes   content of the .npz file
+        max_bytes   int     optional memory budget for the mask in bytes
+        F           int     material ID of the fiber, None to take it from the file
+        M           int     material ID of the matrix, None to take it from the file
+
+    Outputs:
+        mask    2D array    integer array defining the microstructure, or a RLE dict
+        out     dict        dictionary of actual microstructure properties
+        msg     str         error message, empty if the file was read
+    """
+    # Import Modules
+    import io
+
+    return ReadNPZFile(io.BytesIO(content), max_bytes, F, M)
+
+
+def ReadNPZFile(src, max_bytes=None, F=None, M=None, mmap=True):
+    """
+    Read a NumPy .npz archive containing a RUC definition from a path or stream.
+
+    From a path, the mask is memory-mapped read-only straight out of the archive, so
+    loading costs no copy and is not held to the memory budget. Streams are read into
+    memory after checking the budget against the stored shape.
+
+    Arguments:
+        src         str/file    path, or binary file-like object, of the .npz file
+        max_bytes   int         optional memory budget for the mask in bytes
+        F           int         material ID of the fiber, None to take it from the file
+        M           int         material ID of the matrix, None to take it from the file
+        mmap        bool        memory-map the mask when reading from a path
+
+    Outputs:
+        mask    2D array    integer array defining the microstructure, or a RLE dict
+        out     dict        dictionary of actual microstructure properties
+        msg     str         error message, empty if the file was read
+    """
+    # Import Modules
+    import json
+    import os
+    import zipfile
+    import numpy as np
+    from Raster.Phases import Phases
+    from Raster.Properties import VolumeFraction, PhaseFractions
+
+    # Initialize message
+    msg = ""
+
+    path = src if isinstance(src, (str, os.PathLike)) and mmap else None
+    try:
+        zf = zipfile.ZipFile(src)
+    except zipfile.BadZipFile:
+        msg = msg + "The file is not a .npz archive."
+        return None, None, msg
+
+    try:
+        with zf:
+            names = {name[:-4] for name in zf.namelist() if name.endswith('.npy')}
+
+            # Read the mask, or the runs of a RLE mask
+            if 'mask' in names:
+                mask = _Member(zf, 'mask', path, max_bytes)
+                ny, nx = mask.shape
+            elif {'rle_shape', 'rle_values', 'rle_lengths', 'rle_rows'} <= names:
+                ny, nx = _Member(zf, 'rle_shape').tolist()
+                mask = {
+                        'shape': (ny, nx),
+                        'values': _Member(zf, 'rle_values', path),
+                        'lengths': _Member(zf, 'rle_lengths', path),
+                        'rows': _Member(zf, 'rle_rows', path),
+                        }
+            else:
+                msg = msg + "No mask found in the .npz archive."
+                return None, None, msg
+
+            # Stored properties: scalars from JSON, arrays from their own members
+            out = json.loads(str(_Member(zf, 'out'))) if 'out' in names else {}
+            for name in sorted(names):
+                if name.startswith('out_'):
+                    out[name[4:]] = _Member(zf, name)
+    except (MemoryError, ValueError) as e:
+        msg = msg + str(e)
+        return None, None, msg
+
+    # Fill in whatever the file does not give
+    if F is not None or M is not None or not {'F', 'M', 'VF'} <= out.keys():
+        F, M, frac = Phases(mask, out.get('F') if F is None else F, out.get('M') if M is None else M)
+        out['F'] = F
+        out['M'] = M
+        out['VF'] = VolumeFraction(mask, F, out.get('H'), out.get('L')) if 'H' in out else frac.get(F, 0.)
+    out['H'] = np.asarray(out['H'], dtype=float) if 'H' in out else np.ones(ny)
+    out['L'] = np.asarray(out['L'], dtype=float) if 'L' in out else np.ones(nx)
+    if 'VF_phases' in out:
+        out['VF_phases'] = {int(ID): VF for ID, VF in out['VF_phases'].items()}
+    else:
+        out['VF_phases'] = PhaseFractions(mask, out['H'], out['L'])
+    out.setdefault('NB', nx)
+    out.setdefault('NG', ny)
+
+    return mask, out, msg
+
+
+def _Member(zf, name, path=None, max_bytes=None):
+    """
+    Load one .npy member of an archive, memory-mapping it from path when the member is
+    stored uncompressed.
+    """
+    # Import Modules
+    import struct
+    import zipfile
+    import numpy as np
+    from Raster.Memory import CheckBudget
+
+    info = zf.getinfo(name + '.npy')
+
+    # Map the array bytes in place: skip the zip local header and the .npy header
+    if path is not None and info.compress_type == zipfile.ZIP_STORED:
+        with open(path, 'rb') as fid:
+            fid.seek(info.header_offset)
+            n, m = struct.unpack('<HH', fid.read(30)[26:30])
+            fid.seek(info.header_offset + 30 + n + m)
+            shape, fortran, dtype = _Header(fid)
+            offset = fid.tell()
+        if dtype.hasobject:
+            raise ValueError(f"The .npz member '{name}' holds Python objects.")
+        if np.prod(shape) == 0:
+            return np.zeros(shape, dtype=dtype)
+        return np.memmap(path, dtype=dtype, mode='r', offset=offset, shape=shape, order='F' if fortran else 'C')
+
+    # Read into memory after checking the budget
+    with zf.open(info) as fid:
+        shape, fortran, dtype = _Header(fid)
+        if dtype.hasobject:
+            raise ValueError(f"The .npz member '{name}' holds Python objects.")
+        if len(shape) == 2:
+            CheckBudget(shape, dtype, max_bytes)
+        data = bytearray(int(np.prod(shape)) * dtype.itemsize)
+        fid.readinto(data)
+
+    return np.frombuffer(data, dtype=dtype).reshape(shape, order='F' if fortran else 'C')
+
+
+def _Header(fid):
+    """
+    Read the header of a .npy stream, leaving it at the start of the array data.
+    """
+    # Import Modules
+    import numpy as np
+
+    version = np.lib.format.read_magic(fid)
+    if version == (1, 0):
+        return np.lib.format.read_array_header_1_0(fid)
+
+    return np.lib.format.read_array_header_2_0(fid)
@@ -0,0 +1,195 @@
+def ReadRLE(content, F=None, M=None):
+    """
+    Read a run-length encoded *RLE file containing a RUC definition.
+
+    Arguments:
+        content     str     content of the .rle file
+        F           int     material ID of the fiber, None to infer it from the runs
+        M           int     material ID of the matrix, None to infer it from the runs
+
+    Outputs:
+        rle     dict        run-length encoded mask (see Raster.RLE)
+        out     dict        dictionary of actual microstructure properties
+        msg     str         error message, empty if the file was read
+    """
+    return _ParseRLE(content.strip().splitlines(), F, M)
+
+
+def ReadRLEFile(src, F=None, M=None):
+    """
+    Read a run-length encoded *RLE file containing a RUC definition from a path or stream.
+
+    Arguments:
+        src         str/file    path, or binary or text file-like object, of the .rle file
+        F           int         material ID of the fiber, None to infer it from the runs
+        M           int         material ID of the matrix, None to infer it from the runs
+
+    Outputs:
+        rle     dict        run-length encoded mask (see Raster.RLE)
+        out     dict        dictionary of actual microstructure properties
+        msg     str         error message, empty if the file was read
+    """
+    # Import Modules
+    from Read.ReadLines import ReadLines
+
+    return _ParseRLE(ReadLines(src), F, M)
+
+
+def _ParseRLE(lines, F=None, M=None):
+    """
+    Parse the first *RLE section from an iterable of lines, reporting malformed values
+    (a non-numeric NB, NG, H or L, a run that is not count*ID, stray text, ...) through
+    msg rather than raising.
+
+    Arguments:
+        lines   iterable    lines of the .rle file
+        F       int         material ID of the fiber, None to infer it from the runs
+        M       int         material ID of the matrix, None to infer it from the runs
+
+    Outputs:
+        rle     dict        run-length encoded mask (see Raster.RLE)
+        out     dict        dictionary of actual microstructure properties
+        msg     str         error message, empty if the file was read
+    """
+    try:
+        return _ParseSection(lines, F, M)
+    except (ValueError, IndexError) as e:
+        return None, None, f"The *RLE section could not be read: {e}"
+
+
+def _ParseSection(lines, F=None, M=None):
+    """
+    Parse the first *RLE section from an iterable of lines in a single pass.
+
+    The runs are kept as they are read, so the dense mask is never built.
+    """
+    # Import Modules
+    import re
+    import numpy as np
+    from Raster.Memory import MaskDtype
+    from Raster.Phases import Phases
+    from Raster.Properties import VolumeFraction, PhaseFractions
+    from Raster.RLE import RunsRLE
+
+    # Initialize message
+    msg = ""
+
+    # Characters dropped from values before splitting on commas
+    drop = str.maketrans('', '', '& \t\r\n')
+    run_re = re.compile(r'(\d+)\*(-?\d+)')
+
+    # Collect keywords and the runs of each SM row
+    found = False
+    keys = {}
+    counts = []
+    values = []
+    nrow = 0
+    for key, text in _Keywords(lines):
+        if key == '*RLE':
+            found = True
+
+        elif key == 'SM':
+            text = text.translate(drop)
+            if run_re.sub('', text).replace(',', ''):
+                raise ValueError(f"SM row {nrow + 1} has entries that are not count*ID runs.")
+            runs = np.array(run_re.findall(text), dtype=np.int64).reshape(-1, 2)
+            counts.append(runs[:, 0])
+            values.append(runs[:, 1])
+            nrow += 1
+
+        elif key in ('H', 'L'):
+            keys[key] = np.array([float(x) for x in text.translate(drop).split(',') if x != ''])
+
+        else:
+            keys[key] = int(text.replace('&', '').strip())
+
+    # Check the dimensions against the runs
+    NB = keys.get('NB', nrow)
+    NG = keys.get('NG', int(counts[0].sum()) if counts else 0)
+    if nrow != NB:
+        msg = msg + f"The RLE defines {nrow} SM rows, expected {NB}."
+        return None, None, msg
+    for i, n in enumerate(counts):
+        if n.sum() != NG:
+            msg = msg + f"SM row {i + 1} covers {n.sum()} subcells, expected {NG}."
+            return None, None, msg
+    H = keys.get('H', np.ones(NB))
+    L = keys.get('L', np.ones(NG))
+    if len(H) != NB or len(L) != NG:
+        msg = msg + f"H and L need {NB} and {NG} values for a {NB} x {NG} RUC."
+        return None, None, msg
+
+    # Assemble the runs in the smallest dtype that holds the material IDs
+    row = np.repeat(np.arange(nrow), [len(n) for n in counts])
+    counts = np.concatenate(counts) if counts else np.zeros(0, dtype=np.int64)
+    values = np.concatenate(values) if values else np.zeros(0, dtype=np.int64)
+    dtype = MaskDtype(values.min(), values.max()) if len(values) else np.uint8
+    rle = RunsRLE(row, values.astype(dtype), counts, (NB, NG))
+
+    # Identify the phases
+    F, M, frac = Phases(rle, F, M)
+
+    # Calculate actual values
+    out = {
+            'VF':None,
+           'NB':None,
+           'NG':None,
+           'F':F,
+           'M':M,
+           'H':H,
+           'L':L
+           }
+
+    # Calculate Volume Fraction, weighted by subcell area
+    if np.all(H == H[:1]) and np.all(L == L[:1]):
+        out['VF'] = frac.get(F, 0.)
+    else:
+        out['VF'] = VolumeFraction(rle, F, H, L)
+    out['VF_phases'] = PhaseFractions(rle, H, L, frac)
+
+    # Calculate subcell dimensions
+    out['NB'] = NG
+    out['NG'] = NB
+
+    return rle, out, msg
+
+
+def _Keywords(lines):
+    """
+    Tokenize the first *RLE section into (keyword, value text) pairs.
+
+    A ('*RLE', '') pair marks the start of the section. Values run until the next
+    keyword, so continuation lines are joined onto the keyword they continue; text
+    before the first keyword raises. The section ends at the next line starting
+    with '*'.
+    """
+    # Import Modules
+    import re
+
+    key_re = re.compile(r'\b(NB|NG|H|L|SM)=')
+
+    found = False
+    key = None
+    buf = []
+    for line in lines:
+        if not found:
+            if "*RLE" not in line:
+                continue
+            found = True
+            line = line.split("*RLE", 1)[1]
+            yield '*RLE', ''
+        elif line.lstrip().startswith('*'):
+            break
+
+        parts = key_re.split(line)
+        if key is None and parts[0].strip():
+            raise ValueError(f"'{parts[0].strip()[:40]}' is not part of a NB, NG, H, L or SM value.")
+        buf.append(parts[0])
+        for k in range(1, len(parts), 2):
+            if key is not None:
+                yield key, ' '.join(buf)
+            key = parts[k]
+            buf = [parts[k + 1]]
+
+    if key is not None:
+        yield key, ' '.join(buf)
@@ -1,147 +1,293 @@
-def ReadRUC(content):
+def ReadRUC(content, max_bytes=None, F=None, M=None):
     """
     Read either a .txt or .mac file containing a RUC definition.
 
     Arguments:
-        content str         content of the .mac/.txt file
-    
+        content     str     content of the .mac/.txt file
+        max_bytes   int     optional memory budget for the mask in bytes
+        F           int     material ID of the fiber, None to infer it from the mask
+        M           int     material ID of the matrix, None to infer it from the mask
+
+    Outputs:
+        mask    2D array    integer array defining the microstructure
+        out     dict        dictionary of actual microstructure properties
+        msg     str         error message, empty if the file was read
+    """
+    return _ParseRUC(content.strip().splitlines(), max_bytes, F, M)
+
+
+def ReadRUCFile(src, max_bytes=None, F=None, M=None, offset=0):
+    """
+    Read a .txt or .mac file containing a RUC definition from a path or stream.
+
+    The first *RUC section at or after the byte offset is read, so any block of a
+    multi-RUC deck can be loaded on its own (see IndexDeck).
+
+    Arguments:
+        src         str/file    path, or binary or text file-like object, of the .mac/.txt file
+        max_bytes   int         optional memory budget for the mask in bytes
+        F           int         material ID of the fiber, None to infer it from the mask
+        M           int         material ID of the matrix, None to infer it from the mask
+        offset      int         byte offset to start looking for the *RUC section
+
+    Outputs:
+        mask    2D array    integer array defining the microstructure
+        out     dict        dictionary of actual microstructure properties
+        msg     str         error message, empty if the file was read
+    """
+    # Import Modules
+    from Read.ReadLines import ReadLines
+
+    return _ParseRUC(ReadLines(src, offset=offset), max_bytes, F, M)
+
+
+def _ParseRUC(lines, max_bytes=None, F=None, M=None):
+    """
+    Parse the first *RUC section from an iterable of lines, reporting malformed values
+    (a non-numeric SM, H, L, NB, NG or ARCHID, ...) through msg rather than raising.
+
+    Arguments:
+        lines       iterable    lines of the .mac/.txt file
+        max_bytes   int         optional memory budget for the mask in bytes
+        F           int         material ID of the fiber, None to infer it from the mask
+        M           int         material ID of the matrix, None to infer it from the mask
+
     Outputs:
         mask    2D array    integer array defining the microstructure
         out     dict        dictionary of actual microstructure properties
+        msg     str         error message, empty if the file was read
+    """
+    try:
+        return _ParseSection(lines, max_bytes, F, M)
+    except (ValueError, IndexError) as e:
+        return None, None, f"The *RUC section could not be read: {e}"
+
+
+def _ParseSection(lines, max_bytes=None, F=None, M=None):
     """
-    
+    Parse the first *RUC section from an iterable of lines in a single pass.
+
+    Arguments:
+        lines       iterable    lines of the .mac/.txt file
+        max_bytes   int         optional memory budget for the mask in bytes
+        F           int         material ID of the fiber, None to infer it from the mask
+        M           int         material ID of the matrix, None to infer it from the mask
+
+    Outputs:
+        mask    2D array    integer array defining the microstructure
+        out     dict        dictionary of actual microstructure properties
+        msg     str         error message, empty if the file was read
+    """
+
     # Import Modules
     import numpy as np
+    from Raster.Memory import CheckBudget
+    from Raster.Phases import Phases
+    from Raster.Properties import VolumeFraction, PhaseFractions
 
     # Initialize message
     msg = ""
 
-    # Separate into lines
-    lines = content.strip().splitlines()
-
-    # Find *RUC section
-    flag = 0
-    end_line = len(lines)
-    for i, line in enumerate(lines):
-        if "*RUC" in line:
-            start_line = i
-            flag = 1
-            continue
-        if flag == 1:
-            if "*" in line:
-                end_line = i
-                break
-
-    if flag == 0:
+    # Characters dropped from values before splitting on commas
+    drop = str.maketrans('', '', '& \t\r\n')
+
+    # Collect keywords and fill the mask as the SM rows arrive
+    found = False
+    keys = {}
+    H = None
+    L = None
+    rows = []
+    mask = None
+    nrow = 0
+    for key, text in _Keywords(lines):
+        if key == '*RUC':
+            found = True
+
+        elif key in ('H', 'L'):
+            if key not in keys:
+                keys[key] = [float(x) for x in text.translate(drop).split(',') if x != '']
+                H = keys.get('H')
+                L = keys.get('L')
+
+        elif key == 'SM':
+            SM = _ParseInts(text.translate(drop))
+
+            # -- Allocate the mask once its dimensions are known
+            if mask is None and H is not None and L is not None:
+                NB, NG = len(H), len(L)
+                try:
+                    CheckBudget((NB, NG), np.uint8, max_bytes)
+                except MemoryError as e:
+                    msg = msg + str(e)
+                    return None, None, msg
+                mask = np.zeros(shape=(NB, NG), dtype=np.uint8)
+                for row in rows:
+                    if nrow < NB:
+                        mask, nrow, msg = _FillRow(mask, nrow, row, msg)
+                rows = []
+
+            # -- Fill the next row (widen the dtype only if a material ID needs it)
+            if mask is None:
+                rows.append(SM)
+            elif nrow < len(mask):
+                mask, nrow, msg = _FillRow(mask, nrow, SM, msg)
+
+        elif key not in keys:
+            keys[key] = text.split()[0] if text.split() else ''
+
+        if msg != "":
+            return None, None, msg
+
+    if not found:
         msg = msg + "No *RUC section found in the file."
         return None, None, msg
-    
-    # Check for 2D RUC
-    is_2D = False
-    for i in range(start_line, end_line):
-        if "MOD=" in lines[i]:
-            ndim = int(lines[i].split('MOD=')[1].split()[0][-1])
-            if ndim == 2:
-                is_2D = True
-            break
 
-    if not is_2D:
+    # Check for 2D RUC
+    if keys.get('MOD', '')[-1:] != '2':
         msg = msg + "The RUC defined in the file is not 2D."
         return None, None, msg
-    
-    # Check for ARCHID = 99
-    is_99 = False
-    for i in range(start_line, end_line):
-        if "ARCHID=" in lines[i]:
-            archid = int(lines[i].split('ARCHID=')[1].split()[0])
-            if archid == 99:
-                is_99 = True
-            break
 
-    if not is_99:
+    # Check for ARCHID = 99
+    if 'ARCHID' not in keys or int(keys['ARCHID']) != 99:
         msg = msg + "The RUC defined in the file is not ARCHID = 99."
         return None, None, msg
 
-    # Get subcells dimensions
-    H = ''
-    flag_h = 0
-    for i in range(start_line, end_line):
-        if "H=" in lines[i]:
-            H = H + lines[i].split('H=')[1]
-            flag_h = 1
-            continue
-        if flag_h == 1:
-            if "=" in lines[i]:
-                break
-            else:
-                H = H + lines[i]
-    H = H.replace('&','')
-    H = H.replace('\n','')
-    H = H.replace(' ','')
-    H = [float(x) for x in H.split(",") if x.strip() != ""]
-    NB = len(H)
-
-    L = ''
-    flag_l = 0
-    for i in range(start_line, end_line):
-        if "L=" in lines[i]:
-            L = L + lines[i].split('L=')[1]
-            flag_l = 1
-            continue
-        if flag_l == 1:
-            if "=" in lines[i]:
-                break
-            else:
-                L = L + lines[i]
-    L = L.replace('&','')
-    L = L.replace('\n','')
-    L = L.replace(' ','')
-    L = [float(x) for x in L.split(",") if x.strip() != ""]
-    NG = len(L)
-
-    # Get the subcell values
-    mask = np.zeros(shape=(NB,NG))
-
-    for j in range(NB):
-        SM = ''
-        flag_m = 0
-        for i in range(start_line, end_line):
-            if flag_m == 0:
-                if "SM=" in lines[i]:
-                    SM = SM + lines[i].split('SM=')[1]
-                    flag_m = 1
-                    continue
-            if flag_m == 1:
-                if "SM=" in lines[i]:
-                    start_line = i
-                    break
-                else:
-                    SM = SM + lines[i]
-        SM = SM.replace('&','')
-        SM = SM.replace('\n','')
-        SM = SM.replace(' ','')
-        SM = [int(x) for x in SM.split(",") if x.strip() != ""]
-        mask[j,:] = SM
-    mask = mask.astype(int)
+    # Rows collected without H/L take their dimensions from NB/NG or the rows themselves
+    if mask is None:
+        NB = len(H) if H is not None else int(keys.get('NB', len(rows)))
+        NG = len(L) if L is not None else int(keys.get('NG', len(rows[0]) if rows else 0))
+        try:
+            CheckBudget((NB, NG), np.uint8, max_bytes)
+        except MemoryError as e:
+            msg = msg + str(e)
+            return None, None, msg
+        mask = np.zeros(shape=(NB, NG), dtype=np.uint8)
+        for row in rows[:NB]:
+            mask, nrow, msg = _FillRow(mask, nrow, row, msg)
+        if msg != "":
+            return None, None, msg
+
+    if nrow < len(mask):
+        msg = msg + f"The RUC defines {nrow} SM rows, expected {len(mask)}."
+        return None, None, msg
+
+    # Identify the phases
+    F, M, frac = Phases(mask, F, M)
+
+    # Keep the subcell dimensions, 1 where the file gives none
+    H = np.ones(len(mask)) if H is None else np.array(H)
+    L = np.ones(mask.shape[1]) if L is None else np.array(L)
 
     # Calculate actual values
     out = {
             'VF':None,
            'NB':None,
            'NG':None,
-           'F':1,
-           'M':2
+           'F':F,
+           'M':M,
+           'H':H,
+           'L':L
            }
-    
+
     # Set Dimensions
     nx = len(mask[0,:])
     ny = len(mask[:,0])
 
-    # Calculate Volume Fraction
-    out['VF'] = np.sum(mask == 1) / (nx * ny)
+    # Calculate Volume Fraction, weighted by subcell area
+    if np.all(H == H[:1]) and np.all(L == L[:1]):
+        out['VF'] = frac.get(F, 0.)
+    else:
+        out['VF'] = VolumeFraction(mask, F, H, L)
+    out['VF_phases'] = PhaseFractions(mask, H, L, frac)
 
     # Calculate subcell dimensions
     out['NB'] = nx
     out['NG'] = ny
 
-    return mask, out, msg
\ No newline at end of file
+    return mask, out, msg
+
+
+def _Keywords(lines):
+    """
+    Tokenize the first *RUC section into (keyword, value text) pairs.
+
+    A ('*RUC', '') pair marks the start of the section. Values run until the next
+    keyword, so '&' continuation lines are joined onto the keyword they continue.
+    The section ends at the next line containing '*'.
+    """
+    # Import Modules
+    import re
+
+    key_re = re.compile(r'([A-Z]+)=')
+
+    found = False
+    key = None
+    buf = []
+    for line in lines:
+        if not found:
+            if "*RUC" not in line:
+                continue
+            found = True
+            line = line.split("*RUC", 1)[1]
+            yield '*RUC', ''
+        elif "*" in line:
+            break
+
+        parts = key_re.split(line)
+        buf.append(parts[0])
+        for k in range(1, len(parts), 2):
+            if key is not None:
+                yield key, ' '.join(buf)
+            key = parts[k]
+            buf = [parts[k + 1]]
+
+    if key is not None:
+        yield key, ' '.join(buf)
+
+
+def _FillRow(mask, nrow, SM, msg):
+    """
+    Store one SM row in the mask, widening its dtype if the row needs it.
+    """
+    # Import Modules
+    import numpy as np
+    from Raster.Memory import MaskDtype
+
+    if len(SM) != mask.shape[1]:
+        msg = msg + f"SM row {nrow + 1} has {len(SM)} values, expected {mask.shape[1]}."
+        return mask, nrow, msg
+
+    if len(SM) > 0:
+        dtype = np.result_type(mask.dtype, MaskDtype(SM.min(), SM.max()))
+        if dtype != mask.dtype:
+            mask = mask.astype(dtype)
+    mask[nrow, :] = SM
+
+    return mask, nrow + 1, msg
+
+
+def _ParseInts(text):
+    """
+    Parse a comma separated list of integers with the C parser of NumPy.
+
+    Falls back to Python parsing of the non-empty entries when the text has empty
+    entries or anything NumPy cannot read to the end.
+    """
+    # Import Modules
+    import warnings
+    import numpy as np
+
+    n = text.count(',') + 1 - text.endswith(',') if text else 0
+    if ',,' not in text and not text.startswith(','):
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore', DeprecationWarning)
+                vals = np.fromstring(text, dtype=np.int64, sep=',')
+            if len(vals) == n:
+                return vals
+        except ValueError:
+            pass
+
+    vals = [int(x) for x in text.split(',') if x != '']
+
+    return np.array(vals, dtype=np.int64)
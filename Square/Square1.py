@@ -1,12 +1,21 @@
-def Square1(VF, NB, F, M):
+def Square1(VF, NB, F, M, fill='grid', max_bytes=None, solve=False, coating=None, path=None):
     """
     Generate a square pack microstructure by defining the volume fraction and subcell dimensions.
 
     Arguments:
-        VF  float   desired volume fraction
-        NB  int     number of subcells in the beta direction
-        F   int     material ID of the fiber
-        M   int     material ID of the matrix
+        VF         float   desired volume fraction
+        NB         int     number of subcells in the beta direction
+        F          int     material ID of the fiber
+        M          int     material ID of the matrix
+        fill       str     fiber fill mode, 'grid' (distance test), 'scan' (row intervals), 'area' (fiber area), 'rle' (row intervals, run-length encoded mask) or 'tiles' (row bands into a disk-backed np.memmap)
+        max_bytes  int     optional memory budget for the mask in bytes
+        solve      bool    pick the radius whose rasterized volume fraction is closest to VF
+                           instead of the continuous formula; out['VF_error'] holds the miss.
+                           Works with every fill mode but 'area', which does not test subcell centers
+        coating    list    optional (thickness, ID) of each coating layer around the fibers, innermost first,
+                           thickness in subcells; needs the 'grid' or 'scan' fill mode
+        path       str     optional .npy file that keeps the 'tiles' mask on disk after the run, or a
+                           directory to hold its temporary file; None for the system temporary directory
 
     Outputs:
         mask    2D array    integer array defining the microstructure
@@ -14,6 +23,75 @@ def Square1(VF, NB, F, M):
     """
     # Import Modules
     import numpy as np
+    from Raster.Rasterize import Rasterize, SolveThreshold, CoatingLayers
+    from Raster.Properties import Properties
+
+    # Define the grid, circle centers and fiber radius
+    xs, ys, centers, R = _Square1Geometry(VF, NB)
+
+    # Fill fibers, solving for the radius on the grid if asked
+    if solve:
+        if fill == 'area':
+            raise ValueError("The solve mode thresholds the subcell centers, so it needs a fill mode other than 'area'.")
+        mask, R2 = SolveThreshold(xs, ys, centers, VF, F, M, max_bytes)
+
+        # -- Apply the solved radius in the asked fill mode (no fiber at all when R2 is -inf)
+        if coating or fill not in ('grid', 'scan'):
+            with np.errstate(invalid='ignore'):
+                mask = Rasterize(xs, ys, centers, R2, F, M, fill, max_bytes,
+                                 layers=CoatingLayers(np.sqrt(max(R2, 0.)), coating), path=path)
+    else:
+        mask = Rasterize(xs, ys, centers, R**2, F, M, fill, max_bytes, layers=CoatingLayers(R, coating), path=path)
+
+    # Calculate actual values
+    out = Properties(mask, F, M)
+    if solve:
+        out['VF_error'] = out['VF'] - VF
+
+    return mask, out
+
+
+def Square1Batch(VF, NB, F, M, max_bytes=None):
+    """
+    Generate square pack microstructures for many volume fractions at one subcell dimension.
+
+    The squared distance to the nearest fiber center is computed once per grid and
+    each mask thresholds it, giving the same masks as calling Square1 for each value.
+
+    Arguments:
+        VF         array   desired volume fractions
+        NB         int     number of subcells in the beta direction
+        F          int     material ID of the fiber
+        M          int     material ID of the matrix
+        max_bytes  int     optional memory budget for each mask in bytes
+
+    Outputs:
+        mask    2D array    integer array defining the microstructure, one per VF
+        out     dict        dictionary of actual microstructure properties, one per VF
+    """
+    # Import Modules
+    import itertools
+    from Raster.Rasterize import RasterizeMany
+    from Raster.Properties import Properties
+
+    # Values on the same grid share one distance field
+    runs = [_Square1Geometry(value, NB) for value in VF]
+    for _, group in itertools.groupby(runs, key=lambda run: (len(run[0]), len(run[1]))):
+        group = list(group)
+        xs, ys, centers, _ = group[0]
+        R2s = [run[3]**2 for run in group]
+
+        # Threshold the field at every radius
+        for mask in RasterizeMany(xs, ys, centers, R2s, F, M, max_bytes):
+            yield mask, Properties(mask, F, M)
+
+
+def _Square1Geometry(VF, NB):
+    """
+    Subcell centers, circle centers and fiber radius of a Square1 microstructure.
+    """
+    # Import Modules
+    import numpy as np
 
     # Force even number of subcells
     nx = NB
@@ -41,33 +119,6 @@ def Square1(VF, NB, F, M):
     # Create subcell centers
     xs = xmin + (np.arange(nx) + 0.5) * dx
     ys = ymin + (np.arange(ny) + 0.5) * dy
-    X, Y = np.meshgrid(xs, ys)
-
-    # Integer grid: start all zeros
-    mask = M * np.ones((ny, nx), dtype=int)
-
-    # Fill fibers
-    inside = (X - center[0])**2 + (Y - center[1])**2 <= R**2
-    mask[inside] = F
-
-    # Calculate actual values
-    out = {
-            'VF':None,
-           'R':None,
-           'NB':None,
-           'NG':None,
-           'F':F,
-           'M':M
-           }
-    
-    # Calculate Volume Fraction
-    out['VF'] = np.sum(mask == F) / (nx * ny)
-
-    # Calculate Radius
-    out['R'] = np.sum(mask[:,int(nx/2)] == F)/2
 
-    # Calculate subcell dimensions
-    out['NB'] = len(mask[0])
-    out['NG'] = len(mask)
 
-    return mask, out
\ No newline at end of file
+    return xs, ys, [center], R
@@ -0,0 +1,56 @@
+def Square4(VF, R, fine, coarse, F, M, ratio=2., fill='grid', max_bytes=None, coating=None, path=None):
+    """
+    Generate a square pack microstructure with graded subcells by defining the volume fraction, radius and subcell widths.
+
+    Subcells are fine at the fiber tangents, where the fiber edge runs along the
+    grid lines, and grow towards the coarse width where the edge crosses the grid
+    steeply or not at all. The subcell heights and lengths are returned in out['H']
+    and out['L'], in the units of R.
+
+    With the area fill, fine = R/20 and coarse = R/5, a uniform grid (Square2) needs
+    about two to four times as many subcells to mislabel as little fiber area.
+
+    Arguments:
+        VF         float   desired volume fraction
+        R          float   radius of the fiber
+        fine       float   subcell width at the fiber edge
+        coarse     float   largest subcell width
+        F          int     material ID of the fiber
+        M          int     material ID of the matrix
+        ratio      float   largest growth in width from one subcell to the next
+        fill       str     fiber fill mode, 'grid' (distance test), 'scan' (row intervals), 'area' (fiber area), 'rle' (row intervals, run-length encoded mask) or 'tiles' (row bands into a disk-backed np.memmap)
+        max_bytes  int     optional memory budget for the mask in bytes
+        coating    list    optional (thickness, ID) of each coating layer around the fibers, innermost first,
+                           thickness in the units of R; needs the 'grid' or 'scan' fill mode
+        path       str     optional .npy file that keeps the 'tiles' mask on disk after the run, or a
+                           directory to hold its temporary file; None for the system temporary directory
+
+    Outputs:
+        mask    2D array    integer array defining the microstructure
+        out     dict        dictionary of actual microstructure properties
+    """
+    # Import Modules
+    import numpy as np
+    from Raster.Graded import Graded
+    from Raster.Rasterize import Rasterize, CoatingLayers
+    from Raster.Properties import Properties
+
+    # Calculate the spacing vector length
+    W = np.sqrt((np.pi*R**2/VF))
+    center = [W/2, W/2]
+
+    # Grade the subcells towards the tangents of the fiber
+    L = Graded(W, [W/2], R, fine, coarse, ratio, mirror=True)
+    H = L.copy()
+
+    # Create subcell centers
+    xs = np.cumsum(L) - L/2
+    ys = np.cumsum(H) - H/2
+
+    # Fill fibers
+    mask = Rasterize(xs, ys, [center], R**2, F, M, fill, max_bytes, H=H, L=L, layers=CoatingLayers(R, coating), path=path)
+
+    # Calculate actual values
+    out = Properties(mask, F, M, H, L)
+
+    return mask, out
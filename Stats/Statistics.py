@@ -0,0 +1,388 @@
+def Statistics(mask, F, H=None, L=None, max_bytes=None):
+    """
+    Summarize the fiber arrangement of a periodic microstructure.
+
+    Fibers are the 4-connected components of the fiber phase, joined across the
+    periodic boundaries. Areas, radii and distances are in subcells; with subcell
+    dimensions, the interface length is in the units of H and L.
+
+    Arguments:
+        mask    2D array    integer array defining the microstructure
+        F       int         material ID of the fiber
+        H       1D array    optional height of each row of subcells
+        L       1D array    optional length of each column of subcells
+        max_bytes   int     memory budget for the correlation arrays in bytes, None for no limit
+
+    Outputs:
+        stats   dict        scalar statistics, plus 'S2' (radial two-point correlation),
+                            'LPx' and 'LPy' (lineal path along each axis) and 'Areas'
+                            (area of each fiber, largest first) as 1D arrays
+    """
+    # Import Modules
+    import numpy as np
+    from Raster.Memory import CheckBudget
+
+    ny, nx = mask.shape
+
+    # The correlation needs a few float32 copies of the mask
+    CheckBudget((ny, nx), np.float32, max_bytes)
+
+    # Fibers and their spacing
+    count, areas, centroids = Components(mask, F)
+    nn = NearestNeighbors(centroids, (ny, nx))
+    nn = nn[np.isfinite(nn)]
+
+    # Correlation functions
+    r, S2 = RadialProfile(TwoPoint(mask, F))
+
+    # Fiber size distribution
+    q = np.percentile(areas, [0, 10, 50, 90, 100]) if count else np.zeros(5)
+
+    stats = {
+            'Fibers':count,
+            'Mean Fiber Area':areas.mean() if count else 0.,
+            'Fiber Area Std':areas.std() if count else 0.,
+            'Min Fiber Area':q[0],
+            'P10 Fiber Area':q[1],
+            'Median Fiber Area':q[2],
+            'P90 Fiber Area':q[3],
+            'Max Fiber Area':q[4],
+            'Equivalent Radius':np.sqrt(areas.mean() / np.pi) if count else 0.,
+            'Mean NN Distance':nn.mean() if len(nn) else np.nan,
+            'Min NN Distance':nn.min() if len(nn) else np.nan,
+            'Interface Length':InterfaceLength(mask, F, H, L),
+            'S2':S2,
+            'LPx':LinealPath(mask, F, axis=1),
+            'LPy':LinealPath(mask, F, axis=0),
+            'Areas':np.sort(areas)[::-1],
+            }
+
+    return stats
+
+
+def SizeDistribution(areas, bins=20):
+    """
+    Histogram of fiber areas.
+
+    Arguments:
+        areas   1D array    area of each fiber, from Components
+        bins    int         number of bins; when there are no more distinct areas than
+                            this (uniform packings), each distinct area is its own bin
+
+    Outputs:
+        sizes   1D array    area at the center of each bin
+        counts  1D array    number of fibers in each bin
+    """
+    # Import Modules
+    import numpy as np
+
+    areas = np.asarray(areas, dtype=float)
+
+    # Count each distinct area when there are only a few
+    sizes, counts = np.unique(areas, return_counts=True)
+    if len(sizes) <= bins:
+        return sizes, counts
+
+    counts, edges = np.histogram(areas, bins)
+
+    return (edges[:-1] + edges[1:]) / 2, counts
+
+
+def TwoPoint(mask, ID):
+    """
+    Periodic two-point correlation of one material, computed with FFTs.
+
+    Arguments:
+        mask    2D array    integer array defining the microstructure
+        ID      int         material ID
+
+    Outputs:
+        S2      2D array    probability that two subcells offset by [dy, dx] both hold
+                            the material; S2[0, 0] is its volume fraction
+    """
+    # Import Modules
+    import cv2
+    import numpy as np
+
+    ny, nx = mask.shape
+
+    # Autocorrelation of the indicator in packed real spectra
+    I = (mask == ID).astype(np.float32)
+    spec = cv2.dft(I)
+    S2 = cv2.idft(cv2.mulSpectrums(spec, spec, 0, conjB=True), flags=cv2.DFT_REAL_OUTPUT | cv2.DFT_SCALE)
+
+    return S2 / (nx * ny)
+
+
+def RadialProfile(S2):
+    """
+    Average a periodic 2D correlation over rings of equal offset length.
+
+    Arguments:
+        S2      2D array    periodic correlation indexed by offset [dy, dx]
+
+    Outputs:
+        r       1D array    offset length of each ring, in subcells
+        S       1D array    mean correlation over each ring
+    """
+    # Import Modules
+    import numpy as np
+
+    ny, nx = S2.shape
+
+    # Fold the offsets onto their shortest periodic length along each axis
+    Q, wy = _Fold(S2, ny, 0)
+    Q, wx = _Fold(Q, nx, 1)
+    dy = np.arange(len(wy), dtype=np.float32)
+    dx = np.arange(len(wx), dtype=np.float32)
+    ring = np.rint(np.hypot(dy[:, None], dx[None, :])).astype(np.int64).ravel()
+
+    # Average each whole ring up to half the shorter side
+    count = np.bincount(ring, weights=np.outer(wy, wx).ravel())
+    total = np.bincount(ring, weights=Q.ravel())
+    n = min(ny, nx) // 2 + 1
+
+    return np.arange(n), total[:n] / count[:n]
+
+
+def LinealPath(mask, ID, axis=1):
+    """
+    Periodic lineal path function of one material along one axis.
+
+    Counted exactly from the run lengths of every line: a run of n subcells holds
+    n - z segments spanning z + 1 consecutive subcells. Lines are scanned a block at a
+    time, so the run arrays stay small and columns are only transposed a block at once.
+
+    Arguments:
+        mask    2D array    integer array defining the microstructure
+        ID      int         material ID
+        axis    int         1 to follow the rows, 0 to follow the columns
+
+    Outputs:
+        LP      1D array    probability that a segment of length z (from one subcell
+                            center to the one z subcells on) lies wholly in the material;
+                            LP[0] is its volume fraction
+    """
+    # Import Modules
+    import numpy as np
+    from Raster.Memory import RowBlocks
+
+    # Histogram of the periodic run lengths, a block of lines at a time
+    ny, nx = mask.shape if axis == 1 else mask.shape[::-1]
+    h = np.zeros(nx + 1, dtype=np.int64)
+    full = 0
+    for lines in RowBlocks((ny, nx), cells=1 << 20):
+        I = mask[lines] == ID if axis == 1 else (mask[:, lines] == ID).T
+        block, n = _RunLengths(I)
+        h += block
+        full += n
+
+    # Sum (n - z) over the runs longer than z with suffix sums of the run histogram
+    A = np.cumsum(h[::-1])[::-1]
+    B = np.cumsum((np.arange(nx + 1) * h)[::-1])[::-1]
+    z = np.arange(nx)
+
+    return (B[z + 1] - z * A[z + 1] + full * nx) / (nx * ny)
+
+
+def Components(mask, ID):
+    """
+    Find the 4-connected components of one material on a periodic grid.
+
+    Arguments:
+        mask    2D array    integer array defining the microstructure
+        ID      int         material ID
+
+    Outputs:
+        count       int         number of components
+        areas       1D array    number of subcells in each component
+        centroids   2D array    [y, x] center of each component, in subcell indices
+    """
+    # Import Modules
+    import cv2
+    import numpy as np
+
+    ny, nx = mask.shape
+
+    # Label the components inside the cell
+    n, labels, stats, cent = cv2.connectedComponentsWithStats(
+            (mask == ID).view(np.uint8), connectivity=4, ltype=cv2.CV_32S)
+    area = stats[1:, cv2.CC_STAT_AREA].astype(float)
+    cent = cent[1:, ::-1]
+
+    # Join labels that touch across the periodic boundaries
+    a = np.concatenate([labels[0, :], labels[:, 0]])
+    b = np.concatenate([labels[-1, :], labels[:, -1]])
+    both = (a > 0) & (b > 0) & (a != b)
+    a = a[both] - 1
+    b = b[both] - 1
+    root = np.arange(n - 1)
+    while len(a):
+        ra = root[a]
+        rb = root[b]
+        low = np.minimum(ra, rb)
+        joined = root.copy()
+        np.minimum.at(joined, ra, low)
+        np.minimum.at(joined, rb, low)
+        joined = joined[joined]
+        if np.array_equal(joined, root):
+            break
+        root = joined
+    groups, root = np.unique(root, return_inverse=True)
+
+    # Area weighted centroids, unwrapping each piece next to the first of its group
+    box = np.array([ny, nx])
+    ref = cent[np.unique(root, return_index=True)[1]]
+    d = cent - ref[root]
+    d -= box * np.round(d / box)
+    areas = np.bincount(root, weights=area, minlength=len(groups))
+    shift = np.stack([np.bincount(root, weights=area * d[:, k], minlength=len(groups)) for k in (0, 1)], axis=1)
+    centroids = (ref + shift / areas[:, None]) % box
+
+    return len(groups), areas, centroids
+
+
+def NearestNeighbors(points, size):
+    """
+    Distance from each point to its nearest neighbor in a periodic box.
+
+    Points are hashed into cells about one mean spacing wide and the search grows ring
+    by ring until every nearest neighbor found is closer than any unsearched cell.
+
+    Arguments:
+        points  2D array    [y, x] coordinates of the points
+        size    tuple       (height, width) of the periodic box
+
+    Outputs:
+        dist    1D array    nearest neighbor distance of each point, inf if alone
+    """
+    # Import Modules
+    import numpy as np
+
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    N = len(points)
+    best = np.full(N, np.inf)
+    if N < 2:
+        return best
+    box = np.asarray(size, dtype=float)
+
+    # Sort the points by hash cell
+    m = np.maximum(1, (box / np.sqrt(box.prod() / N)).astype(np.int64))
+    w = box / m
+    cell = (points // w).astype(np.int64) % m
+    key = cell[:, 0] * m[1] + cell[:, 1]
+    order = np.argsort(key, kind='stable')
+    starts = np.searchsorted(key[order], np.arange(m.prod()))
+    ends = np.searchsorted(key[order], np.arange(m.prod()), side='right')
+
+    # Search rings of cells outward until every point is settled
+    seen = set()
+    pending = np.arange(N)
+    k = 0
+    while len(pending) and len(seen) < m.prod():
+        for di in range(-k, k + 1):
+            for dj in range(-k, k + 1):
+                if max(abs(di), abs(dj)) != k or (di % m[0], dj % m[1]) in seen:
+                    continue
+                seen.add((di % m[0], dj % m[1]))
+
+                # -- Candidates in the offset cell
+                other = ((cell[pending, 0] + di) % m[0]) * m[1] + (cell[pending, 1] + dj) % m[1]
+                first = starts[other]
+                count = ends[other] - first
+                i = np.repeat(pending, count)
+                j = order[np.repeat(first - np.cumsum(count) + count, count) + np.arange(count.sum())]
+                keep = i != j
+                i = i[keep]
+                j = j[keep]
+
+                # -- Periodic distances
+                dv = points[i] - points[j]
+                dv -= box * np.round(dv / box)
+                np.minimum.at(best, i, np.hypot(dv[:, 0], dv[:, 1]))
+
+        pending = pending[best[pending] > k * w.min()]
+        k += 1
+
+    return best
+
+
+def InterfaceLength(mask, ID, H=None, L=None):
+    """
+    Total length of the boundary between one material and the rest, periodic.
+
+    Arguments:
+        mask    2D array    integer array defining the microstructure
+        ID      int         material ID
+        H       1D array    optional height of each row of subcells, 1 if None
+        L       1D array    optional length of each column of subcells, 1 if None
+
+    Outputs:
+        length  float       interface length, in subcells or the units of H and L
+    """
+    # Import Modules
+    import numpy as np
+
+    ny, nx = mask.shape
+    I = mask == ID
+
+    # Faces between horizontal neighbors are one subcell high, vertical ones one long
+    across = np.count_nonzero(I != np.roll(I, 1, axis=1), axis=1)
+    down = np.count_nonzero(I != np.roll(I, 1, axis=0), axis=0)
+    H = np.ones(ny) if H is None else np.asarray(H, dtype=float)
+    L = np.ones(nx) if L is None else np.asarray(L, dtype=float)
+
+    return float(across @ H + down @ L)
+
+
+def _Fold(a, n, axis):
+    """
+    Add the entries at offsets n - d onto those at d along one axis, returning the
+    folded array (offsets 0 to n // 2) and how many offsets each entry now holds.
+    """
+    # Import Modules
+    import numpy as np
+
+    h = n // 2 + 1
+    k = (n - 1) // 2
+    a = np.moveaxis(a, axis, 0)
+    out = a[:h].copy()
+    out[1:k + 1] += a[n - 1:n - k - 1:-1]
+    w = np.ones(h)
+    w[1:k + 1] = 2
+
+    return np.moveaxis(out, 0, axis), w
+
+
+def _RunLengths(I):
+    """
+    Histogram of the lengths of the periodic runs of True along each line of I, and
+    the number of lines that are wholly True (which hold no run of their own).
+    """
+    # Import Modules
+    import numpy as np
+
+    # Lines padded with a gap at each end, so run edges alternate start and end
+    ny, nx = I.shape
+    P = np.zeros((ny, nx + 2), dtype=bool)
+    P[:, 1:-1] = I
+    edges = np.flatnonzero(P[:, 1:] != P[:, :-1])
+    starts = edges[0::2]
+    lengths = edges[1::2] - starts
+
+    # Join the last run of a line onto its first across the periodic boundary
+    line = starts // (nx + 1)
+    col = starts - line * (nx + 1)
+    head = np.full(ny, -1)
+    tail = np.full(ny, -1)
+    head[line[col == 0]] = np.flatnonzero(col == 0)
+    tail[line[col + lengths == nx]] = np.flatnonzero(col + lengths == nx)
+    join = (head >= 0) & (tail >= 0) & (head != tail)
+    lengths[head[join]] += lengths[tail[join]]
+    lengths[tail[join]] = 0
+
+    # Lines wholly in the material
+    full = np.count_nonzero(lengths == nx)
+    lengths = lengths[(lengths > 0) & (lengths < nx)]
+
+    return np.bincount(lengths, minlength=nx + 1)[:nx + 1], full
@@ -0,0 +1,277 @@
+# Import Modules
+import itertools
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+
+# Most recent stages kept by a trace, older ones are dropped
+MAX_EVENTS = 10000
+
+# Shared by every trace: the lock, the stages open on each thread, and how many traces are on
+_LOCK = threading.Lock()
+_LOCAL = threading.local()
+_IDS = itertools.count()
+_STATE = {'on': 0, 'tracemalloc': False}
+
+# Trace of the process, used by any context that did not pick one
+_PROCESS = {'on': False, 'start': time.perf_counter_ns(), 'events': deque(maxlen=MAX_EVENTS)}
+_CURRENT = ContextVar('trace', default=_PROCESS)
+
+# Stage stand-in while tracing is off
+_OFF = nullcontext()
+
+
+def Stage(name, **args):
+    """
+    Time one stage of the pipeline when tracing is on.
+
+    Use as "with Stage('fill'):". Stages nest, and each records its wall time, the
+    peak memory traced by tracemalloc above the level it started at (numpy reports
+    its arrays there too) and the net memory it left allocated. tracemalloc is
+    process wide, so stages running at once on other threads or sessions share these
+    numbers. The stage goes to the trace of the current context (see UseTrace), and
+    while that trace is off it costs a single check.
+
+    Arguments:
+        name    str     stage name
+        args    dict    optional values stored with the stage (sizes, modes, ...)
+
+    Outputs:
+        stage   context manager timing the block it wraps
+    """
+    trace = _CURRENT.get()
+    if not trace['on']:
+        return _OFF
+
+    return _Stage(trace, name, args)
+
+
+def NewTrace(on=None, max_events=MAX_EVENTS):
+    """
+    Create a trace of its own, such as one per Streamlit session (see UseTrace).
+
+    Arguments:
+        on          bool    record stages from the start, None to follow the process trace (RUC_TRACE)
+        max_events  int     most recent stages kept, older ones are dropped
+
+    Outputs:
+        trace       dict    trace to pass to UseTrace
+    """
+    trace = {'on': False, 'start': time.perf_counter_ns(), 'events': deque(maxlen=max_events)}
+    if on is None:
+        on = _PROCESS['on']
+    _Switch(trace, on)
+
+    return trace
+
+
+def UseTrace(trace):
+    """
+    Make a trace the one Stage and the functions of this module use in the current
+    context: this thread, and work it hands to other threads with a copy of its
+    context (see Cache.PrefetchWrite).
+
+    Arguments:
+        trace   dict    trace from NewTrace
+    """
+    _CURRENT.set(trace)
+
+
+def EnableTrace(on=True):
+    """
+    Turn tracing of the current trace on or off. tracemalloc runs while any trace is
+    on, unless something else already runs it, and the stages recorded so far are kept.
+
+    Arguments:
+        on      bool    record stages from now on
+    """
+    _Switch(_CURRENT.get(), on)
+
+
+def TraceOn():
+    """
+    Check whether the current trace is on.
+
+    Outputs:
+        on      bool    stages are being recorded
+    """
+    return _CURRENT.get()['on']
+
+
+def ClearTrace():
+    """
+    Forget every stage recorded by the current trace and restart its clock.
+    """
+    trace = _CURRENT.get()
+    with _LOCK:
+        trace['events'].clear()
+        trace['start'] = time.perf_counter_ns()
+
+
+def TraceEvents():
+    """
+    Copy of the stages recorded by the current trace, in the order they finished; only
+    the latest max_events are kept (see NewTrace).
+
+    Outputs:
+        events  list    one dict per stage: 'name', 'id', 'parent' (id of the enclosing
+                        stage, None at the top), 'depth', 'thread', 'start' (since the
+                        trace clock started) and 'seconds', 'alloc_mb', 'net_mb', 'args'
+    """
+    trace = _CURRENT.get()
+    with _LOCK:
+        return [dict(event) for event in trace['events']]
+
+
+def TraceSummary(events=None):
+    """
+    Break the recorded time down by stage name.
+
+    Self time leaves out the stages nested inside, so the self time of a generator is
+    the work of its own lines, such as building the subcell centers.
+
+    Arguments:
+        events  list    stages from TraceEvents, None for the recorded ones
+
+    Outputs:
+        rows    list    one dict per stage name in order of first start: 'Stage',
+                        'Calls', 'Total (s)', 'Self (s)', 'Peak Alloc (MB)', 'Net Alloc (MB)'
+    """
+    events = TraceEvents() if events is None else events
+
+    # Time spent in the stages directly inside each stage
+    nested = {}
+    for event in events:
+        if event['parent'] is not None:
+            nested[event['parent']] = nested.get(event['parent'], 0.) + event['seconds']
+
+    rows = {}
+    for event in sorted(events, key=lambda event: event['start']):
+        row = rows.setdefault(event['name'], {'Stage': event['name'], 'Calls': 0, 'Total (s)': 0., 'Self (s)': 0.,
+                                               'Peak Alloc (MB)': 0., 'Net Alloc (MB)': 0.})
+        row['Calls'] += 1
+        row['Total (s)'] += event['seconds']
+        row['Self (s)'] += event['seconds'] - nested.get(event['id'], 0.)
+        row['Peak Alloc (MB)'] = max(row['Peak Alloc (MB)'], event['alloc_mb'])
+        row['Net Alloc (MB)'] += event['net_mb']
+
+    return list(rows.values())
+
+
+def ChromeTrace(events=None):
+    """
+    Format stages as a Chrome trace, for chrome://tracing or Perfetto.
+
+    Arguments:
+        events  list    stages from TraceEvents, None for the recorded ones
+
+    Outputs:
+        trace   str     JSON text of the trace
+    """
+    # Import Modules
+    import json
+
+    events = TraceEvents() if events is None else events
+    pid = os.getpid()
+
+    trace = [{
+            'name': event['name'],
+            'cat': 'ruc',
+            'ph': 'X',
+            'ts': event['start'] * 1e6,
+            'dur': event['seconds'] * 1e6,
+            'pid': pid,
+            'tid': event['thread'],
+            'args': dict(event['args'], alloc_mb=event['alloc_mb'], net_mb=event['net_mb']),
+            } for event in events]
+
+    return json.dumps({'traceEvents': trace, 'displayTimeUnit': 'ms'}, default=str)
+
+
+def WriteTrace(f, events=None):
+    """
+    Write stages as a Chrome trace file.
+
+    Arguments:
+        f       str/file    path, or text file-like object, to write to
+        events  list        stages from TraceEvents, None for the recorded ones
+    """
+    if isinstance(f, (str, os.PathLike)):
+        with open(f, 'w') as fid:
+            fid.write(ChromeTrace(events))
+        return
+
+    f.write(ChromeTrace(events))
+
+
+def _Switch(trace, on):
+    """
+    Turn a trace on or off, running tracemalloc while any trace is on.
+    """
+    with _LOCK:
+        if bool(on) == trace['on']:
+            return
+        trace['on'] = bool(on)
+        _STATE['on'] += 1 if on else -1
+        if _STATE['on'] and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _STATE['tracemalloc'] = True
+        elif not _STATE['on'] and _STATE['tracemalloc']:
+            tracemalloc.stop()
+            _STATE['tracemalloc'] = False
+
+
+@contextmanager
+def _Stage(trace, name, args):
+    """
+    Record one stage, linked to the stage enclosing it on the same thread.
+    """
+    # Stages open on this thread, innermost last
+    stack = getattr(_LOCAL, 'stack', None)
+    if stack is None:
+        stack = _LOCAL.stack = []
+
+    # Hand the peak so far to the enclosing stage before measuring this one
+    current, peak = tracemalloc.get_traced_memory()
+    if stack:
+        stack[-1]['peak'] = max(stack[-1]['peak'], peak)
+    tracemalloc.reset_peak()
+    stage = {'id': next(_IDS), 'parent': stack[-1]['id'] if stack else None, 'depth': len(stack),
+             'base': current, 'peak': current}
+    stack.append(stage)
+    start = time.perf_counter_ns()
+    try:
+        yield
+    finally:
+        end = time.perf_counter_ns()
+        current, peak = tracemalloc.get_traced_memory()
+        stack.pop()
+        stage['peak'] = max(stage['peak'], peak)
+        if stack:
+            stack[-1]['peak'] = max(stack[-1]['peak'], stage['peak'])
+
+        with _LOCK:
+            trace['events'].append({
+                    'name': name,
+                    'id': stage['id'],
+                    'parent': stage['parent'],
+                    'depth': stage['depth'],
+                    'thread': threading.get_ident(),
+                    'start': (start - trace['start']) / 1e9,
+                    'seconds': (end - start) / 1e9,
+                    'alloc_mb': (stage['peak'] - stage['base']) / 1024**2,
+                    'net_mb': (current - stage['base']) / 1024**2,
+                    'args': args,
+                    })
+
+
+# Trace from the start when RUC_TRACE is set; a .json value is written there on exit
+if os.environ.get('RUC_TRACE', '0') not in ('', '0'):
+    EnableTrace(True)
+    if os.environ['RUC_TRACE'].endswith('.json'):
+        import atexit
+        atexit.register(WriteTrace, os.environ['RUC_TRACE'])
@@ -7,4 +7,66 @@ def WriteCSV(mask):
     pd.DataFrame(mask).to_csv(csv_buffer, index=False, header=False)
     csv_data = csv_buffer.getvalue()
 
-    return csv_data
\ No newline at end of file
+    return csv_data
+
+def WriteCSVFile(mask, f, rows=256):
+    """
+    Stream a mask as .csv text to a file, one block of rows at a time.
+
+    Arguments:
+        mask    2D array    integer array defining the microstructure (a np.memmap works), or a RLE dict
+        f       str/file    path, or text or binary file-like object, to write to
+        rows    int         number of rows formatted per chunk
+    """
+    # Import Modules
+    import io
+    import os
+
+    # Open paths ourselves
+    if isinstance(f, (str, os.PathLike)):
+        with open(f, 'w', newline='') as fid:
+            WriteCSVFile(mask, fid, rows)
+        return
+
+    # Encode for binary streams
+    binary = not isinstance(f, io.TextIOBase)
+    for chunk in WriteCSVChunks(mask, rows):
+        f.write(chunk.encode('utf-8') if binary else chunk)
+
+
+def WriteCSVChunks(mask, rows=256):
+    """
+    Generate the .csv text of an integer mask in chunks, matching WriteCSV.
+
+    A run-length encoded mask (see Raster.RLE) is expanded one block of rows at a time.
+
+    Arguments:
+        mask    2D array    integer array defining the microstructure, or a RLE dict
+        rows    int         number of rows formatted per chunk
+
+    Outputs:
+        chunk   str         consecutive pieces of the .csv text
+    """
+    # Import Modules
+    import numpy as np
+    from Raster.RLE import DecodeRLE
+
+    rle = isinstance(mask, dict)
+    NB, NG = mask['shape'] if rle else mask.shape
+    values = mask['values'] if rle else mask
+
+    # Single digit IDs: lay out each block of lines as ASCII bytes in one go
+    if NB > 0 and NG > 0 and values.min() >= 0 and values.max() <= 9:
+        buf = np.empty((min(rows, NB), 2 * NG), dtype=np.uint8)
+        buf[:, 1::2] = ord(',')
+        buf[:, -1] = ord('\n')
+        for i in range(0, NB, rows):
+            block = DecodeRLE(mask, i, i + rows) if rle else mask[i:i + rows]
+            buf[:len(block), 0::2] = block + ord('0')
+            yield buf[:len(block)].tobytes().decode('ascii')
+        return
+
+    # Format one block of rows at a time
+    for i in range(0, NB, rows):
+        block = DecodeRLE(mask, i, i + rows) if rle else mask[i:i + rows]
+        yield ''.join([','.join(map(str, row)) + '\n' for row in block.tolist()])
@@ -0,0 +1,50 @@
+def WriteDeck(rucs, f, mod=202, archid=99, start=1):
+    """
+    Stream many RUC definitions into one NASMAT input as consecutive *RUC blocks.
+
+    Each RUC is written as soon as it is taken from rucs, so a generator (such as
+    Hex1Batch) never has more than one mask in memory.
+
+    Arguments:
+        rucs    iterable    masks, or (mask, out) pairs whose out may hold H and L
+        f       str/file    path, or text or binary file-like object, to write to
+        mod     int/list    NASMAT MOD of every RUC, or one value per RUC
+        archid  int/list    NASMAT ARCHID of every RUC, or one value per RUC
+        start   int         number of the first RUC, None to leave the RUCs unnumbered
+
+    Outputs:
+        offsets list        byte offset of each *RUC block from the start of the deck
+    """
+    # Import Modules
+    import io
+    import os
+    from Write.WriteRUC import WriteRUCChunks
+
+    # Open paths ourselves
+    if isinstance(f, (str, os.PathLike)):
+        with open(f, 'w', newline='') as fid:
+            return WriteDeck(rucs, fid, mod, archid, start)
+
+    # Encode for binary streams
+    binary = not isinstance(f, io.TextIOBase)
+    offsets = []
+    pos = 0
+    for k, ruc in enumerate(rucs):
+        mask, out = ruc if isinstance(ruc, tuple) else (ruc, {})
+        chunks = WriteRUCChunks(
+                mask,
+                H=out.get('H'),
+                L=out.get('L'),
+                mod=mod[k] if isinstance(mod, (list, tuple)) else mod,
+                archid=archid[k] if isinstance(archid, (list, tuple)) else archid,
+                num=None if start is None else start + k,
+                )
+
+        # -- Write the block a chunk at a time
+        offsets.append(pos)
+        for chunk in chunks:
+            data = chunk.encode('utf-8')
+            f.write(data if binary else chunk)
+            pos += len(data)
+
+    return offsets
@@ -0,0 +1,66 @@
+def WriteNPZ(mask, out=None):
+    """
+    Write a RUC definition as an uncompressed NumPy .npz archive.
+
+    The mask keeps its compact dtype and is stored uncompressed, so ReadNPZFile can
+    memory-map it straight out of the file. A RLE mask (see Raster.RLE) is stored as
+    its runs. Arrays in out (such as H and L) are stored alongside, and its scalar
+    properties are kept as JSON text.
+
+    Arguments:
+        mask    2D array    integer array defining the microstructure, or a RLE dict
+        out     dict        optional dictionary of microstructure properties
+
+    Outputs:
+        npz_data    bytes       content of the .npz file
+    """
+    # Import Modules
+    import io
+
+    buf = io.BytesIO()
+    WriteNPZFile(mask, buf, out)
+
+    return buf.getvalue()
+
+
+def WriteNPZFile(mask, f, out=None):
+    """
+    Write a RUC definition as an uncompressed NumPy .npz archive to a file.
+
+    Arguments:
+        mask    2D array    integer array defining the microstructure, or a RLE dict
+        f       str/file    path, or binary file-like object, to write to
+        out     dict        optional dictionary of microstructure properties
+    """
+    # Import Modules
+    import json
+    import os
+    import numpy as np
+
+    # Open paths ourselves, keeping the name as given
+    if isinstance(f, (str, os.PathLike)):
+        with open(f, 'wb') as fid:
+            WriteNPZFile(mask, fid, out)
+        return
+
+    # Store the mask, or the runs of a RLE mask
+    if isinstance(mask, dict):
+        arrays = {
+                'rle_shape': np.array(mask['shape'], dtype=np.int64),
+                'rle_values': mask['values'],
+                'rle_lengths': mask['lengths'],
+                'rle_rows': mask['rows'],
+                }
+    else:
+        arrays = {'mask': np.asarray(mask)}
+
+    # Arrays of out get their own members, scalars go to JSON
+    meta = {}
+    for key, value in (out or {}).items():
+        if value is None or np.ndim(value) == 0:
+            meta[key] = value.item() if hasattr(value, 'item') else value
+        else:
+            arrays['out_' + key] = np.asarray(value)
+    arrays['out'] = np.array(json.dumps(meta))
+
+    np.savez(f, **arrays)
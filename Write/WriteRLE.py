@@ -0,0 +1,88 @@
+def WriteRLE(mask, H=None, L=None):
+    """
+    Write a RUC definition as run-length encoded *RLE text.
+
+    The *RLE section mirrors *RUC: NB rows and NG columns, optional H and L, then one
+    SM line per row listing its runs as count*ID, e.g. ' SM=13*2,24*1,13*2'.
+
+    Arguments:
+        mask        2D array    integer array defining the microstructure, or a RLE dict
+        H           1D array    optional height of each row of subcells
+        L           1D array    optional length of each column of subcells
+
+    Outputs:
+        rle_data    str         content of the *RLE section
+    """
+    return ''.join(WriteRLEChunks(mask, H=H, L=L))
+
+
+def WriteRLEFile(mask, f, H=None, L=None):
+    """
+    Stream a RUC definition as run-length encoded *RLE text to a file.
+
+    Arguments:
+        mask    2D array        integer array defining the microstructure, or a RLE dict
+        f       str/file        path, or text or binary file-like object, to write to
+        H       1D array        optional height of each row of subcells
+        L       1D array        optional length of each column of subcells
+    """
+    # Import Modules
+    import io
+    import os
+
+    # Open paths ourselves
+    if isinstance(f, (str, os.PathLike)):
+        with open(f, 'w', newline='') as fid:
+            WriteRLEFile(mask, fid, H, L)
+        return
+
+    # Encode for binary streams
+    binary = not isinstance(f, io.TextIOBase)
+    for chunk in WriteRLEChunks(mask, H=H, L=L):
+        f.write(chunk.encode('utf-8') if binary else chunk)
+
+
+def WriteRLEChunks(mask, rows=256, H=None, L=None):
+    """
+    Generate the *RLE text of a RUC definition in chunks.
+
+    Arguments:
+        mask    2D array    integer array defining the microstructure, or a RLE dict
+        rows    int         number of SM rows formatted per chunk
+        H       1D array    optional height of each row of subcells
+        L       1D array    optional length of each column of subcells
+
+    Outputs:
+        chunk   str         consecutive pieces of the *RLE section
+    """
+    # Import Modules
+    import numpy as np
+    from Raster.RLE import EncodeRLE
+
+    # Encode dense masks
+    rle = mask if isinstance(mask, dict) else EncodeRLE(mask)
+    values = rle['values']
+    if not np.issubdtype(values.dtype, np.integer):
+        values = values.astype(np.int64)
+
+    # Get Subcell Counts
+    NB, NG = rle['shape']
+
+    # Write header
+    yield '*RLE\n' + f" NB={NB} NG={NG} \n"
+
+    # Write H and L when given
+    if H is not None and len(H) != NB or L is not None and len(L) != NG:
+        raise ValueError(f"H and L need {NB} and {NG} values for a {NB} x {NG} RUC.")
+    if H is not None:
+        yield ' H=' + ','.join([f"{h:.12g}" for h in np.asarray(H, dtype=float)]) + '\n'
+    if L is not None:
+        yield ' L=' + ','.join([f"{l:.12g}" for l in np.asarray(L, dtype=float)]) + '\n'
+
+    # Write SM, one block of rows at a time
+    for i in range(0, NB, rows):
+        j = min(i + rows, NB)
+        a = rle['rows'][i]
+        runs = [f"{n}*{v}" for n, v in zip(rle['lengths'][a:rle['rows'][j]].tolist(), values[a:rle['rows'][j]].tolist())]
+        bounds = (rle['rows'][i:j + 1] - a).tolist()
+        yield ''.join([' SM=' + ','.join(runs[bounds[k]:bounds[k + 1]]) + '\n' for k in range(j - i)])
@@ -1,36 +1,109 @@
-def WriteRUC(mask):
-    ruc_data = '*RUC\n'
-    ruc_data = ruc_data + f" MOD={202} ARCHID={99} \n"
-
-    # Get Subcell Counts
-    NB =  len(mask)
-    NG =  len(mask[0]) 
-    ruc_data = ruc_data + f" NB={NB} NG={NG} \n"
-
-    # Write H
-    ruc_data = ruc_data + ' H='
-    for i in range(NB):
-        ruc_data = ruc_data + '1'
-        if i == NB - 1:
-            ruc_data = ruc_data + '\n'
-        else:
-            ruc_data = ruc_data + ','
-
-    # Write L
-    ruc_data = ruc_data + ' L='
-    for i in range(NG):
-        ruc_data = ruc_data + '1'
-        if i == NG - 1:
-            ruc_data = ruc_data + '\n'
-        else:
-            ruc_data = ruc_data + ','
-
-    for i in range(NB):
-        ruc_data = ruc_data + " SM="
-        for j in range(NG):
-            ruc_data = ruc_data + f"{int(mask[i][j])}"
-            if j != NG - 1:
-                ruc_data = ruc_data + ","
-        ruc_data = ruc_data + "\n"
-
-    return ruc_data
+def WriteRUC(mask, H=None, L=None):
+    """
+    Write a RUC definition as NASMAT *RUC text.
+
+    Arguments:
+        mask        2D array    integer array defining the microstructure
+        H           1D array    optional height of each row of subcells, 1 if None
+        L           1D array    optional length of each column of subcells, 1 if None
+
+    Outputs:
+        ruc_data    str         content of the *RUC section
+    """
+    return ''.join(WriteRUCChunks(mask, H=H, L=L))
+
+
+def WriteRUCFile(mask, f, H=None, L=None):
+    """
+    Stream a RUC definition as NASMAT *RUC text to a file.
+
+    Arguments:
+        mask    2D array        integer array defining the microstructure
+        f       str/file        path, or text or binary file-like object, to write to
+        H       1D array        optional height of each row of subcells, 1 if None
+        L       1D array        optional length of each column of subcells, 1 if None
+    """
+    # Import Modules
+    import io
+    import os
+
+    # Open paths ourselves
+    if isinstance(f, (str, os.PathLike)):
+        with open(f, 'w', newline='') as fid:
+            WriteRUCFile(mask, fid, H, L)
+        return
+
+    # Encode for binary streams
+    binary = not isinstance(f, io.TextIOBase)
+    for chunk in WriteRUCChunks(mask, H=H, L=L):
+        f.write(chunk.encode('utf-8') if binary else chunk)
+
+
+def WriteRUCChunks(mask, rows=256, H=None, L=None, mod=202, archid=99, num=None):
+    """
+    Generate the NASMAT *RUC text of a RUC definition in chunks.
+
+    A run-length encoded mask (see Raster.RLE) is expanded one block of rows at a time,
+    so the dense array is never built.
+
+    Arguments:
+        mask    2D array    integer array defining the microstructure, or a RLE dict
+        rows    int         number of SM rows formatted per chunk
+        H       1D array    optional height of each row of subcells, 1 if None
+        L       1D array    optional length of each column of subcells, 1 if None
+        mod     int         NASMAT MOD of the RUC
+        archid  int         NASMAT ARCHID of the RUC
+        num     int         optional RUC number, written as NUM= when given
+
+    Outputs:
+        chunk   str         consecutive pieces of the *RUC section
+    """
+    # Import Modules
+    import numpy as np
+    from Raster.RLE import DecodeRLE
+
+    # Format integer material IDs
+    rle = isinstance(mask, dict)
+    if rle:
+        if not np.issubdtype(mask['values'].dtype, np.integer):
+            mask = dict(mask, values=mask['values'].astype(np.int64))
+        NB, NG = mask['shape']
+        values = mask['values']
+    else:
+        mask = np.asarray(mask)
+        if not np.issubdtype(mask.dtype, np.integer):
+            mask = mask.astype(np.int64)
+
+        # Get Subcell Counts
+        NB = len(mask)
+        NG = len(mask[0])
+        values = mask
+
+    # Write header
+    number = '' if num is None else f" NUM={num}"
+    yield '*RUC\n' + number + f" MOD={mod} ARCHID={archid} \n" + f" NB={NB} NG={NG} \n"
+
+    # Write H and L
+    if H is not None and len(H) != NB or L is not None and len(L) != NG:
+        raise ValueError(f"H and L need {NB} and {NG} values for a {NB} x {NG} RUC.")
+    H = ['1'] * NB if H is None else [f"{h:.12g}" for h in np.asarray(H, dtype=float)]
+    L = ['1'] * NG if L is None else [f"{l:.12g}" for l in np.asarray(L, dtype=float)]
+    yield ' H=' + ','.join(H) + ('\n' if NB > 0 else '')
+    yield ' L=' + ','.join(L) + ('\n' if NG > 0 else '')
+
+    # Single digit IDs: lay out each block of SM lines as ASCII bytes in one go
+    if NB > 0 and NG > 0 and values.min() >= 0 and values.max() <= 9:
+        buf = np.empty((min(rows, NB), 4 + 2 * NG), dtype=np.uint8)
+        buf[:, :4] = np.frombuffer(b' SM=', dtype=np.uint8)
+        buf[:, 5::2] = ord(',')
+        buf[:, -1] = ord('\n')
+        for i in range(0, NB, rows):
+            SM = DecodeRLE(mask, i, i + rows) if rle else mask[i:i + rows]
+            buf[:len(SM), 4::2] = SM + ord('0')
+            yield buf[:len(SM)].tobytes().decode('ascii')
+        return
+
+    # Write SM, one block of rows at a time
+    for i in range(0, NB, rows):
+        SM = DecodeRLE(mask, i, i + rows) if rle else mask[i:i + rows]
+        yield ''.join([' SM=' + ','.join(map(str, row)) + '\n' for row in SM.tolist()])
@@ -1,24 +1,47 @@
 # Import Modules
 import math
 import pandas as pd
-import plotly.graph_objects as go
 import streamlit as st
 
 # Import Functions
 from Hexagonal.Hex1 import Hex1
 from Hexagonal.Hex2 import Hex2
 from Hexagonal.Hex3 import Hex3
+from Hexagonal.Hex4 import Hex4
 from Square.Square1 import Square1
 from Square.Square2 import Square2
 from Square.Square3 import Square3
+from Square.Square4 import Square4
+from Random.Random1 import Random1
 from Write.WriteCSV import WriteCSV
 from Write.WriteRUC import WriteRUC
-from Read.ReadCSV import ReadCSV
-from Read.ReadRUC import ReadRUC
+from Write.WriteNPZ import WriteNPZ
+from Read.ReadCSV import ReadCSVFile
+from Read.ReadRUC import ReadRUCFile
+from Read.ReadRLE import ReadRLEFile
+from Read.ReadNPZ import ReadNPZFile
+from Raster.RLE import DecodeRLE
+from Raster.Memory import CheckBudget
+from Cache.Cache import CachedGenerate, PrefetchWrite, MaskDigest
+from Plot.PlotRUC import PlotRUC, PhaseColorscale
+from Stats.Statistics import Statistics, SizeDistribution
+from Trace.Trace import Stage, NewTrace, UseTrace, EnableTrace, TraceOn, ClearTrace, TraceSummary, ChromeTrace
+
+# Memory budget for a single RUC mask (bytes)
+MAX_BYTES = 512 * 1024**2
+
+# Plot colors, and the default colors of phases other than the fiber and matrix
+COLORS = ["white", "black", "red", "green", "blue", "yellow", "purple"]
+PHASE_COLORS = ["green", "yellow", "purple", "black", "white"]
 
 # Set the page configuration
 st.set_page_config(layout="wide")
 
+# Trace the stages of this session only
+if 'trace' not in st.session_state:
+    st.session_state['trace'] = NewTrace()
+UseTrace(st.session_state['trace'])
+
 # Create the title
 st.title("2D NASMAT RUC Generator")
 
@@ -35,6 +58,9 @@ with tab1:
 
     # Initialize the function
     func = None
+    solve = False
+    fill = "Center"
+    coating = []
 
     # Create columns for microstructure and definition selection
     col1, col2 = st.columns([1, 1])
@@ -46,6 +72,7 @@ with tab1:
                 [
                 "Hexagonal", 
                 "Square",
+                "Random",
                 ]
             )
 
@@ -60,12 +87,15 @@ with tab1:
                 'NG':[2, 'int', 1, 1, None, 10],
                 'F':[1,'int', 1, 1, None, 1],
                 'M':[2,'int', 1, 1, None, 2],
+                'fine':[1, 'float', 0.01, 0.001, None, 0.5],
+                'coarse':[2, 'float', 0.01, 0.001, None, 2.],
                 }
 
         # -- Create defintion list
         def_list = {"Volume Fraction & Subcell Dimensions":{
                                                             'Inputs':['VF','NB','F','M'],
-                                                            'Function':Hex1
+                                                            'Function':Hex1,
+                                                            'Solve':True
                                                             }, 
                     "Volume Fraction & Radius":{
                                                 'Inputs':['VF','R','F','M'],
@@ -75,6 +105,10 @@ with tab1:
                                                     'Inputs':['R','NB','F','M'],
                                                     'Function':Hex3
                                                     }, 
+                    "Volume Fraction, Radius & Graded Subcells":{
+                                                    'Inputs':['VF','R','fine','coarse','F','M'],
+                                                    'Function':Hex4
+                                                    }, 
                     }
         
     elif micro_opt == "Square":
@@ -87,12 +121,15 @@ with tab1:
                 'NG':[2, 'int', 1, 1, None, 10],
                 'F':[1,'int', 1, 1, None, 1],
                 'M':[2,'int', 1, 1, None, 2],
+                'fine':[1, 'float', 0.01, 0.001, None, 0.5],
+                'coarse':[2, 'float', 0.01, 0.001, None, 2.],
                 }
 
         # -- Create defintion list
         def_list = {"Volume Fraction & Subcell Dimensions":{
                                                             'Inputs':['VF','NB','F','M'],
-                                                            'Function':Square1
+                                                            'Function':Square1,
+                                                            'Solve':True
                                                             }, 
                     "Volume Fraction & Radius":{
                                                 'Inputs':['VF','R','F','M'],
@@ -102,8 +139,32 @@ with tab1:
                                                     'Inputs':['R','NB','F','M'],
                                                     'Function':Square3
                                                     }, 
+                    "Volume Fraction, Radius & Graded Subcells":{
+                                                    'Inputs':['VF','R','fine','coarse','F','M'],
+                                                    'Function':Square4
+                                                    }, 
                     }
         
+    elif micro_opt == "Random":
+
+        # -- Create default values
+        def_vals = {
+                'VF':[1, 'float', 0.001, 0., 0.8, 0.6],
+                'R':[2, 'float', 0.001, 0., None, 10.],
+                'NB':[1, 'int', 1, 1, None, 10],
+                'NG':[2, 'int', 1, 1, None, 10],
+                'F':[1,'int', 1, 1, None, 1],
+                'M':[2,'int', 1, 1, None, 2],
+                'seed':[1,'int', 1, 0, None, 0],
+                }
+
+        # -- Create defintion list
+        def_list = {"Volume Fraction, Radius & Subcell Dimensions":{
+                                                            'Inputs':['VF','R','NB','F','M','seed'],
+                                                            'Function':Random1
+                                                            }, 
+                    }
+
     else:
         def_list = {}
 
@@ -176,6 +237,30 @@ with tab1:
                                             key = f"num_input_{key}",
                                             disabled=True
                                         )
+
+        # Offer to match the volume fraction on the discrete grid
+        if def_list[def_opt].get('Solve', False):
+            solve = st.checkbox("Match VF on the grid", value=False, key='Solve_Check',
+                                help="Choose the radius whose rasterized volume fraction is closest to VF.")
+
+        # Choose how subcells on a fiber edge are labeled
+        fill = st.selectbox("Subcell fill:", ["Center", "Area"], key='Fill_Select', disabled=solve,
+                            help="Center labels each subcell by its center point. Area supersamples the "
+                                 "subcells on a fiber edge and keeps the fiber area.")
+
+        # Add coating layers around the fibers, innermost first
+        coating = []
+        layers = st.number_input("Coating layers", min_value=0, max_value=5, value=0, step=1, key='num_coat_layers',
+                                 help="Annular interphase layers around each fiber, each with its own material ID. "
+                                      "Thicknesses are in subcells, or in the units of R for graded subcells.")
+        for k in range(layers):
+            col_t, col_id = st.columns([1, 1])
+            with col_t:
+                thickness = st.number_input(f"Layer {k + 1} thickness", min_value=0., value=1., step=0.1,
+                                            key=f'coat_thickness_{k}')
+            with col_id:
+                ID = st.number_input(f"Layer {k + 1} ID", min_value=1, value=3 + k, step=1, key=f'coat_id_{k}')
+            coating.append((thickness, ID))
                     
 
     # Generate and display the RUC
@@ -198,7 +283,7 @@ with tab1:
                 st.session_state['fiber_color'] = 'blue'
             fib_color = st.selectbox(
                     "Fiber Color",
-                    ["white", "black", "red", "green", "blue", "yellow", "purple"],
+                    COLORS,
                     key = 'fiber_color'
                 )
             
@@ -207,121 +292,237 @@ with tab1:
                 st.session_state['matrix_color'] = 'red'
             mat_color = st.selectbox(
                     "Matrix Color",
-                    ["white", "black", "red", "green", "blue", "yellow", "purple"],
+                    COLORS,
                     key = 'matrix_color'
                 )
 
+        # -- Create the stage tracing checkbox (also on when RUC_TRACE is set)
+        with col9:
+            tracing = st.checkbox("Trace Stages", value=TraceOn(), key='Trace_Check',
+                                  help="Time each stage of generating, plotting and writing the RUC, with its allocations.")
+            if tracing != TraceOn():
+                EnableTrace(tracing)
+
         # If generate is clicked, run function and save mask in session_state
         if generate_clicked:
+            if tracing:
+                ClearTrace()
             func_values = {}
             flag = 0
             for key in values.keys():
                 if key in def_list[def_opt]['Inputs']:
                     func_values[key] = values[key]
-            st.session_state['mask'] = func(**func_values)
+            if solve:
+                func_values['solve'] = True
+            elif fill == "Area":
+                func_values['fill'] = 'area'
+            if coating:
+                func_values['coating'] = coating
+            try:
+                st.session_state['mask'] = CachedGenerate(func, **func_values, max_bytes=MAX_BYTES)
+                st.session_state['mask_digest'] = MaskDigest(st.session_state['mask'][0])
+                st.session_state.pop('downloads', None)
+            except (MemoryError, ValueError) as e:
+                st.error(str(e))
 
         # Only plot if we have a mask
         if 'mask' in st.session_state:
             mask, out = st.session_state['mask']
 
-            # Decide on grid spacing
-            if show_grid:
-                xgap = 0.5
-                ygap = 0.5
-            else:
-                xgap = None
-                ygap = None
-
-            # Create Plotly figure
-            fig = go.Figure(data=go.Heatmap(
-                z=mask,
-                colorscale=[[0, st.session_state['fiber_color']], [1, st.session_state['matrix_color']]],
-                showscale=False,
-                xgap=xgap,
-                ygap=ygap
-            ))
-
-            # Layout tweaks
-            fig.update_layout(
-                xaxis=dict(showticklabels=False, showgrid=False, zeroline=False, scaleanchor="y", constrain='domain'),
-                yaxis=dict(showticklabels=False, showgrid=False, zeroline=False, autorange='reversed', scaleanchor="x"),
-                margin=dict(l=0, r=0, t=0, b=0)
-            )
+            # Color the fiber, the matrix and every other phase, such as fiber coatings
+            others = [ID for ID in out['VF_phases'] if ID not in (out['F'], out['M'])]
+            for k, (col, ID) in enumerate(zip(st.columns(max(len(others), 5)), others)):
+                with col:
+                    if f'phase_color_{ID}' not in st.session_state:
+                        st.session_state[f'phase_color_{ID}'] = PHASE_COLORS[k % len(PHASE_COLORS)]
+                    st.selectbox(f"Phase {ID} Color", COLORS, key=f'phase_color_{ID}')
+            colors = {}
+            for ID in out['VF_phases']:
+                if ID == out['F']:
+                    colors[ID] = st.session_state['fiber_color']
+                elif ID == out['M']:
+                    colors[ID] = st.session_state['matrix_color']
+                else:
+                    colors[ID] = st.session_state[f'phase_color_{ID}']
+
+            # Create Plotly figure (large RUCs are pooled into an image)
+            with Stage('PlotRUC', shape=mask.shape):
+                fig, scale = PlotRUC(
+                    mask,
+                    PhaseColorscale(colors),
+                    show_grid,
+                    H=out.get('H'),
+                    L=out.get('L')
+                )
 
             # Create columns for visualalization and data
             col10, col11, col12 = st.columns([1, 1, 4])
 
             # Display the microstruture
             with col10:
-                st.plotly_chart(fig, width='content')
+                with Stage('plotly_chart'):
+                    st.plotly_chart(fig, width='content')
+                if scale > 1:
+                    st.caption(f"Preview at 1:{scale}, each pixel shows the majority of {scale} x {scale} subcells.")
 
             # Create table with actual microstructure properties
             with col11:
                 data = {'Property':['VF', 'R', 'NB', 'NG'],
                         'Value':[out['VF'], out['R'], out['NB'], out['NG']]}
+                if 'VF_error' in out:
+                    data['Property'].append('VF Error')
+                    data['Value'].append(out['VF_error'])
+                for ID, VF in out['VF_phases'].items():
+                    data['Property'].append(f'VF of ID {ID}')
+                    data['Value'].append(VF)
                 df = pd.DataFrame(data)
                 st.dataframe(df) 
 
-            # Create Files
-            csv_data = WriteCSV(mask)
-            ruc_data = WriteRUC(mask)
+            # Create Files (serialized once in the background; the session keeps the jobs, and
+            # with them the finished files, so evictions from the cache never restart them)
+            digest = st.session_state['mask_digest']
+            if st.session_state.get('downloads', {}).get('digest') != digest:
+                st.session_state['downloads'] = {'digest': digest, 'jobs': (
+                        PrefetchWrite(WriteCSV, mask, digest),
+                        PrefetchWrite(WriteRUC, mask, digest, H=out.get('H'), L=out.get('L')),
+                        PrefetchWrite(WriteNPZ, mask, digest, out=out),
+                        )}
+            csv_job, ruc_job, npz_job = st.session_state['downloads']['jobs']
 
             # Create columns for downloading data
-            col13, col14, col15 = st.columns([1, 1, 9])
-
-            # Download to CSV
-            with col13:
-                st.download_button(
-                    label="Download  CSV",
-                    data=csv_data,
-                    file_name="ruc.csv",
-                    mime="text/csv",
-                    key="download_csv"
+            col13, col14, col16, col15 = st.columns([1, 1, 1, 8])
+
+            # Wait for the files only when asked to
+            if not (csv_job.done() and ruc_job.done() and npz_job.done()):
+                with col13:
+                    if st.button("Prepare Downloads", key="prepare_downloads"):
+                        csv_job.result()
+                        ruc_job.result()
+                        npz_job.result()
+                        st.rerun()
+
+            else:
+                # Download to CSV
+                with col13:
+                    st.download_button(
+                        label="Download  CSV",
+                        data=csv_job.result(),
+                        file_name="ruc.csv",
+                        mime="text/csv",
+                        key="download_csv"
+                    )
+
+                # Download for *RUC
+                with col14:
+                    st.download_button(
+                    label="Download *RUC File",
+                    data=ruc_job.result(),
+                    file_name="ruc_data.txt",
+                    mime="text/plain",
+                    key="download_ruc"
                 )
 
-            # Download for *RUC
-            with col14:
-                st.download_button(
-                label="Download *RUC File",
-                data=ruc_data,
-                file_name="ruc_data.txt",
-                mime="text/plain",
-                key="download_ruc"
-            )
+                # Download to NumPy archive
+                with col16:
+                    st.download_button(
+                    label="Download NPZ",
+                    data=npz_job.result(),
+                    file_name="ruc.npz",
+                    mime="application/octet-stream",
+                    key="download_npz"
+                )
+
+            # Break the traced time down by stage (background writes show up once they finish)
+            if tracing:
+                with st.expander("Stage Trace", expanded=True):
+                    rows = TraceSummary()
+                    if rows:
+                        st.dataframe(pd.DataFrame(rows))
+                        st.download_button(
+                            label="Download Chrome Trace",
+                            data=ChromeTrace(),
+                            file_name="trace.json",
+                            mime="application/json",
+                            key="download_trace"
+                        )
+                    else:
+                        st.caption("No stages traced yet, generate the RUC to record them.")
                 
 with tab2:
     # Create header
     st.markdown("## RUC Visualizer")
-    st.markdown("Upload a CSV or *RUC file to visualize the microstructure.")
+    st.markdown("Upload a CSV, *RUC, run-length encoded *RLE or NumPy .npz file to visualize the microstructure.")
 
     # Set flag
     flag = 0
 
     # Allow file upload
-    uploaded_file = st.file_uploader("Choose a file", type=["txt","mac","csv"], key = 'file_upload')
+    uploaded_file = st.file_uploader("Choose a file", type=["txt","mac","csv","rle","npz"], key = 'file_upload')
 
     # Read Data
     if uploaded_file is not None:
-        # Read file as string (for text files)
-        content = uploaded_file.read().decode("utf-8")
+        # Reuse the previous read while the same file stays uploaded
+        file_key = (uploaded_file.file_id, uploaded_file.name, uploaded_file.size)
+        if st.session_state.get('file_key_Viz') == file_key:
+            out = st.session_state['out_Viz']
+            flag = 1
 
         # Read a csv file
-        if uploaded_file.name.endswith('.csv'):
+        elif uploaded_file.name.endswith('.csv'):
             try:
-                mask, out = ReadCSV(content)
+                mask, out = ReadCSVFile(uploaded_file, max_bytes=MAX_BYTES)
                 st.session_state['mask_Viz'] = mask
                 flag = 1
+            except MemoryError as e:
+                st.error(str(e))
             except:
                 st.error("Error reading CSV file. Please ensure it is formatted correctly.")
 
+        # Read a run-length encoded file, expanding it only within the budget
+        elif uploaded_file.name.endswith('.rle'):
+            rle, out, msg = ReadRLEFile(uploaded_file)
+            if msg != "":
+                st.error(msg)
+            else:
+                try:
+                    CheckBudget(rle['shape'], rle['values'].dtype, MAX_BYTES)
+                    st.session_state['mask_Viz'] = DecodeRLE(rle)
+                    flag = 1
+                except MemoryError as e:
+                    st.error(str(e))
+
+        # Read a NumPy archive
+        elif uploaded_file.name.endswith('.npz'):
+            mask, out, msg = ReadNPZFile(uploaded_file, max_bytes=MAX_BYTES)
+            if msg != "":
+                st.error(msg)
+            else:
+                if isinstance(mask, dict):
+                    try:
+                        CheckBudget(mask['shape'], mask['values'].dtype, MAX_BYTES)
+                        mask = DecodeRLE(mask)
+                    except MemoryError as e:
+                        st.error(str(e))
+                        mask = None
+                if mask is not None:
+                    st.session_state['mask_Viz'] = mask
+                    flag = 1
+
         else:
-                mask, out, msg = ReadRUC(content)
+                mask, out, msg = ReadRUCFile(uploaded_file, max_bytes=MAX_BYTES)
                 if msg != "":
                     st.error(msg)
                 else:
                     st.session_state['mask_Viz'] = mask
                     flag = 1
 
+        # Remember the read so reruns skip parsing
+        if flag == 1 and st.session_state.get('file_key_Viz') != file_key:
+            st.session_state['file_key_Viz'] = file_key
+            st.session_state['out_Viz'] = out
+            st.session_state['mask_digest_Viz'] = MaskDigest(st.session_state['mask_Viz'])
+            st.session_state.pop('downloads_Viz', None)
+
 
         # Display RUC
         if flag == 1:
@@ -338,7 +539,7 @@ with tab2:
                     st.session_state['fiber_color_Viz'] = 'blue'
                 fib_color = st.selectbox(
                         "Fiber Color",
-                        ["white", "black", "red", "green", "blue", "yellow", "purple"],
+                        COLORS,
                         key = 'fiber_color_Viz'
                     )
                 
@@ -347,7 +548,7 @@ with tab2:
                     st.session_state['matrix_color_Viz'] = 'red'
                 mat_color = st.selectbox(
                         "Matrix Color",
-                        ["white", "black", "red", "green", "blue", "yellow", "purple"],
+                        COLORS,
                         key = 'matrix_color_Viz'
                     )
 
@@ -355,28 +556,29 @@ with tab2:
             if 'mask_Viz' in st.session_state:
                 mask = st.session_state['mask_Viz']
 
-                # Decide on grid spacing
-                if show_grid:
-                    xgap = 0.5
-                    ygap = 0.5
-                else:
-                    xgap = None
-                    ygap = None
-
-                # Create Plotly figure
-                fig = go.Figure(data=go.Heatmap(
-                    z=mask,
-                    colorscale=[[0, st.session_state['fiber_color_Viz']], [1, st.session_state['matrix_color_Viz']]],
-                    showscale=False,
-                    xgap=xgap,
-                    ygap=ygap
-                ))
-
-                # Layout tweaks
-                fig.update_layout(
-                    xaxis=dict(showticklabels=False, showgrid=False, zeroline=False, scaleanchor="y", constrain='domain'),
-                    yaxis=dict(showticklabels=False, showgrid=False, zeroline=False, autorange='reversed', scaleanchor="x"),
-                    margin=dict(l=0, r=0, t=0, b=0)
+                # Color the fiber, the matrix and every other phase, such as fiber coatings
+                others = [ID for ID in out['VF_phases'] if ID not in (out['F'], out['M'])]
+                for k, (col, ID) in enumerate(zip(st.columns(max(len(others), 5)), others)):
+                    with col:
+                        if f'phase_color_{ID}_Viz' not in st.session_state:
+                            st.session_state[f'phase_color_{ID}_Viz'] = PHASE_COLORS[k % len(PHASE_COLORS)]
+                        st.selectbox(f"Phase {ID} Color", COLORS, key=f'phase_color_{ID}_Viz')
+                colors = {}
+                for ID in out['VF_phases']:
+                    if ID == out['F']:
+                        colors[ID] = st.session_state['fiber_color_Viz']
+                    elif ID == out['M']:
+                        colors[ID] = st.session_state['matrix_color_Viz']
+                    else:
+                        colors[ID] = st.session_state[f'phase_color_{ID}_Viz']
+
+                # Create Plotly figure (large RUCs are pooled into an image)
+                fig, scale = PlotRUC(
+                    mask,
+                    PhaseColorscale(colors),
+                    show_grid,
+                    H=out.get('H'),
+                    L=out.get('L')
                 )
 
                 # Create columns for visualalization and data
@@ -385,39 +587,97 @@ with tab2:
                 # Display the microstruture
                 with col10:
                     st.plotly_chart(fig, width='content')
+                    if scale > 1:
+                        st.caption(f"Preview at 1:{scale}, each pixel shows the majority of {scale} x {scale} subcells.")
 
                 # Create table with actual microstructure properties
                 with col11:
                     data = {'Property':['VF', 'NB', 'NG'],
                             'Value':[out['VF'], out['NB'], out['NG']]}
+                    for ID, VF in out['VF_phases'].items():
+                        data['Property'].append(f'VF of ID {ID}')
+                        data['Value'].append(VF)
                     df = pd.DataFrame(data)
                     st.dataframe(df) 
 
-                # Create Files
-                csv_data = WriteCSV(mask)
-                ruc_data = WriteRUC(mask)
+                # Show fiber statistics and correlation functions, computed once per file
+                with col12:
+                    if st.session_state.get('stats_digest_Viz') != st.session_state['mask_digest_Viz']:
+                        try:
+                            st.session_state['stats_Viz'] = Statistics(mask, out['F'], out.get('H'), out.get('L'), MAX_BYTES)
+                        except MemoryError as e:
+                            st.session_state['stats_Viz'] = str(e)
+                        st.session_state['stats_digest_Viz'] = st.session_state['mask_digest_Viz']
+                    stats = st.session_state['stats_Viz']
+                    if isinstance(stats, str):
+                        st.info("Statistics skipped: " + stats)
+                    else:
+                        curves = ['S2', 'LPx', 'LPy', 'Areas']
+                        data = {'Statistic':[k for k in stats if k not in curves],
+                                'Value':[stats[k] for k in stats if k not in curves]}
+                        st.dataframe(pd.DataFrame(data))
+                        n = len(stats['S2'])
+                        st.line_chart(pd.DataFrame({
+                                'Two-Point S2':stats['S2'],
+                                'Lineal Path x':stats['LPx'][:n],
+                                'Lineal Path y':stats['LPy'][:n],
+                                }))
+                        with st.expander("Fiber Size Distribution", expanded=stats['Fibers'] > 0):
+                            sizes, counts = SizeDistribution(stats['Areas'])
+                            st.bar_chart(pd.DataFrame({'Fibers':counts}, index=pd.Index(sizes.round(2), name='Fiber Area')))
+
+                # Create Files (serialized once in the background; the session keeps the jobs, and
+                # with them the finished files, so evictions from the cache never restart them)
+                digest = st.session_state['mask_digest_Viz']
+                if st.session_state.get('downloads_Viz', {}).get('digest') != digest:
+                    st.session_state['downloads_Viz'] = {'digest': digest, 'jobs': (
+                            PrefetchWrite(WriteCSV, mask, digest),
+                            PrefetchWrite(WriteRUC, mask, digest, H=out.get('H'), L=out.get('L')),
+                            PrefetchWrite(WriteNPZ, mask, digest, out=out),
+                            )}
+                csv_job, ruc_job, npz_job = st.session_state['downloads_Viz']['jobs']
 
                 # Create columns for downloading data
-                col13, col14, col15 = st.columns([1, 1, 9])
+                col13, col14, col16, col15 = st.columns([1, 1, 1, 8])
 
-                # Download to CSV
-                with col13:
-                    st.download_button(
-                        label="Download CSV",
-                        data=csv_data,
-                        file_name="ruc.csv",
-                        mime="text/csv",
-                        key = "download_csv_viz"
+                # Wait for the files only when asked to
+                if not (csv_job.done() and ruc_job.done() and npz_job.done()):
+                    with col13:
+                        if st.button("Prepare Downloads", key="prepare_downloads_viz"):
+                            csv_job.result()
+                            ruc_job.result()
+                            npz_job.result()
+                            st.rerun()
+
+                else:
+                    # Download to CSV
+                    with col13:
+                        st.download_button(
+                            label="Download CSV",
+                            data=csv_job.result(),
+                            file_name="ruc.csv",
+                            mime="text/csv",
+                            key = "download_csv_viz"
+                        )
+
+                    # Download for *RUC
+                    with col14:
+                        st.download_button(
+                        label="Download *RUC File",
+                        data=ruc_job.result(),
+                        file_name="ruc_data.txt",
+                        mime="text/plain",
+                        key="download_ruc_viz"
                     )
 
-                # Download for *RUC
-                with col14:
-                    st.download_button(
-                    label="Download *RUC File",
-                    data=ruc_data,
-                    file_name="ruc_data.txt",
-                    mime="text/plain",
-                    key="download_ruc_viz"
-                )
+                    # Download to NumPy archive
+                    with col16:
+                        st.download_button(
+                        label="Download NPZ",
+                        data=npz_job.result(),
+                        file_name="ruc.npz",
+                        mime="application/octet-stream",
+                        key="download_npz_viz"
+                    )
 
    
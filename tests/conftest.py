@@ -0,0 +1,6 @@
+# Import Modules
+import os
+import sys
+
+# Import the generators from the repository root, as main.py does
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,28 @@
+"""
+Tests of the Streamlit app.
+"""
+# Import Modules
+import time
+from streamlit.testing.v1 import AppTest
+from Cache.Cache import CacheLimit, ClearCache
+
+
+def test_downloads_outlive_cache():
+    # A cache too small for any payload must not keep the downloads from appearing
+    ClearCache()
+    CacheLimit(1024)
+    try:
+        at = AppTest.from_file('../main.py', default_timeout=60)
+        at.run()
+        at.button(key='Gen_Button').click().run()
+        for _ in range(3):
+            time.sleep(0.5)
+            at.run()
+            if len(at.get('download_button')) == 3:
+                break
+        else:
+            at.button(key='prepare_downloads').click().run()
+        assert not at.exception
+        assert len(at.get('download_button')) == 3
+    finally:
+        CacheLimit(1024**3)
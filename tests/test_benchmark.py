@@ -0,0 +1,27 @@
+"""
+Tests of the benchmark measurements.
+"""
+# Import Modules
+import builtins
+from Bench.Benchmark import _Measure, _PeakRSS
+
+
+def test_measure_fields():
+    result = _Measure('Hex1', 20, 2)
+
+    assert result['error'] == ''
+    assert result['shape'] == [34, 20]
+    assert len(result['times']) == 2
+    assert result['prep_rss_mb'] > 0 and result['peak_rss_mb'] >= 0
+
+
+def test_peak_rss_without_resource(monkeypatch):
+    real = builtins.__import__
+    def Import(name, *args, **kwargs):
+        if name == 'resource':
+            raise ImportError(name)
+        return real(name, *args, **kwargs)
+    monkeypatch.setattr(builtins, '__import__', Import)
+
+    assert _PeakRSS() is None
+    assert _Measure('Hex1', 20, 1)['peak_rss_mb'] is None
@@ -0,0 +1,84 @@
+"""
+Tests of the generator and writer cache.
+"""
+# Import Modules
+import numpy as np
+import pytest
+from Cache.Cache import CachedGenerate, CacheLimit, ClearCache, MaskDigest
+from Hexagonal.Hex1 import Hex1
+from Raster.RLE import DecodeRLE
+from Square.Square4 import Square4
+
+
+@pytest.fixture(autouse=True)
+def _Fresh():
+    ClearCache()
+    yield
+    CacheLimit(1024**3)
+    ClearCache()
+
+
+def test_rle_generate():
+    mask, out = CachedGenerate(Hex1, VF=0.5, NB=20, F=1, M=2, fill='rle')
+    again, _ = CachedGenerate(Hex1, VF=0.5, NB=20, F=1, M=2, fill='rle')
+
+    assert isinstance(mask, dict)
+    assert all(again[name] is mask[name] for name in ('values', 'lengths', 'rows'))
+    assert all(not mask[name].flags.writeable for name in ('values', 'lengths', 'rows'))
+
+
+def test_dense_generate_read_only():
+    mask, _ = CachedGenerate(Hex1, VF=0.5, NB=20, F=1, M=2)
+    again, _ = CachedGenerate(Hex1, VF=0.5, NB=20, F=1, M=2)
+
+    assert again is mask
+    assert not mask.flags.writeable
+    with pytest.raises(ValueError):
+        mask[0, 0] = 3
+
+
+@pytest.mark.parametrize('fill', ['grid', 'rle'])
+def test_sized_by_mask(fill):
+    mask, _ = CachedGenerate(Hex1, VF=0.5, NB=20, F=1, M=2, fill=fill)
+    nbytes = sum(mask[k].nbytes for k in ('values', 'lengths', 'rows')) if fill == 'rle' else mask.nbytes
+
+    # An entry of exactly the budget is kept, one byte over is not
+    ClearCache()
+    CacheLimit(nbytes)
+    first, _ = CachedGenerate(Hex1, VF=0.5, NB=20, F=1, M=2, fill=fill)
+    again, _ = CachedGenerate(Hex1, VF=0.5, NB=20, F=1, M=2, fill=fill)
+    assert (again['values'] is first['values']) if fill == 'rle' else (again is first)
+
+    ClearCache()
+    CacheLimit(nbytes - 1)
+    first, _ = CachedGenerate(Hex1, VF=0.5, NB=20, F=1, M=2, fill=fill)
+    again, _ = CachedGenerate(Hex1, VF=0.5, NB=20, F=1, M=2, fill=fill)
+    assert (again['values'] is not first['values']) if fill == 'rle' else (again is not first)
+
+
+def test_callers_do_not_share_out():
+    params = dict(VF=0.5, R=10., fine=0.5, coarse=2., F=1, M=2, fill='rle')
+    mask, out = CachedGenerate(Square4, **params)
+    H = out['H'].copy()
+    VF = out['VF_phases'][1]
+
+    # Changes to one caller's outputs do not reach the cache
+    out['H'][:] = 0.
+    out['VF_phases'][1] = 0.
+    out['NB'] = -1
+    mask['shape'] = (0, 0)
+
+    again, fresh = CachedGenerate(Square4, **params)
+    assert np.array_equal(fresh['H'], H)
+    assert fresh['VF_phases'][1] == VF
+    assert fresh['NB'] == len(fresh['L'])
+    assert again['shape'] == (len(H), len(fresh['L']))
+
+
+def test_rle_digest():
+    rle, _ = CachedGenerate(Hex1, VF=0.5, NB=20, F=1, M=2, fill='rle')
+    dense, _ = CachedGenerate(Hex1, VF=0.5, NB=20, F=1, M=2)
+
+    assert np.array_equal(DecodeRLE(rle), dense)
+    assert MaskDigest(rle) == MaskDigest(dict(rle))
+    assert MaskDigest(rle) != MaskDigest(dense)
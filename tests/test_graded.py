@@ -0,0 +1,107 @@
+"""
+Tests of the graded subcells behind Hex4 and Square4.
+
+The mislabeled fiber area is measured against the exact fiber area of every
+subcell, so graded and uniform grids of any size compare on the same scale.
+"""
+# Import Modules
+import numpy as np
+import pytest
+
+from Hexagonal.Hex2 import Hex2
+from Hexagonal.Hex4 import Hex4
+from Raster.Graded import Graded
+from Raster.Rasterize import AreaFraction
+from Square.Square2 import Square2
+from Square.Square4 import Square4
+
+
+def _Centers(kind, VF, R):
+    """
+    RUC size and fiber centers shared by the uniform and graded generators.
+    """
+    if kind == 'Square':
+        W = np.sqrt(np.pi*R**2/VF)
+        return W, W, [[W/2, W/2]]
+    n = np.sqrt((2*np.pi*R**2)/(VF*np.sqrt(3)))
+    W = n
+    D = n*np.sqrt(3)
+    return W, D, [[0, 0], [0, D], [W, 0], [W, D], [W/2, D/2]]
+
+
+def _Mislabeled(mask, H, L, centers, R, F=1):
+    """
+    Fraction of the RUC area given the wrong phase.
+    """
+    xs = np.cumsum(L) - L/2
+    ys = np.cumsum(H) - H/2
+    frac = AreaFraction(xs, ys, centers, R*R, H=H, L=L)
+    A = np.outer(H, L)
+    return np.sum(A*np.where(mask == F, 1 - frac, frac)) / A.sum()
+
+
+@pytest.mark.parametrize('mirror', [False, True])
+@pytest.mark.parametrize('ratio', [1.25, 2.])
+def test_widths(mirror, ratio):
+    length = 30.
+    widths = Graded(length, [length/2], 10., 0.5, 2., ratio, mirror)
+
+    assert np.isclose(widths.sum(), length)
+    # Whole subcells round the widths down a little from the targets
+    assert np.all(widths >= 0.45) and np.all(widths <= 2.)
+    assert np.all(widths[1:] / widths[:-1] <= 1.1*ratio)
+    assert np.all(widths[:-1] / widths[1:] <= 1.1*ratio)
+    if mirror:
+        assert np.array_equal(widths, widths[::-1])
+
+
+def test_fine_at_tangents():
+    length, R = 30., 10.
+    widths = Graded(length, [length/2], R, 0.5, 2., mirror=True)
+    edges = np.concatenate([[0.], np.cumsum(widths)])
+    mid = (edges[1:] + edges[:-1]) / 2
+
+    # Fine across each tangent, coarse in the matrix gap and across the fiber middle
+    for tangent in [length/2 - R, length/2 + R]:
+        assert widths[np.argmin(np.abs(mid - tangent))] < 0.6
+    assert widths[np.argmin(mid)] == pytest.approx(2., rel=0.05)
+    assert widths[np.argmin(np.abs(mid - length/2))] == pytest.approx(2., rel=0.05)
+
+
+def test_periodic_images():
+    # A fiber at the origin is also graded at the far end of the length
+    widths = Graded(40., [0.], 10., 0.5, 2.)
+    assert widths[0] == pytest.approx(2., rel=0.05)
+    assert widths[-1] == pytest.approx(2., rel=0.05)
+    assert widths.min() < 0.6
+
+
+@pytest.mark.parametrize('args', [(10., 0., 2., 2.), (10., 0.5, 0.25, 2.), (10., 0.5, 2., 1.), (0., 0.5, 2., 2.)])
+def test_bad_widths(args):
+    R, fine, coarse, ratio = args
+    with pytest.raises(ValueError):
+        Graded(30., [15.], R, fine, coarse, ratio)
+
+
+@pytest.mark.parametrize('kind, graded, uniform', [('Square', Square4, Square2), ('Hexagonal', Hex4, Hex2)])
+@pytest.mark.parametrize('VF', [0.3, 0.5, 0.6])
+def test_fewer_subcells(kind, graded, uniform, VF):
+    R = 10.
+    mask, out = graded(VF, R, 0.5, 2., 1, 2, fill='area')
+    W, D, centers = _Centers(kind, VF, R)
+    H = np.asarray(out['H'])
+    L = np.asarray(out['L'])
+    assert np.isclose(H.sum(), D) and np.isclose(L.sum(), W)
+    error = _Mislabeled(mask, H, L, centers, R)
+
+    # Uniform grid of at least as many subcells, in the same RUC
+    Ru = R * np.sqrt(mask.size / (W * D))
+    while True:
+        umask, _ = uniform(VF, Ru, 1, 2, fill='area')
+        if umask.size >= mask.size:
+            break
+        Ru *= 1.01
+    ny, nx = umask.shape
+    uerror = _Mislabeled(umask, np.full(ny, D/ny), np.full(nx, W/nx), centers, R)
+
+    assert error < uerror
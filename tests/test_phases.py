@@ -0,0 +1,59 @@
+"""
+Tests of the fiber and matrix inference of Phases.
+"""
+# Import Modules
+import pytest
+
+from Hexagonal.Hex1 import Hex1
+from Random.Random1 import Random1
+from Raster.Phases import Phases
+from Raster.RLE import EncodeRLE
+from Read.ReadCSV import ReadCSV
+from Read.ReadRUC import ReadRUC
+from Write.WriteCSV import WriteCSV
+from Write.WriteRUC import WriteRUC
+
+
+@pytest.mark.parametrize('mask, F, M', [
+    (Hex1(0.5, 30, 1, 2)[0], 1, 2),
+    (Hex1(0.5, 60, 1, 2, coating=[(2, 3)])[0], 1, 2),
+    (Hex1(0.3, 60, 1, 2, coating=[(8, 3)])[0], 1, 2),
+    (Hex1(0.4, 80, 1, 2, coating=[(2, 3), (2, 4)])[0], 1, 2),
+    (Hex1(0.4, 80, 5, 7, coating=[(2, 3)])[0], 5, 7),
+    (Random1(0.4, 5, 100, 1, 2, seed=1, coating=[(1, 3)])[0], 1, 2),
+], ids=['plain', 'coated', 'thick coating', 'two layers', 'coating below fiber', 'random coated'])
+def test_infer(mask, F, M):
+    assert Phases(mask)[:2] == (F, M)
+    assert Phases(EncodeRLE(mask))[:2] == (F, M)
+
+
+def test_given_fiber():
+    mask, _ = Hex1(0.4, 80, 5, 7, coating=[(2, 3)])
+
+    assert Phases(mask, F=5)[:2] == (5, 7)
+    assert Phases(mask, M=7)[:2] == (5, 7)
+
+
+def test_readers_keep_matrix():
+    mask, _ = Hex1(0.5, 60, 1, 2, coating=[(2, 3)])
+
+    assert ReadCSV(WriteCSV(mask))[1]['M'] == 2
+    assert ReadRUC(WriteRUC(mask))[1]['M'] == 2
+
+
+def test_single_phase():
+    from Read.ReadRLE import ReadRLE
+    from Write.WriteRLE import WriteRLE
+    mask = Hex1(0., 20, 1, 2)[0]
+    assert (mask == 2).all()
+
+    assert ReadCSV('2,2\n2,2')[1]['VF'] == 0.
+    assert ReadRUC(WriteRUC(mask))[1]['VF'] == 0.
+    assert ReadRLE(WriteRLE(mask))[1]['VF'] == 0.
+    assert Phases(mask)[:2] == (1, 2)
+    assert Phases(mask == 2)[:2] == (2, 1)
+
+    # The IDs of the caller are kept
+    assert Phases(mask, F=2)[:2] == (2, 1)
+    assert ReadCSV('2,2\n2,2', F=2)[1]['VF'] == 1.
+    assert Phases(mask, M=5)[:2] == (1, 5)
@@ -0,0 +1,243 @@
+"""
+Regression tests of the shared rasterizer against the original generators.
+
+The reference functions below keep the center test of the original Hex1-3 and
+Square1-3: a subcell is fiber when its center lies within R of a fiber center,
+tested on the full grid. Every fill mode that labels by subcell center must give
+the same mask and the same out dict.
+"""
+# Import Modules
+import numpy as np
+import pytest
+
+from Hexagonal.Hex1 import Hex1
+from Hexagonal.Hex2 import Hex2
+from Hexagonal.Hex3 import Hex3
+from Square.Square1 import Square1
+from Square.Square2 import Square2
+from Square.Square3 import Square3
+from Raster.RLE import DecodeRLE
+
+# Fill modes that label by subcell center
+FILLS = ['grid', 'scan', 'rle', 'tiles']
+
+
+def _Out(mask, F, M):
+    """
+    Actual properties as the original generators computed them.
+    """
+    ny, nx = mask.shape
+    return {
+            'VF': np.sum(mask == F) / (nx * ny),
+            'R': np.sum(mask[:, int(nx/2)] == F) / 2,
+            'NB': nx,
+            'NG': ny,
+            'F': F,
+            'M': M,
+            }
+
+
+def _Grid(nx, ny, centers, R, F, M, xmax=None, ymax=None):
+    """
+    Full grid center test of the original Hex2, Hex3 and Square1-3.
+    """
+    xmax = nx if xmax is None else xmax
+    ymax = ny if ymax is None else ymax
+    nx = int(round(xmax))
+    ny = int(round(ymax))
+    xs = (np.arange(nx) + 0.5) * (xmax / nx)
+    ys = (np.arange(ny) + 0.5) * (ymax / ny)
+    X, Y = np.meshgrid(xs, ys)
+    mask = M * np.ones((ny, nx), dtype=int)
+    for c in centers:
+        mask[(X - c[0])**2 + (Y - c[1])**2 <= R**2] = F
+
+    return mask
+
+
+def _Hex1(VF, NB, F, M):
+    nx = NB - NB % 2
+    ny = 2 * round((np.sqrt(3) * nx) / 2)
+    R = np.sqrt(((ny*ny/np.sqrt(3))*VF)/(2*np.pi))
+    base = M * np.ones((nx//2, ny//2), dtype=int)
+    for i in range(nx//2):
+        for j in range(ny//2):
+            x = i + 0.5
+            y = j + 0.5
+            if np.sqrt(x**2 + y**2) <= R or np.sqrt((nx/2 - x)**2 + (ny/2 - y)**2) <= R:
+                base[i, j] = F
+    base12 = np.vstack([base, np.flipud(base)])
+    mask = np.hstack([base12, np.fliplr(base12)]).T
+
+    return mask, _Out(mask, F, M)
+
+
+def _Hex2(VF, R, F, M):
+    n = np.sqrt((2*np.pi*R**2)/(VF*np.sqrt(3)))
+    hx = n/2
+    hy = n*np.sqrt(3)/2
+    centers = [[hx + dx, hy + dy] for dx, dy in [(0, 0), (hx, hy), (-hx, hy), (hx, -hy), (-hx, -hy)]]
+    mask = _Grid(None, None, centers, R, F, M, 2*hx, 2*hy)
+
+    return mask, _Out(mask, F, M)
+
+
+def _Hex3(NB, R, F, M):
+    if NB <= 2*R:
+        NB = int(1.05*2*R)
+    nx = NB - NB % 2
+    ny = 2 * round((np.sqrt(3) * nx) / 2)
+    mask = _Grid(nx, ny, [[0, 0], [0, ny], [nx, 0], [nx, ny], [nx/2, ny/2]], R, F, M)
+
+    return mask, _Out(mask, F, M)
+
+
+def _Square1(VF, NB, F, M):
+    nx = NB - NB % 2
+    mask = _Grid(nx, NB, [[nx/2, NB/2]], np.sqrt(nx**2 * VF / np.pi), F, M)
+
+    return mask, _Out(mask, F, M)
+
+
+def _Square2(VF, R, F, M):
+    n = np.sqrt(np.pi*R**2/VF)
+    mask = _Grid(None, None, [[n/2, n/2]], R, F, M, n, n)
+
+    return mask, _Out(mask, F, M)
+
+
+def _Square3(NB, R, F, M):
+    if NB <= 2*R:
+        NB = int(1.05*2*R)
+    nx = NB - NB % 2
+    mask = _Grid(nx, nx, [[nx/2, nx/2]], R, F, M)
+
+    return mask, _Out(mask, F, M)
+
+
+# Odd and even NB, small radii and volume fractions up to the packing limits
+# (pi/(2 sqrt 3) = 0.9069 hexagonal, pi/4 = 0.7854 square)
+CASES = (
+    [(Hex1, _Hex1, dict(VF=VF, NB=NB, F=1, M=2))
+     for VF in [0.05, 0.3, 0.5, 0.6, 0.85, 0.9] for NB in [2, 3, 4, 7, 10, 17, 30, 51]]
+    + [(Hex2, _Hex2, dict(VF=VF, R=R, F=3, M=7))
+       for VF in [0.05, 0.3, 0.6, 0.85, 0.9] for R in [0.5, 1, 2.5, 3, 7.3, 12.5]]
+    + [(Hex3, _Hex3, dict(NB=NB, R=R, F=1, M=2))
+       for NB in [3, 4, 10, 11, 25, 40] for R in [0.5, 1, 2.5, 3.7, 10, 20]]
+    + [(Square1, _Square1, dict(VF=VF, NB=NB, F=1, M=2))
+       for VF in [0.05, 0.3, 0.5, 0.7, 0.78] for NB in [2, 3, 4, 7, 10, 17, 30, 51]]
+    + [(Square2, _Square2, dict(VF=VF, R=R, F=3, M=7))
+       for VF in [0.05, 0.3, 0.6, 0.75, 0.78] for R in [0.5, 1, 2.5, 3, 7.3, 12.5]]
+    + [(Square3, _Square3, dict(NB=NB, R=R, F=1, M=2))
+       for NB in [3, 4, 10, 11, 25, 40] for R in [0.5, 1, 2.5, 3.7, 10, 20]]
+)
+
+
+@pytest.mark.parametrize('fill', FILLS)
+@pytest.mark.parametrize('func, reference, params', CASES,
+                         ids=[f"{func.__name__}-{'-'.join(map(str, params.values()))}" for func, _, params in CASES])
+def test_matches_reference(func, reference, params, fill):
+    mask0, out0 = reference(**params)
+    mask, out = func(**params, fill=fill)
+    if fill == 'rle':
+        mask = DecodeRLE(mask)
+
+    assert mask.shape == mask0.shape
+    assert np.array_equal(mask, mask0)
+    for key, value in out0.items():
+        assert np.isclose(out[key], value), key
+
+
+@pytest.mark.parametrize('func, reference, params', CASES[::7])
+def test_compact_dtype(func, reference, params):
+    mask, _ = func(**params)
+
+    assert mask.dtype == np.uint8
+
+
+def test_tiles_path(tmp_path):
+    mask0, _ = Hex1(0.5, 51, 1, 2)
+
+    # A file keeps the mask after the run
+    path = tmp_path / 'mask.npy'
+    mask, _ = Hex1(0.5, 51, 1, 2, fill='tiles', path=str(path))
+    del mask
+    assert np.array_equal(np.load(path, mmap_mode='r'), mask0)
+
+    # A directory only holds an anonymous temporary file
+    mask, _ = Hex1(0.5, 51, 1, 2, fill='tiles', path=str(tmp_path))
+    assert np.array_equal(mask, mask0)
+
+
+def test_random_symmetry_check_memory():
+    # Many fiber images must not cost a row of offsets each before the fill starts
+    import tracemalloc
+    from Random.Random1 import Random1
+    tracemalloc.start()
+    try:
+        mask, out = Random1(0.5, 3, 400, 1, 2, seed=0)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    assert out['N'] > 2000
+    assert peak < 20 * mask.nbytes
+
+
+@pytest.mark.parametrize('func', [Hex1, Square1])
+def test_solve_fill(func, tmp_path):
+    mask0, out0 = func(0.5, 41, 1, 2, solve=True)
+
+    # The solved radius is applied in every center-testing fill mode
+    rle, out = func(0.5, 41, 1, 2, solve=True, fill='rle')
+    assert isinstance(rle, dict) and np.array_equal(DecodeRLE(rle), mask0)
+    assert out['VF'] == out0['VF']
+    path = tmp_path / 'mask.npy'
+    tiles, _ = func(0.5, 41, 1, 2, solve=True, fill='tiles', path=str(path))
+    assert isinstance(tiles, np.memmap) and np.array_equal(np.load(path), mask0)
+    scan, _ = func(0.5, 41, 1, 2, solve=True, fill='scan', coating=[(1, 3)])
+    grid, _ = func(0.5, 41, 1, 2, solve=True, coating=[(1, 3)])
+    assert np.array_equal(scan, grid) and (grid == 1).sum() == (mask0 == 1).sum()
+
+    # No fiber at all
+    rle, out = func(0., 41, 1, 2, solve=True, fill='rle')
+    assert out['VF'] == 0.
+
+    with pytest.raises(ValueError):
+        func(0.5, 41, 1, 2, solve=True, fill='area')
+
+
+@pytest.mark.parametrize('nx, ny', [(41, 71), (40, 70), (64, 111)])
+def test_solve_threshold(nx, ny):
+    from Raster.Rasterize import SolveThreshold
+    xs = np.arange(nx) + 0.5
+    ys = np.arange(ny) + 0.5
+    centers = [[0, 0], [0, ny], [nx, 0], [nx, ny], [nx/2, ny/2]]
+
+    # Closest volume fraction over every squared distance of the full grid, ties to the smaller radius
+    d2 = np.min([(xs[None, :] - x)**2 + (ys[:, None] - y)**2 for x, y in centers], axis=0)
+    for VF in [0., 0.2, 0.5, 0.8, 1.]:
+        steps, counts = np.unique(d2, return_counts=True)
+        k = int(np.argmin(np.abs(np.cumsum(counts) - VF * nx * ny)))
+        mask, R2 = SolveThreshold(xs, ys, centers, VF, 1, 2)
+        if VF == 0.:
+            assert R2 == -np.inf and np.all(mask == 2)
+        else:
+            assert R2 == steps[k]
+            assert np.array_equal(mask, np.where(d2 <= R2, 1, 2))
+
+
+def test_solve_budget():
+    # The budget covers the mask and the working arrays of the solve
+    import tracemalloc
+    mask, _ = Hex1(0.5, 1200, 1, 2, solve=True)
+    tracemalloc.start()
+    try:
+        Hex1(0.5, 1200, 1, 2, solve=True, max_bytes=9 * mask.nbytes)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    assert peak < 9 * mask.nbytes
+    with pytest.raises(MemoryError):
+        Hex1(0.5, 1200, 1, 2, solve=True, max_bytes=8 * mask.nbytes)
@@ -0,0 +1,34 @@
+"""
+Tests of the block parser of ReadCSV.
+"""
+# Import Modules
+import io
+import numpy as np
+import pytest
+
+from Read.ReadCSV import ReadCSV, ReadCSVFile, _ParseCSV
+from Write.WriteCSV import WriteCSV
+
+
+@pytest.mark.parametrize('cells', [1, 7, 30, 1 << 20])
+def test_blocks_match_whole(cells):
+    mask = np.random.default_rng(0).integers(1, 4, (13, 9)).astype(np.uint16)
+    mask[-1, -1] = 300
+    parsed, out = _ParseCSV(WriteCSV(mask).splitlines(), cells=cells)
+
+    assert np.array_equal(parsed, mask)
+    assert parsed.dtype == np.uint16
+    assert (out['NG'], out['NB']) == mask.shape
+
+
+def test_budget_before_parse():
+    content = WriteCSV(np.ones((64, 64), dtype=np.uint8))
+
+    with pytest.raises(MemoryError):
+        _ParseCSV(content.splitlines(), max_bytes=1024, cells=512)
+    assert ReadCSVFile(io.BytesIO(content.encode()), max_bytes=64 * 64)[0].shape == (64, 64)
+
+
+def test_ragged_rows():
+    with pytest.raises(ValueError, match="same number of subcells"):
+        ReadCSV("1,2\n1,2\n1")
@@ -0,0 +1,42 @@
+"""
+Tests of multi-RUC decks.
+"""
+# Import Modules
+import numpy as np
+import pytest
+
+from Hexagonal.Hex1 import Hex1
+from Read.ReadDeck import IndexDeck, ReadDeck
+from Read.ReadRUC import ReadRUCFile
+from Square.Square4 import Square4
+from Write.WriteDeck import WriteDeck
+
+
+@pytest.fixture
+def deck(tmp_path):
+    rucs = [Hex1(VF, 20 + 10*k, 1, 2) for k, VF in enumerate([0.3, 0.5, 0.6])]
+    rucs.append(Square4(0.5, 10., 0.5, 2., 1, 2))
+    path = tmp_path / 'deck.mac'
+    offsets = WriteDeck(iter(rucs), str(path))
+
+    return str(path), rucs, offsets
+
+
+def test_index(deck):
+    path, rucs, offsets = deck
+
+    assert len(offsets) == len(rucs)
+    assert IndexDeck(path) == offsets
+    with open(path, 'rb') as fid:
+        assert IndexDeck(fid) == offsets
+
+
+def test_read_each(deck):
+    path, rucs, offsets = deck
+
+    for i, (mask, out) in enumerate(rucs):
+        for read, rout, msg in [ReadDeck(path, i, offsets), ReadDeck(path, i), ReadRUCFile(path, offset=offsets[i])]:
+            assert msg == ''
+            assert np.array_equal(read, mask)
+            if 'H' in out:
+                assert np.allclose(rout['H'], out['H']) and np.allclose(rout['L'], out['L'])
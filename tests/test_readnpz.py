@@ -0,0 +1,61 @@
+"""
+Tests of the .npz reader and writer.
+"""
+# Import Modules
+import io
+
+import numpy as np
+import pytest
+
+from Hexagonal.Hex1 import Hex1
+from Raster.RLE import DecodeRLE
+from Read.ReadNPZ import ReadNPZ, ReadNPZFile
+from Square.Square4 import Square4
+from Write.WriteNPZ import WriteNPZ, WriteNPZFile
+
+
+@pytest.mark.parametrize('fill', ['grid', 'rle'])
+def test_round_trip(fill):
+    mask, out = Hex1(0.5, 40, 1, 2, fill=fill)
+    read, rout, msg = ReadNPZ(WriteNPZ(mask, out))
+
+    assert msg == ''
+    assert isinstance(read, dict) == (fill == 'rle')
+    dense = DecodeRLE(mask) if fill == 'rle' else mask
+    assert np.array_equal(DecodeRLE(read) if fill == 'rle' else read, dense)
+    assert read['values'].dtype == mask['values'].dtype if fill == 'rle' else read.dtype == mask.dtype
+    assert (rout['F'], rout['M']) == (1, 2)
+    assert rout['VF'] == pytest.approx(out['VF'])
+
+
+@pytest.mark.parametrize('mmap', [True, False])
+def test_round_trip_file(tmp_path, mmap):
+    mask, out = Square4(0.5, 10., 0.5, 2., 1, 2)
+    path = tmp_path / 'ruc.npz'
+    WriteNPZFile(mask, str(path), out)
+    read, rout, msg = ReadNPZFile(str(path), mmap=mmap)
+
+    assert msg == ''
+    assert np.array_equal(read, mask)
+    assert np.array_equal(rout['H'], out['H']) and np.array_equal(rout['L'], out['L'])
+    if mmap:
+        assert isinstance(read, np.memmap) and not read.flags.writeable
+
+
+def test_stream():
+    mask, out = Hex1(0.5, 40, 1, 2)
+    buf = io.BytesIO()
+    WriteNPZFile(mask, buf, out)
+    buf.seek(0)
+    read, _, msg = ReadNPZFile(buf)
+
+    assert msg == ''
+    assert np.array_equal(read, mask)
+
+
+def test_budget():
+    mask, out = Hex1(0.5, 40, 1, 2)
+    read, _, msg = ReadNPZ(WriteNPZ(mask, out), max_bytes=mask.nbytes - 1)
+
+    assert read is None
+    assert msg != ''
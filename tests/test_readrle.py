@@ -0,0 +1,76 @@
+"""
+Tests of the *RLE reader and writer.
+"""
+# Import Modules
+import numpy as np
+import pytest
+
+from Hexagonal.Hex1 import Hex1
+from Raster.RLE import DecodeRLE, EncodeRLE
+from Read.ReadRLE import ReadRLE, ReadRLEFile
+from Square.Square4 import Square4
+from Write.WriteRLE import WriteRLE, WriteRLEFile
+
+
+@pytest.mark.parametrize('mask', [
+    Hex1(0.5, 40, 1, 2)[0],
+    Hex1(0.5, 30, 1, 2, coating=[(2, 3)])[0],
+    np.array([[7]]),
+    np.array([[300, 2], [1, 65536]]),
+], ids=['hex', 'coated', 'one subcell', 'wide IDs'])
+def test_round_trip(mask):
+    rle, out, msg = ReadRLE(WriteRLE(mask))
+
+    assert msg == ''
+    assert np.array_equal(DecodeRLE(rle), mask)
+    assert (out['NG'], out['NB']) == mask.shape
+    assert WriteRLE(rle) == WriteRLE(mask) == WriteRLE(EncodeRLE(mask))
+
+
+def test_round_trip_file(tmp_path):
+    mask, out = Square4(0.5, 10., 0.5, 2., 1, 2, fill='rle')
+    path = tmp_path / 'ruc.rle'
+    WriteRLEFile(mask, str(path), out['H'], out['L'])
+    rle, read, msg = ReadRLEFile(str(path))
+
+    assert msg == ''
+    assert np.array_equal(DecodeRLE(rle), DecodeRLE(mask))
+    assert np.allclose(read['H'], out['H']) and np.allclose(read['L'], out['L'])
+    assert read['VF'] == pytest.approx(out['VF'])
+    assert (read['F'], read['M']) == (1, 2)
+
+
+def test_continuation_lines():
+    mask = np.array([[1, 1, 2, 2, 1], [2, 2, 2, 2, 2]])
+    content = WriteRLE(mask, H=[1., 2.]).replace('H=1,', 'H=1,\n  ').replace('2*1,', '2*1,\n   ')
+    rle, out, msg = ReadRLE(content)
+
+    assert msg == ''
+    assert np.array_equal(DecodeRLE(rle), mask)
+    assert np.array_equal(out['H'], [1., 2.])
+
+
+GOOD = WriteRLE(np.array([[1, 2], [2, 2]]))
+
+
+@pytest.mark.parametrize('content', [
+    GOOD.replace('SM=1*1', 'SM=1*x'),
+    GOOD.replace('SM=1*1', 'SM=1*1,junk'),
+    GOOD.replace('SM=1*1', 'SM=1'),
+    GOOD.replace('NB=2', 'NB=two'),
+    GOOD.replace('NG=2', 'NG='),
+    GOOD.replace('*RLE\n', '*RLE\n stray text\n'),
+    GOOD + 'H=1,a\n',
+], ids=['bad ID', 'bad run', 'no ID', 'bad NB', 'empty NG', 'stray text', 'bad H'])
+def test_malformed(content):
+    rle, out, msg = ReadRLE(content)
+
+    assert rle is None and out is None
+    assert msg.startswith("The *RLE section could not be read")
+
+
+def test_wrong_size():
+    rle, out, msg = ReadRLE(GOOD.replace('SM=2*2', 'SM=3*2'))
+
+    assert rle is None
+    assert msg == "SM row 2 covers 3 subcells, expected 2."
@@ -0,0 +1,72 @@
+"""
+Tests of the *RUC reader and writer.
+"""
+# Import Modules
+import numpy as np
+import pytest
+
+from Hexagonal.Hex1 import Hex1
+from Raster.RLE import EncodeRLE
+from Read.ReadRUC import ReadRUC
+from Write.WriteRUC import WriteRUC
+
+
+def _WriteRUC(mask):
+    """
+    Original writer, one string concatenation per value.
+    """
+    ruc_data = '*RUC\n'
+    ruc_data = ruc_data + f" MOD={202} ARCHID={99} \n"
+    NB = len(mask)
+    NG = len(mask[0])
+    ruc_data = ruc_data + f" NB={NB} NG={NG} \n"
+    ruc_data = ruc_data + ' H=' + ','.join(['1'] * NB) + '\n'
+    ruc_data = ruc_data + ' L=' + ','.join(['1'] * NG) + '\n'
+    for i in range(NB):
+        ruc_data = ruc_data + " SM=" + ','.join(f"{int(mask[i][j])}" for j in range(NG)) + "\n"
+
+    return ruc_data
+
+
+@pytest.mark.parametrize('mask', [
+    Hex1(0.5, 20, 1, 2)[0],
+    Hex1(0.4, 300, 1, 2)[0],
+    Hex1(0.5, 30, 1, 2, coating=[(2, 3)])[0],
+    np.array([[7]]),
+    np.array([[300, 2], [1, 65536]]),
+], ids=['small', 'several chunks', 'coated', 'one subcell', 'wide IDs'])
+def test_matches_original_writer(mask):
+    assert WriteRUC(mask) == _WriteRUC(mask)
+    assert WriteRUC(EncodeRLE(mask)) == _WriteRUC(mask)
+
+
+def test_round_trip():
+    mask, _ = Hex1(0.5, 40, 1, 2, coating=[(2, 3)])
+    read, out, msg = ReadRUC(WriteRUC(mask))
+
+    assert msg == ''
+    assert np.array_equal(read, mask)
+    assert (out['F'], out['M']) == (1, 2)
+
+
+GOOD = WriteRUC(np.array([[1, 2], [2, 2]]))
+
+
+@pytest.mark.parametrize('content', [
+    GOOD.replace('SM=1,2', 'SM=1,x'),
+    GOOD.replace('H=1,1', 'H=1,a'),
+    GOOD.replace('L=1,1', 'L=b,1'),
+    GOOD.replace('MOD=202', 'MOD='),
+    GOOD.replace('ARCHID=99', 'ARCHID=99,'),
+    GOOD.replace('ARCHID=99', 'ARCHID=abc'),
+    GOOD.replace(' H=1,1\n L=1,1\n', '').replace('NB=2', 'NB=two'),
+    GOOD.replace(' H=1,1\n L=1,1\n', '').replace('NG=2', 'NG=2.5'),
+    GOOD.replace('MOD=202', 'MOD=203'),
+    GOOD.replace('SM=1,2', 'SM=1,2,2'),
+    "no section",
+], ids=['SM', 'H', 'L', 'empty MOD', 'ARCHID comma', 'ARCHID text', 'NB', 'NG', '3D', 'row width', 'no section'])
+def test_malformed(content):
+    mask, out, msg = ReadRUC(content)
+
+    assert mask is None and out is None
+    assert msg != ''
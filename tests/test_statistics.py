@@ -0,0 +1,81 @@
+"""
+Tests of the microstructure statistics against brute force counts.
+"""
+# Import Modules
+import numpy as np
+import pytest
+
+from Square.Square1 import Square1
+from Stats.Statistics import (Statistics, SizeDistribution, TwoPoint, LinealPath, Components,
+                              InterfaceLength, NearestNeighbors)
+
+
+def _Masks():
+    rng = np.random.default_rng(0)
+    masks = [(rng.random(shape) < p).astype(np.uint8) + 1
+             for shape, p in [((1, 1), 1.), ((5, 7), 0.5), ((9, 4), 0.8), ((12, 12), 0.3), ((3, 20), 1.)]]
+    return masks + [Square1(0.4, 16, 1, 2)[0]]
+
+
+@pytest.mark.parametrize('mask', _Masks())
+def test_two_point(mask):
+    I = mask == 1
+    ny, nx = I.shape
+    S2 = np.array([[np.mean(I & np.roll(I, (-dy, -dx), axis=(0, 1))) for dx in range(nx)] for dy in range(ny)])
+
+    assert np.allclose(TwoPoint(mask, 1), S2, atol=1e-6)
+
+
+@pytest.mark.parametrize('mask', _Masks())
+@pytest.mark.parametrize('axis', [0, 1])
+def test_lineal_path(mask, axis):
+    I = (mask == 1) if axis == 1 else (mask == 1).T
+    ny, nx = I.shape
+    LP = [np.mean(np.all([np.roll(I, -k, axis=1) for k in range(z + 1)], axis=0)) for z in range(nx)]
+
+    assert np.allclose(LinealPath(mask, 1, axis), LP)
+
+
+def test_lineal_path_blocks():
+    # More lines than one block holds
+    rng = np.random.default_rng(1)
+    mask = (rng.random((2100, 600)) < 0.6).astype(np.uint8) + 1
+    I = mask == 1
+    LP = [np.mean(np.all([np.roll(I, -k, axis=1) for k in range(z + 1)], axis=0)) for z in range(4)]
+
+    assert np.allclose(LinealPath(mask, 1)[:4], LP)
+    assert np.isclose(LinealPath(mask, 1, axis=0)[0], I.mean())
+
+
+def test_periodic_components():
+    # One fiber split over the four corners, one in the middle
+    mask = np.full((10, 10), 2, dtype=np.uint8)
+    mask[[0, 0, 9, 9], [0, 9, 0, 9]] = 1
+    mask[4:6, 4:7] = 1
+    count, areas, centroids = Components(mask, 1)
+
+    assert count == 2
+    assert sorted(areas) == [4, 6]
+    corner = centroids[np.argmin(areas)]
+    assert np.allclose(np.minimum(corner, 10 - corner), 0.5)
+    assert np.allclose(NearestNeighbors(centroids, (10, 10)), np.hypot(4.5, 5.))
+
+
+def test_interface_and_summary():
+    mask = np.full((8, 8), 2, dtype=np.uint8)
+    mask[2:4, 2:5] = 1
+    stats = Statistics(mask, 1)
+
+    assert InterfaceLength(mask, 1) == 10.
+    assert InterfaceLength(mask, 1, H=np.full(8, 2.), L=np.ones(8)) == 2 * 2 * 2 + 3 * 2
+    assert stats['Fibers'] == 1 and stats['Mean Fiber Area'] == 6.
+    assert stats['S2'][0] == pytest.approx(6 / 64)
+    assert stats['LPx'][0] == pytest.approx(6 / 64)
+
+
+def test_size_distribution():
+    sizes, counts = SizeDistribution([4, 4, 9])
+    assert list(sizes) == [4, 9] and list(counts) == [2, 1]
+
+    sizes, counts = SizeDistribution(np.arange(100), bins=10)
+    assert len(sizes) == 10 and counts.sum() == 100
@@ -0,0 +1,55 @@
+"""
+Tests of the sweep specification reader and of running a sweep.
+"""
+# Import Modules
+import json
+
+import numpy as np
+
+from Batch.Sweep import ReadSweep, Sweep
+
+
+def test_csv_cells(tmp_path):
+    path = tmp_path / 'sweep.csv'
+    path.write_text("generator,VF,NB,fill,solve\nHex1,0.5,20,scan,False\nSquare1,0.4,21,,true\n")
+    runs = ReadSweep(str(path))
+
+    assert runs == [
+        {'generator': 'Hex1', 'params': {'VF': 0.5, 'NB': 20, 'fill': 'scan', 'solve': False}},
+        {'generator': 'Square1', 'params': {'VF': 0.4, 'NB': 21, 'solve': True}},
+    ]
+    assert isinstance(runs[0]['params']['NB'], int)
+
+
+def test_json_literal_lists(tmp_path):
+    path = tmp_path / 'sweep.json'
+    path.write_text(json.dumps({'generator': 'Square2', 'params': {
+        'VF': [0.3, 0.4],
+        'R': {'sweep': [5., 6.]},
+        'coating': {'value': [[0.5, 3]]},
+        'fill': 'scan',
+    }}))
+    runs = ReadSweep(str(path))
+
+    assert len(runs) == 4
+    assert [run['params']['coating'] for run in runs] == [[[0.5, 3]]] * 4
+    assert [(run['params']['VF'], run['params']['R']) for run in runs] == [(0.3, 5.), (0.3, 6.), (0.4, 5.), (0.4, 6.)]
+
+
+def test_json_sweep_of_lists(tmp_path):
+    path = tmp_path / 'sweep.json'
+    path.write_text(json.dumps({'generator': 'Square2', 'params': {
+        'VF': 0.4,
+        'R': 5.,
+        'F': 1,
+        'M': 2,
+        'coating': {'sweep': [[[0.5, 3]], [[0.5, 3], [1., 4]]]},
+    }}))
+    runs = ReadSweep(str(path))
+    summary = Sweep(runs, str(tmp_path / 'out'), workers=1, formats=('csv',), progress=False)
+
+    assert [run['params']['coating'] for run in runs] == [[[0.5, 3]], [[0.5, 3], [1., 4]]]
+    assert [record['error'] for record in summary] == ['', '']
+    phases = [set(np.unique(np.loadtxt(tmp_path / 'out' / f, delimiter=',')).astype(int))
+              for record in summary for f in record['files']]
+    assert phases == [{1, 2, 3}, {1, 2, 3, 4}]
@@ -0,0 +1,44 @@
+"""
+Tests of the per-context stage traces.
+"""
+# Import Modules
+import contextvars
+import threading
+import tracemalloc
+from Trace.Trace import Stage, NewTrace, UseTrace, EnableTrace, TraceOn, TraceEvents
+
+
+def _Session(trace, names):
+    UseTrace(trace)
+    for name in names:
+        with Stage(name):
+            pass
+
+
+def test_sessions_apart():
+    a = NewTrace(on=True)
+    b = NewTrace(on=False)
+    threads = [threading.Thread(target=_Session, args=(a, ['a1', 'a2'])),
+               threading.Thread(target=_Session, args=(b, ['b1']))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert [event['name'] for event in a['events']] == ['a1', 'a2']
+    assert len(b['events']) == 0
+    assert not TraceOn()
+
+    ctx = contextvars.copy_context()
+    assert ctx.run(lambda: (UseTrace(a), TraceOn())[1])
+    ctx.run(EnableTrace, False)
+    assert not a['on'] and not tracemalloc.is_tracing()
+
+
+def test_event_cap():
+    trace = NewTrace(on=True, max_events=3)
+    ctx = contextvars.copy_context()
+    ctx.run(_Session, trace, ['s0', 's1', 's2', 's3', 's4'])
+
+    assert [event['name'] for event in ctx.run(TraceEvents)] == ['s2', 's3', 's4']
+    ctx.run(EnableTrace, False)